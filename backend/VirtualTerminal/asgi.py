@@ -13,4 +13,19 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'VirtualTerminal.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# 장고 설정이 로드된 이후에 import
+from api.terminal_socket import TerminalSocket  # noqa: E402
+
+terminal_socket = TerminalSocket()
+
+
+async def application(scope, receive, send):
+    # 웹소켓 터미널 연결은 장고를 거치지 않고 바로 처리 (장고 ASGI 핸들러는 http 만 지원)
+    if scope['type'] == 'websocket':
+        if scope['path'] == '/ws/terminal/':
+            return await terminal_socket(scope, receive, send)
+        await receive()
+        return await send({'type': 'websocket.close', 'code': 4404})
+    return await django_application(scope, receive, send)
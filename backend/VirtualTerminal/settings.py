@@ -12,8 +12,6 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 
-from api.user import User
-
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -125,10 +123,91 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-# 함수로 전역 변수에 접근할 수 있도록 합니다.
-def get_user_instance():
-    return USER_INSTANCE
-
-def set_user_instance(username, hostname):
-    global USER_INSTANCE
-    USER_INSTANCE = User(username, hostname)
\ No newline at end of file
+# 사용자 샌드박스 파일 시스템
+# 'disk': tempfile.mkdtemp 로 생성한 실제 디렉토리, 'memory': 프로세스 메모리 내 가상 디렉토리 트리
+FILESYSTEM_BACKEND = 'disk'
+
+# 디스크 샌드박스와 문제 템플릿 디렉토리를 생성하는 경로
+SANDBOX_ROOT = BASE_DIR / 'sandboxes'
+
+# 미리 생성해두는 샌드박스 수 (0 이면 접속할 때마다 생성)
+SANDBOX_POOL_SIZE = 16
+
+# 디스크 샌드박스의 경로 탐색에 사용하는 디렉토리 fd 캐시 크기 (프로세스 전체, 모든 세션이 공유)
+SANDBOX_DIR_HANDLES = 256
+
+# 세션 관리
+# 최대 세션 수 (초과하면 가장 오래 사용되지 않은 세션부터 삭제)
+MAX_SESSIONS = 1000
+# 이 시간(초) 동안 사용되지 않은 세션은 삭제
+SESSION_IDLE_TIMEOUT = 30 * 60
+# 유휴 세션을 확인하는 주기(초)
+SESSION_REAP_INTERVAL = 60
+# True 이면 유휴 세션을 삭제하지 않고 스냅샷으로 저장하고, 다음 요청에서 복원
+SESSION_HIBERNATE = False
+# 세션 스냅샷(suspend-session/, 유휴 세션) 저장 경로와 복원되지 않은 스냅샷의 보관 시간(초)
+SNAPSHOT_DIR = BASE_DIR / 'snapshots'
+SNAPSHOT_TTL = 7 * 24 * 60 * 60
+
+# async 명령어 실행 경로(input-command-async/)에서 블로킹 작업을 처리하는 스레드 수
+COMMAND_EXECUTOR_WORKERS = 32
+
+# 명령어를 실행하는 워커 프로세스 수 (0 이면 장고 프로세스에서 직접 실행)
+# 세션은 토큰 해시로 하나의 워커 프로세스에 고정됨
+COMMAND_WORKER_PROCESSES = 0
+# 워커 프로세스 응답 대기 시간(초)
+COMMAND_WORKER_TIMEOUT = 60
+
+# 명령어 출력 제한
+# 응답 하나에 포함하는 최대 출력 크기(바이트), 초과한 출력은 get-output/ 으로 나누어 조회
+OUTPUT_PAGE_BYTES = 64 * 1024
+# 명령어 줄 하나의 최대 출력 크기(바이트), 초과하면 실행을 중단하고 안내 메세지 추가
+MAX_OUTPUT_BYTES = 1024 * 1024
+# 세션별로 보관하는 페이지 조회용 출력 수와 보관 시간(초)
+OUTPUT_STORE_SIZE = 4
+OUTPUT_STORE_TTL = 5 * 60
+
+# 탭 자동 완성 (complete/)
+# 세션별로 항목 목록을 보관하는 최대 디렉토리 수와 응답 하나의 최대 후보 수
+COMPLETION_INDEX_DIRS = 64
+COMPLETION_MAX_RESULTS = 100
+
+# 명령어 기록 (api.history.HISTORY, 명령어 실행 중에는 DB 에 쓰지 않고 모아서 저장)
+# 버퍼에 이 개수가 쌓이거나 이 시간(초)이 지나면 bulk_create 로 저장
+HISTORY_FLUSH_SIZE = 200
+HISTORY_FLUSH_INTERVAL = 2.0
+# DB 에 저장하지 못한 기록을 메모리에 보관하는 최대 개수 (초과하면 오래된 기록부터 버림)
+HISTORY_MAX_PENDING = 10000
+# history/ 응답 한 페이지의 최대 개수와 history 명령어의 기본 출력 개수
+HISTORY_PAGE_SIZE = 100
+HISTORY_DEFAULT_COUNT = 50
+
+# 읽기 전용 명령어(ls, pwd, cat) 출력 캐시
+# 세션별로 보관하는 최대 결과 수 (0 이면 캐시하지 않음) 와 저장하는 출력의 최대 길이(문자 수)
+RESULT_CACHE_SIZE = 32
+RESULT_CACHE_MAX_LENGTH = 16 * 1024
+
+# 채점 (grade/) 응답에 포함하는 최대 차이 항목 수
+GRADING_MAX_DIFF = 50
+
+# input-script/ 요청 하나에서 실행할 수 있는 최대 명령어 수
+MAX_SCRIPT_COMMANDS = 500
+
+# 명령어 실행 제한 (api.policy.EXECUTION_POLICY, 0 이면 제한 없음)
+# 명령어 하나(파이프라인 포함)의 최대 실행 시간(초), 초과하면 프로세스를 종료하고 종료 코드 124
+COMMAND_TIMEOUT = 10
+# 외부 명령어 프로세스의 최대 CPU 시간(초)과 주소 공간 크기(바이트)
+COMMAND_CPU_SECONDS = 5
+COMMAND_MEMORY_BYTES = 256 * 1024 * 1024
+# 외부 명령어 실행 사용자의 최대 프로세스 수
+# RLIMIT_NPROC 은 같은 uid 의 모든 프로세스/스레드를 세므로 명령어를 별도 uid 로 실행하는 경우에만 설정
+COMMAND_MAX_PROCESSES = 0
+
+# /metrics 의 실행 시간 histogram bucket 경계(초)
+METRICS_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# 프로세스 메모리에 캐시하는 문제 정보 최대 개수
+PROBLEM_CACHE_SIZE = 128
+# 캐시된 문제 정보를 DB 의 버전과 다시 비교하는 간격 (초)
+# 다른 프로세스(워커 프로세스, 다른 서버)에서 수정된 문제는 signal 이 전달되지 않으므로 이 시간 안에 반영됨
+PROBLEM_CACHE_CHECK_INTERVAL = 1.0
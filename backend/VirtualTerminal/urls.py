@@ -18,7 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework import routers
 
-from api.views import ItemViewSet
+from api.views import ItemViewSet, metrics
 
 router = routers.DefaultRouter()  # add this
 router.register(r'items', ItemViewSet, 'item')  # add this
@@ -29,4 +29,5 @@ urlpatterns = [
 
     path('api/', include('api.urls')),  # /api 주소로 들어갔을때 api 내부에 있는 url 로 접속
     path('api/', include(router.urls)),  # add this
+    path('metrics', metrics, name='metrics'),  # Prometheus 기본 수집 경로
 ]
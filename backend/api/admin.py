@@ -1,5 +1,7 @@
 from django.contrib import admin
-from api.models import Item
+from api.models import CommandHistory, Item, Problem
 
 # Register your models here.
 admin.site.register(Item)
+admin.site.register(Problem)
+admin.site.register(CommandHistory)
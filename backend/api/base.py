@@ -3,6 +3,7 @@ import subprocess
 import tempfile
 import shutil
 from typing import List
+from api.shell_parser import ParseError, parse
 
 username: str = 'tmp'
 hostname: str = 'host'
@@ -29,7 +30,16 @@ def execute_command(input_command: str, allowed_commands: List[str]) -> str:
     global temp_root_dir, temp_home_dir
     try:
         current_dir_path: str = os.getcwd()
-        command_parts: List[str] = input_command.split(' ')
+        # 따옴표/escape 를 처리하여 인자로 분리 (python -m api.base 로 실행)
+        try:
+            command_line = parse(input_command)
+        except ParseError as e:
+            return f"구문 오류: {e}"
+        if not command_line.items:
+            return ""
+        if len(command_line.items) > 1 or len(command_line.items[0][1].commands) > 1 or command_line.items[0][1].commands[0].redirects:
+            return "여러 명령어(;, &&, |)와 리다이렉션(>, >>)은 지원하지 않습니다"
+        command_parts: List[str] = list(command_line.items[0][1].commands[0].args)
 
         # 허용된 명령어인지 확인
         if command_parts[0] not in allowed_commands:
@@ -1,8 +1,117 @@
+import asyncio
+import contextvars
+import threading
 from abc import abstractmethod, ABC
-from typing import List
+from typing import AsyncIterator, Iterator, List, Optional
+from api.executor import COMMAND_EXECUTOR
 from api.user import User
 
+# 출력 스트리밍 시 한번에 전달하는 최대 크기
+CHUNK_SIZE: int = 64 * 1024
+# 스레드에서 생성된 chunk 를 이벤트 루프로 전달할 때 쌓아둘 수 있는 최대 개수 (소비가 느리면 생성도 대기)
+STREAM_QUEUE_SIZE: int = 16
+
+class CommandError(Exception):
+    """
+    명령어 실행 실패 시 발생시키는 예외
+
+    Attributes
+    ----------
+    message : str
+        사용자에게 출력할 에러 메세지
+    status : int
+        종료 코드 (쉘과 동일하게 0 이외의 값은 실패)
+    """
+    def __init__(self, message: str, status: int = 1):
+        super().__init__(message)
+        self.message: str = message
+        self.status: int = status
+
 class Command(ABC):
+    # True 이면 stream_command_async 가 이벤트 루프를 블로킹하지 않음 (False 이면 async 실행 시 스레드 풀에서 실행)
+    runs_in_event_loop: bool = False
+    # True 이면 변경한 경로를 알 수 없는 명령어 (실행 후 user.mark_changed() 로 세션의 파일 시스템 상태 캐시를 모두 무효화)
+    # builtin 명령어는 변경한 경로를 user.mark_changed(path) 로 직접 알림
+    changes_unknown_paths: bool = False
+    # True 이면 출력이 인자, 현재 디렉토리, 파일 시스템 상태로만 결정되는 명령어 (단독으로 실행하면 세션의 결과 캐시 사용)
+    cacheable: bool = False
+
     @abstractmethod
     def execute_command(self, user: User, command_part: List[str], template=None) -> str:
-        pass
\ No newline at end of file
+        pass
+
+    async def execute_command_async(self, user: User, command_part: List[str], template=None) -> str:
+        # 기본 구현은 블로킹 작업을 제한된 스레드 풀에서 실행 (이벤트 루프는 블로킹되지 않음)
+        def run() -> str:
+            with user.lock:
+                user.check_open()
+                return self.execute_command(user, command_part, template)
+        # 실행 제한(api.policy.CURRENT_EXECUTION)이 스레드에서도 적용되도록 현재 context 를 복사하여 실행
+        return await asyncio.get_running_loop().run_in_executor(COMMAND_EXECUTOR, contextvars.copy_context().run, run)
+
+    def stream_command(self, user: User, command_part: List[str], template=None, stdin: Optional[Iterator[str]] = None) -> Iterator[str]:
+        # 기본 구현은 실행 결과 전체를 하나의 chunk 로 반환 (출력이 큰 명령어와 파이프 입력(stdin)을 사용하는 명령어는 override)
+        yield self.execute_command(user, command_part, template)
+
+    async def stream_command_async(self, user: User, command_part: List[str], template=None) -> AsyncIterator[str]:
+        # 동기 generator 를 스레드 풀에서 실행하고 생성되는 chunk 를 bounded queue 로 이벤트 루프에 전달
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        cancelled = threading.Event()
+        done = object()
+
+        def put(item) -> None:
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def run() -> None:
+            try:
+                with user.lock:
+                    user.check_open()
+                    for chunk in self.stream_command(user, command_part, template):
+                        if cancelled.is_set():
+                            break
+                        put(chunk)
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+
+        future = loop.run_in_executor(COMMAND_EXECUTOR, contextvars.copy_context().run, run)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # 소비자가 중간에 종료한 경우 (ex. 웹소켓 연결 종료) 생성 스레드가 대기하지 않도록 queue 를 비움
+            cancelled.set()
+            while not future.done():
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.wait([future], timeout=0.05)
+
+def split_options(command_parts: List[str]):
+    """
+    명령어 인자를 옵션 문자 집합과 나머지 인자로 분리
+
+    Parameters
+    ----------
+    command_parts : List[str]
+        명령어와 인자를 포함하는 리스트
+
+    Returns
+    -------
+    Tuple[Set[str], List[str]]
+        옵션 문자 집합과 옵션이 아닌 인자 리스트 ex) ['ls', '-al', 'a'] -> ({'a', 'l'}, ['a'])
+    """
+    options = set()
+    operands: List[str] = []
+    for part in command_parts[1:]:
+        if len(part) > 1 and part.startswith('-'):
+            options.update(part[1:])
+        else:
+            operands.append(part)
+    return options, operands
@@ -0,0 +1,35 @@
+import codecs
+import errno
+from typing import Iterator, List, Optional
+from api.command.command import CHUNK_SIZE, Command, CommandError
+from api.user import User
+
+class Command_CAT(Command):
+    cacheable = True
+
+    def execute_command(self, user: User, command_parts: List[str], template=None) -> str:
+        return ''.join(self.stream_command(user, command_parts, template))
+
+    def stream_command(self, user: User, command_parts: List[str], template=None, stdin: Optional[Iterator[str]] = None) -> Iterator[str]:
+        # 파일이 지정되지 않은 경우 파이프 입력을 그대로 출력 ex) echo hi | cat
+        if len(command_parts) == 1 and stdin is not None:
+            yield from stdin
+            return
+        for target in command_parts[1:]:
+            path = user.resolve_path(target)
+            if user.fs.is_dir(path):
+                raise CommandError(f"cat: {target}: 디렉터리입니다")
+            # chunk 경계에서 utf-8 문자가 잘리지 않도록 incremental decoder 사용
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            try:
+                for chunk in user.fs.iter_file(path, CHUNK_SIZE):
+                    text = decoder.decode(chunk)
+                    if text:
+                        yield text
+            except OSError as e:
+                # FIFO 등 일반 파일이 아닌 경로는 파일 시스템의 메세지 (시간 제한으로 중단된 경우 메세지는 출력되지 않음)
+                message = e.strerror if e.errno == errno.EINVAL else '그런 파일이나 디렉터리가 없습니다'
+                raise CommandError(f"cat: {target}: {message}")
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
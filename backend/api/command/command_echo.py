@@ -0,0 +1,7 @@
+from typing import List
+from api.command.command import Command
+from api.user import User
+
+class Command_ECHO(Command):
+    def execute_command(self, user: User, command_parts: List[str], template=None) -> str:
+        return ' '.join(command_parts[1:])
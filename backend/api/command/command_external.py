@@ -0,0 +1,134 @@
+import asyncio
+import codecs
+import subprocess
+import tempfile
+from typing import AsyncIterator, Iterator, List, Optional
+from api.command.command import CHUNK_SIZE, Command, CommandError
+from api.metrics import PROCESS_SPAWNS
+from api.policy import kill_process_group, register_process
+from api.user import User
+
+def exit_status(returncode: int) -> int:
+    # signal 로 종료된 프로세스는 쉘과 같이 128 + signal 번호로 변환 ex) SIGKILL(-9) -> 137
+    return 128 - returncode if returncode < 0 else returncode
+
+class Command_External(Command):
+    """
+    파이썬 builtin 으로 구현되지 않은 명령어(ifconfig 등)를 실제 프로세스로 실행
+    """
+    runs_in_event_loop = True
+    changes_unknown_paths = True
+
+    def prepare(self, user: User, command_parts: List[str]):
+        # 현재 디렉토리와 '/' 로 시작하는 인자를 샌드박스 안에서 해석한 실제 디스크 경로로 변환 ex) cat /etc -> temp_root_dir/etc
+        # 외부 프로세스가 접근하는 경로는 알 수 없으므로 스냅샷에서 복원 중인 디렉토리를 모두 생성
+        user.ensure_restored()
+        try:
+            cwd = user.fs.host_path(user.current_dir)
+            if cwd is None:
+                # 메모리 파일 시스템은 디스크에 존재하지 않으므로 외부 프로세스가 접근할 수 없음
+                raise CommandError(f"'{command_parts[0]}' 는 현재 파일 시스템에서 실행할 수 없는 명령어 입니다.")
+            args: List[str] = list(command_parts)
+            for i, part in enumerate(args[1:]):
+                if part.startswith('/'):
+                    args[i + 1] = user.fs.host_path(user.resolve_path(part))
+        except OSError as e:
+            # 심볼릭 링크가 순환하는 경로 등 샌드박스 안에서 해석할 수 없는 경로
+            raise CommandError(f"{command_parts[0]}: {e.filename}: {e.strerror}")
+        return args, cwd
+
+    def spawn(self, user: User, command_parts: List[str], stdin, stderr) -> subprocess.Popen:
+        # stdin 은 이전 프로세스의 stdout 파일 객체, subprocess.PIPE 또는 subprocess.DEVNULL
+        # 시간 제한 초과 시 자식 프로세스까지 함께 종료할 수 있도록 새 세션(프로세스 그룹)으로 실행하고 실행 제한에 등록
+        args, cwd = self.prepare(user, command_parts)
+        try:
+            process = subprocess.Popen(args, stdin=stdin, stdout=subprocess.PIPE, stderr=stderr, cwd=cwd, start_new_session=True)
+        except OSError as e:
+            raise CommandError(f"{command_parts[0]}: {e.strerror}", status=127)
+        PROCESS_SPAWNS.inc(command_parts[0])
+        register_process(process.pid)
+        return process
+
+    async def spawn_async(self, user: User, command_parts: List[str], stderr) -> asyncio.subprocess.Process:
+        args, cwd = self.prepare(user, command_parts)
+        try:
+            process = await asyncio.create_subprocess_exec(*args,
+                                                           stdin=asyncio.subprocess.DEVNULL,
+                                                           stdout=asyncio.subprocess.PIPE,
+                                                           stderr=stderr,
+                                                           cwd=cwd,
+                                                           start_new_session=True,
+                                                           )
+        except OSError as e:
+            raise CommandError(f"{command_parts[0]}: {e.strerror}", status=127)
+        PROCESS_SPAWNS.inc(command_parts[0])
+        register_process(process.pid)
+        return process
+
+    def execute_command(self, user: User, command_parts: List[str], template=None) -> str:
+        return ''.join(self.stream_command(user, command_parts, template))
+
+    def stream_command(self, user: User, command_parts: List[str], template=None, stdin: Optional[Iterator[str]] = None) -> Iterator[str]:
+        # 출력을 한번에 메모리에 읽지 않고 chunk 단위로 전달 (에러 메세지는 임시 파일에 기록한 뒤 실패 시 전달)
+        # execute_command 와 같이 출력 끝의 줄바꿈은 제외
+        with tempfile.TemporaryFile() as stderr:
+            process = self.spawn(user, command_parts, subprocess.DEVNULL, stderr)
+            try:
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+                newlines = ''
+                for chunk in iter(lambda: process.stdout.read1(CHUNK_SIZE), b''):
+                    text = decoder.decode(chunk)
+                    stripped = text.rstrip('\n')
+                    if stripped:
+                        yield newlines + stripped
+                        newlines = ''
+                    newlines += text[len(stripped):]
+                tail = decoder.decode(b'', final=True)
+                if tail:
+                    yield newlines + tail
+            except BaseException:
+                # 출력을 끝까지 읽지 않고 종료된 경우 (ex. 출력 소비자 종료, 실행 제한) 프로세스 종료
+                kill_process_group(process.pid)
+                raise
+            finally:
+                process.stdout.close()
+                process.wait()
+            if process.returncode != 0:
+                stderr.seek(0)
+                raise CommandError(f"Error: {stderr.read().decode(errors='replace')}", status=exit_status(process.returncode))
+
+    async def execute_command_async(self, user: User, command_parts: List[str], template=None) -> str:
+        # 스레드를 점유하지 않고 이벤트 루프에서 프로세스 종료를 기다림
+        process = await self.spawn_async(user, command_parts, asyncio.subprocess.PIPE)
+        try:
+            stdout, stderr = await process.communicate()
+        finally:
+            if process.returncode is None:
+                kill_process_group(process.pid)
+                await process.wait()
+        if process.returncode != 0:
+            raise CommandError(f"Error: {stderr.decode(errors='replace')}", status=exit_status(process.returncode))
+        return stdout.decode(errors='replace').rstrip()
+
+    async def stream_command_async(self, user: User, command_parts: List[str], template=None) -> AsyncIterator[str]:
+        # 터미널과 같이 stderr 를 stdout 에 합쳐서 생성되는 즉시 전달
+        process = await self.spawn_async(user, command_parts, asyncio.subprocess.STDOUT)
+        try:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            while True:
+                chunk = await process.stdout.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+        finally:
+            if process.returncode is None and not process.stdout.at_eof():
+                kill_process_group(process.pid)
+            await process.wait()
+        if process.returncode != 0:
+            # 에러 메세지는 이미 출력으로 전달되었으므로 종료 코드만 전달
+            raise CommandError('', status=exit_status(process.returncode))
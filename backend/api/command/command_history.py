@@ -0,0 +1,26 @@
+from typing import List
+from django.conf import settings
+from api.command.command import Command, CommandError
+from api.history import get_history
+from api.user import User
+
+class Command_HISTORY(Command):
+    def execute_command(self, user: User, command_parts: List[str], template=None) -> str:
+        # history [n]: 최근 n 개(기본 settings.HISTORY_DEFAULT_COUNT)의 명령어를 실행 순서대로 출력
+        if len(command_parts) > 2:
+            raise CommandError("history: 인자가 너무 많습니다")
+        count: int = settings.HISTORY_DEFAULT_COUNT
+        if len(command_parts) == 2:
+            if not command_parts[1].isdigit():
+                raise CommandError(f"history: {command_parts[1]}: 숫자 인자가 필요합니다")
+            count = int(command_parts[1])
+        # 아직 DB 에 저장되지 않은 기록도 버퍼에서 함께 조회
+        # 한 번에 settings.HISTORY_PAGE_SIZE 개까지 조회되므로 count 개를 채우거나 기록이 끝날 때까지 이전 페이지 조회
+        entries = []
+        before = None
+        while len(entries) < count:
+            page, before = get_history(user, before, count - len(entries))
+            entries.extend(page)
+            if before is None:
+                break
+        return '\n'.join(f"{entry.seq:>5}  {entry.command}" for entry in reversed(entries))
@@ -1,24 +1,44 @@
-import os
-import subprocess
+import stat
+import time
 from typing import List
-from api.command.command import Command
+from api.command.command import Command, CommandError, split_options
 from api.user import User
 
 class Command_LS(Command):
+    cacheable = True
+
     def execute_command(self, user: User, command_parts: List[str], template=None) -> str:
-        try:
-            for i, part in enumerate(command_parts[1:]):
-                if part.startswith('/'):
-                    command_parts[i+1] = os.path.join(user.temp_root_dir, os.path.relpath(part, '/'))
+        options, targets = split_options(command_parts)
+        invalid_options = sorted(options - {'a', 'l'})
+        if invalid_options:
+            raise CommandError(f"ls: 잘못된 옵션 -- '{invalid_options[0]}'", status=2)
+        targets = targets or ['.']
+
+        outputs: List[str] = []
+        for target in targets:
+            path = user.resolve_path(target)
+            if not user.fs.exists(path):
+                raise CommandError(f"ls: '{target}'에 접근할 수 없음: 그런 파일이나 디렉터리가 없습니다", status=2)
+            if not user.fs.is_dir(path):
+                outputs.append(self.format_entry(user, path, target, options))
+                continue
+
+            # -a 옵션이 없는 경우 숨김 파일은 제외하고 이름순 정렬
+            names = user.fs.list_dir(path)
+            names = sorted(names + ['.', '..']) if 'a' in options else sorted(name for name in names if not name.startswith('.'))
+            entries = [self.format_entry(user, user.resolve_path(f"{target}/{name}"), name, options) for name in names]
+            if len(targets) > 1:
+                # 여러 경로가 입력된 경우 경로별로 구분하여 출력 ex) dir:\na\nb
+                entries.insert(0, f"{target}:")
+            outputs.append('\n'.join(entries))
 
-            result: subprocess.CompletedProcess = subprocess.run(
-                command_parts,
-                capture_output=True,
-                check=True,
-                text=True,
-            )
+        return '\n\n'.join(outputs)
 
-            return result.stdout.rstrip()
-        
-        except subprocess.CalledProcessError as e:
-            return f"ls: '{command_parts[-1]}'에 접근할 수 없음: 그런 파일이나 디렉터리가 없습니다"
\ No newline at end of file
+    def format_entry(self, user: User, path: str, name: str, options) -> str:
+        if 'l' not in options:
+            return name
+        # ex) drwxr-xr-x tmp tmp   4096 Oct 18 12:00 project
+        file_stat = user.fs.stat(path)
+        mode = stat.filemode(file_stat.mode)
+        mtime = time.strftime('%b %d %H:%M', time.localtime(file_stat.mtime))
+        return f"{mode} {user.username} {user.username} {file_stat.size:>6} {mtime} {name}"
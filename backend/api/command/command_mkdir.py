@@ -1,21 +1,20 @@
-import os
-import subprocess
 from typing import List
-from api.command.command import Command
+from api.command.command import Command, CommandError, split_options
 from api.user import User
 
 class Command_MKDIR(Command):
     def execute_command(self, user: User, command_part: List[str], template=None) -> str:
-        for i, part in enumerate(command_part):
-            if part.startswith('/'):
-                command_part[i] = os.path.join(user.temp_root_dir, os.path.relpath(part, '/'))
-        try:
-            subprocess.run(command_part,
-                           capture_output=True,
-                           text=True,
-                           shell=False
-                           )
-        except Exception as e:
-            return 'Failed to make new directory'
+        options, targets = split_options(command_part)
+        if not targets:
+            raise CommandError("mkdir: 피연산자가 없습니다")
+        for target in targets:
+            try:
+                path = user.resolve_path(target)
+                user.fs.make_dir(path, parents='p' in options)
+            except FileExistsError:
+                raise CommandError(f"mkdir: '{target}' 디렉터리를 만들 수 없습니다: 파일이 있습니다")
+            except OSError:
+                raise CommandError(f"mkdir: '{target}' 디렉터리를 만들 수 없습니다: 그런 파일이나 디렉터리가 없습니다")
+            user.mark_changed(path, is_dir=True)
 
         return 'Made new directory'
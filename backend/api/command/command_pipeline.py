@@ -0,0 +1,225 @@
+import codecs
+import subprocess
+import tempfile
+import threading
+from typing import Iterable, Iterator, List, Optional
+from api.command.command import CHUNK_SIZE, Command, CommandError
+from api.command.command_external import Command_External, exit_status
+from api.command_dict import get_command
+from api.policy import kill_process_group
+from api.shell_parser import Pipeline, SimpleCommand
+from api.user import User
+
+def read_bytes(stream) -> Iterator[bytes]:
+    # 프로세스 출력을 chunk 단위로 읽음 (파일로 redirection 하는 경우 문자열로 변환하지 않음)
+    return iter(lambda: stream.read1(CHUNK_SIZE), b'')
+
+def read_text(stream) -> Iterator[str]:
+    # 프로세스 출력을 chunk 단위로 읽어서 문자열로 변환 (chunk 경계에서 utf-8 문자가 잘리지 않도록 incremental decoder 사용)
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    for chunk in read_bytes(stream):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+def terminate_line(chunks: Iterable[str]) -> Iterator[str]:
+    # builtin 명령어의 출력은 줄바꿈으로 끝나지 않으므로 파이프/파일로 전달할 때는 마지막 줄바꿈 추가 (echo hi > a -> 'hi\n')
+    last = ''
+    for chunk in chunks:
+        if chunk:
+            last = chunk
+            yield chunk
+    if last and not last.endswith('\n'):
+        yield '\n'
+
+class Stage:
+    """
+    파이프라인의 명령어 하나의 실행 상태
+
+    Attributes
+    ----------
+    chunks : Optional[Iterator[str]]
+        builtin 명령어의 출력 generator (다음 명령어가 소비)
+    process : Optional[subprocess.Popen]
+        외부 명령어 프로세스
+    status : int
+        종료 코드
+    """
+    __slots__ = ('chunks', 'process', 'stderr', 'feeder', 'status')
+
+    def __init__(self):
+        self.chunks: Optional[Iterator[str]] = None
+        self.process: Optional[subprocess.Popen] = None
+        self.stderr = None
+        self.feeder: Optional[threading.Thread] = None
+        self.status: int = 0
+
+class Command_Pipeline(Command):
+    """
+    '|' 로 연결된 명령어와 출력 redirection('>', '>>') 실행
+
+    builtin 명령어끼리는 출력 chunk generator 를 그대로 다음 명령어의 입력으로 전달하고,
+    연속된 외부 명령어는 OS pipe 로 직접 연결하여 출력이 파이썬을 거치지 않음
+    모든 단계가 chunk 단위로 동작하므로 출력 크기와 관계없이 메모리 사용량이 일정함
+    에러 메세지(stderr)는 파이프로 전달하지 않고 마지막에 출력하며, 종료 코드는 마지막 명령어 기준 (bash 와 동일)
+    """
+    def __init__(self, pipeline: Pipeline, allowed_commands):
+        self.pipeline: Pipeline = pipeline
+        self.allowed_commands = allowed_commands
+        # 외부 명령어가 포함된 파이프라인만 변경한 경로를 알 수 없음 (redirection 은 직접 알림)
+        self.changes_unknown_paths = any(get_command(command.args[0]).changes_unknown_paths for command in pipeline.commands)
+
+    def execute_command(self, user: User, command_parts: List[str], template=None) -> str:
+        chunks: List[str] = []
+        try:
+            for chunk in self.stream_command(user, command_parts, template):
+                chunks.append(chunk)
+        except CommandError as e:
+            raise CommandError(''.join(chunks) + e.message, e.status)
+        return ''.join(chunks)
+
+    def stream_command(self, user: User, command_parts: List[str], template=None, stdin: Optional[Iterator[str]] = None) -> Iterator[str]:
+        for command in self.pipeline.commands:
+            if command.args[0] not in self.allowed_commands:
+                raise CommandError(f"'{command.args[0]}' 는 지원하지 않는 명령어 입니다.", status=127)
+
+        stages: List[Stage] = []
+        errors: List[str] = []
+        last_chunk = ''
+        try:
+            previous: Optional[Stage] = None
+            for index, command in enumerate(self.pipeline.commands):
+                piped = index < len(self.pipeline.commands) - 1
+                previous = self.start_stage(user, command, previous, piped, template, errors)
+                stages.append(previous)
+
+            if previous.process is not None:
+                output = read_text(previous.process.stdout)
+            else:
+                output = previous.chunks or iter(())
+            for chunk in output:
+                last_chunk = chunk
+                yield chunk
+            self.finish(stages, errors)
+        finally:
+            self.cleanup(stages)
+
+        if errors:
+            message = '\n'.join(error.rstrip('\n') for error in errors if error)
+            if message:
+                yield ('\n' if last_chunk and not last_chunk.endswith('\n') else '') + message
+        if stages[-1].status != 0:
+            raise CommandError('', stages[-1].status)
+
+    def guard(self, chunks: Iterable[str], stage: Stage, errors: List[str]) -> Iterator[str]:
+        # builtin 명령어의 에러는 다음 명령어로 전파하지 않고 기록한 뒤 출력 종료 (EOF) 로 처리
+        try:
+            yield from chunks
+        except CommandError as e:
+            errors.append(e.message)
+            stage.status = e.status
+
+    def start_stage(self, user: User, command: SimpleCommand, previous: Optional[Stage], piped: bool, template, errors: List[str]) -> Stage:
+        stage = Stage()
+        command_parts = list(command.args)
+        target = None
+        try:
+            # 명령어 실행 전에 모든 redirection 파일을 생성/초기화하고, 출력은 마지막 파일에만 기록 (bash 와 동일)
+            for redirect in command.redirects:
+                target = user.resolve_path(redirect.target)
+                try:
+                    user.fs.write_file(target, (), append=redirect.op == '>>')
+                except IsADirectoryError:
+                    raise CommandError(f"{redirect.target}: 디렉터리입니다")
+                except OSError:
+                    raise CommandError(f"{redirect.target}: 그런 파일이나 디렉터리가 없습니다")
+                user.mark_changed(target, is_dir=False)
+
+            executor = get_command(command_parts[0])
+            if isinstance(executor, Command_External):
+                stage.stderr = tempfile.TemporaryFile()
+                if previous is not None and previous.process is not None:
+                    stage.process = executor.spawn(user, command_parts, previous.process.stdout, stage.stderr)
+                    # 다음 프로세스가 pipe 를 소유하도록 부모 프로세스의 fd 는 닫음 (먼저 종료된 쪽이 SIGPIPE/EOF 를 받도록)
+                    previous.process.stdout.close()
+                elif previous is not None and previous.chunks is not None:
+                    stage.process = executor.spawn(user, command_parts, subprocess.PIPE, stage.stderr)
+                    stage.feeder = threading.Thread(target=self.feed, args=(stage.process, previous.chunks),
+                                                    name='pipeline-feeder', daemon=True)
+                    stage.feeder.start()
+                else:
+                    stage.process = executor.spawn(user, command_parts, subprocess.DEVNULL, stage.stderr)
+                if target is not None:
+                    user.fs.write_file(target, read_bytes(stage.process.stdout), append=True)
+            else:
+                if previous is None:
+                    stdin = None
+                elif previous.process is not None:
+                    stdin = read_text(previous.process.stdout)
+                else:
+                    stdin = previous.chunks or iter(())
+                chunks = self.guard(executor.stream_command(user, command_parts, template, stdin), stage, errors)
+                if piped or target is not None:
+                    chunks = terminate_line(chunks)
+                if target is not None:
+                    user.fs.write_file(target, (chunk.encode('utf-8') for chunk in chunks), append=True)
+                else:
+                    stage.chunks = chunks
+        except CommandError as e:
+            errors.append(e.message)
+            stage.status = e.status
+        except OSError as e:
+            errors.append(f"{command_parts[0]}: {e.strerror}")
+            stage.status = 1
+        return stage
+
+    def feed(self, process: subprocess.Popen, chunks: Iterable[str]) -> None:
+        # builtin 명령어의 출력을 외부 프로세스의 stdin 으로 전달 (프로세스가 먼저 종료되면 중단)
+        try:
+            for chunk in chunks:
+                process.stdin.write(chunk.encode('utf-8'))
+        except (BrokenPipeError, ValueError):
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    def finish(self, stages: List[Stage], errors: List[str]) -> None:
+        # 마지막 명령어부터 역순으로 정리하여 하나의 출력을 두 스레드가 동시에 읽지 않도록 함
+        # (각 단계의 출력을 소비하는 다음 단계가 먼저 정리됨)
+        for stage in reversed(stages):
+            # 다음 명령어가 입력을 읽지 않은 builtin 명령어도 끝까지 실행 (ex. mkdir a | echo b)
+            if stage.chunks is not None:
+                for _ in stage.chunks:
+                    pass
+            if stage.process is not None:
+                # 다음 명령어가 더 이상 읽지 않는 pipe 는 닫아서 프로세스가 SIGPIPE 로 종료되도록 함 (ex. yes | echo b)
+                stage.process.stdout.close()
+                if stage.feeder is not None:
+                    stage.feeder.join()
+                stage.status = exit_status(stage.process.wait())
+        for stage in stages:
+            if stage.process is not None:
+                stage.stderr.seek(0)
+                errors.append(stage.stderr.read().decode('utf-8', errors='replace'))
+
+    def cleanup(self, stages: List[Stage]) -> None:
+        # 출력을 끝까지 읽지 않고 종료된 경우 (ex. 웹소켓 연결 종료) 남아있는 프로세스 정리
+        for stage in stages:
+            if stage.process is not None:
+                if stage.process.poll() is None:
+                    kill_process_group(stage.process.pid)
+                stage.process.wait()
+                for stream in (stage.process.stdin, stage.process.stdout):
+                    if stream is not None:
+                        try:
+                            stream.close()
+                        except OSError:
+                            pass
+            if stage.stderr is not None:
+                stage.stderr.close()
@@ -0,0 +1,17 @@
+from typing import List
+from api.command.command import Command, CommandError, split_options
+from api.user import User
+
+class Command_TOUCH(Command):
+    def execute_command(self, user: User, command_parts: List[str], template=None) -> str:
+        _, targets = split_options(command_parts)
+        if not targets:
+            raise CommandError("touch: 파일 피연산자가 없습니다")
+        for target in targets:
+            try:
+                path = user.resolve_path(target)
+                user.fs.touch(path)
+            except OSError:
+                raise CommandError(f"touch: '{target}'을(를) touch 할 수 없음: 그런 파일이나 디렉터리가 없습니다")
+            user.mark_changed(path, is_dir=False)
+        return ''
@@ -1,11 +1,31 @@
+from api.command.command import Command
+from api.command.command_cat import Command_CAT
 from api.command.command_cd import Command_CD
+from api.command.command_echo import Command_ECHO
+from api.command.command_external import Command_External
+from api.command.command_history import Command_HISTORY
 from api.command.command_mkdir import Command_MKDIR
 from api.command.command_pwd import Command_PWD
 from api.command.command_ls import Command_LS
+from api.command.command_touch import Command_TOUCH
 
+# 파이썬으로 직접 구현된 builtin 명령어 (프로세스를 생성하지 않음)
 COMMAND_DICT = {
     'cd': Command_CD(),
     'pwd': Command_PWD(),
     'mkdir': Command_MKDIR(),
     'ls': Command_LS(),
-}
\ No newline at end of file
+    'touch': Command_TOUCH(),
+    'echo': Command_ECHO(),
+    'cat': Command_CAT(),
+    'history': Command_HISTORY(),
+}
+
+# builtin 으로 구현되지 않은 명령어는 subprocess 로 실행
+EXTERNAL_COMMAND = Command_External()
+
+def get_command(command_name: str) -> Command:
+    return COMMAND_DICT.get(command_name, EXTERNAL_COMMAND)
+
+def is_builtin(command_name: str) -> bool:
+    return command_name in COMMAND_DICT
@@ -1,15 +1,431 @@
-from typing import List
-from VirtualTerminal import settings
-from api.command.command import Command
+import asyncio
+import time
+from contextlib import aclosing, closing
+from typing import AsyncIterator, List, Optional, Tuple
+from django.conf import settings
+from api.command.command import Command, CommandError
+from api.command.command_pipeline import Command_Pipeline
+from api.command_dict import get_command
+from api.executor import COMMAND_EXECUTOR
+from api.history import HISTORY
+from api.metrics import COMMAND_CACHE, COMMAND_ERRORS, COMMAND_LIMITS, COMMAND_SECONDS
+from api.output import OutputBuffer, get_page
+from api.policy import EXECUTION_POLICY, TIMEOUT_STATUS, Execution
+from api.shell_parser import CommandLine, ParseError, Pipeline, parse
+from api.user import User
+
+# 구문 오류 종료 코드 (bash 와 동일)
+SYNTAX_ERROR_STATUS: int = 2
+
+class CommandResult:
+    """
+    명령어 실행 결과
+
+    Attributes
+    ----------
+    output : str
+        출력 문자열 또는 에러 메세지 (settings.OUTPUT_PAGE_BYTES 를 초과하면 첫 페이지만 포함)
+    status : int
+        종료 코드 (0: 성공, 127: 지원하지 않는 명령어)
+    elapsed : float
+        실행 시간 (초)
+    output_id : Optional[str]
+        출력이 한 페이지를 초과한 경우 나머지 페이지를 조회할 출력 id (get-output/)
+    next_cursor : Optional[int]
+        다음 페이지 cursor (마지막 페이지이면 None)
+    limit : Optional[str]
+        실행 제한을 초과하여 중단된 경우 제한 종류 ('timeout', 'cpu', 'output')
+    output_bytes : int
+        전체 출력 크기 (바이트, 첫 페이지만 포함된 경우에도 전체 크기)
+    """
+    __slots__ = ('output', 'status', 'elapsed', 'output_id', 'next_cursor', 'limit', 'output_bytes')
+
+    def __init__(self, output: str, status: int = 0, elapsed: float = 0.0, limit: Optional[str] = None):
+        self.output: str = output
+        self.status: int = status
+        self.elapsed: float = elapsed
+        self.output_id: Optional[str] = None
+        self.next_cursor: Optional[int] = None
+        self.limit: Optional[str] = limit
+        self.output_bytes: int = 0
+
+    @classmethod
+    def from_buffer(cls, user: User, buffer: OutputBuffer, status: int, elapsed: float, limit: Optional[str] = None) -> 'CommandResult':
+        # 한 페이지를 초과한 출력은 세션의 출력 저장소에 보관하고 첫 페이지만 응답에 포함
+        data = buffer.getvalue()
+        if len(data) <= settings.OUTPUT_PAGE_BYTES:
+            result = cls(data.decode('utf-8'), status, elapsed, limit)
+        else:
+            output, next_cursor = get_page(data, 0, settings.OUTPUT_PAGE_BYTES)
+            result = cls(output, status, elapsed, limit)
+            result.output_id = user.outputs.put(data)
+            result.next_cursor = next_cursor
+        result.output_bytes = len(data)
+        return result
+
+    def to_dict(self) -> dict:
+        result = {'output': self.output, 'status': self.status, 'elapsed': self.elapsed}
+        if self.output_id is not None:
+            result['output_id'] = self.output_id
+            result['next_cursor'] = self.next_cursor
+        if self.limit is not None:
+            result['limit'] = self.limit
+        return result
 
 class Command_Exec:
     command: Command
+    # stream_async 로 실행한 명령어의 종료 코드
+    status: int
+    # 실행 제한을 초과하여 중단된 경우 제한 종류 ('timeout', 'cpu', 'output')
+    limit: Optional[str]
 
     def __init__(self, command):
         self.command = command
+        self.status = 0
+        self.limit = None
+
+    def execute(self, user: User, command_parts: List[str], allowed_commands: List[str], template=None):
+        return self.run(user, command_parts, allowed_commands, template).output
+
+    def run(self, user: User, command_parts: List[str], allowed_commands: List[str], template=None) -> CommandResult:
+        started: float = time.perf_counter()
+        buffer = OutputBuffer(EXECUTION_POLICY.max_output_bytes)
+        status = self.capture(user, command_parts, allowed_commands, template, buffer)
+        return CommandResult.from_buffer(user, buffer, status, time.perf_counter() - started, self.limit)
+
+    def capture(self, user: User, command_parts: List[str], allowed_commands: List[str], template, buffer: OutputBuffer) -> int:
+        """
+        명령어를 실행 제한(EXECUTION_POLICY)을 적용하여 실행하고 출력을 buffer 에 기록
+
+        출력 전체를 문자열로 만들지 않고 chunk 단위로 buffer 에 기록하므로 메모리 사용량은 buffer 크기로 제한됨
+        시간 제한이나 출력 제한을 초과하면 명령어 generator 를 닫아서 실행 중인 프로세스를 종료함
+
+        Returns
+        -------
+        int
+            종료 코드 (시간 제한 초과 시 124)
+        """
+        if command_parts[0] not in allowed_commands:
+            # 지원하지 않는 명령어 이름은 label 로 사용하지 않음 (사용자 입력으로 metric 이 무한히 늘어나지 않도록)
+            COMMAND_ERRORS.inc('unsupported')
+            buffer.write(f"'{command_parts[0]}' 는 지원하지 않는 명령어 입니다.")
+            return 127
+        status = 0
+        with user.lock:
+            user.check_open()
+            user.mount_template(template)
+            started: float = time.perf_counter()
+            key, cached = self.lookup(user, command_parts)
+            if cached is not None:
+                buffer.write(cached)
+                self.record(command_parts, status, time.perf_counter() - started)
+                return status
+            chunks: Optional[List[str]] = [] if key is not None else None
+            with EXECUTION_POLICY.watch() as execution:
+                try:
+                    with closing(self.command.stream_command(user, command_parts, template)) as stream:
+                        for chunk in stream:
+                            buffer.write(chunk)
+                            if chunks is not None:
+                                chunks.append(chunk)
+                            if buffer.dropped:
+                                execution.stop('output')
+                            if execution.reason is not None or execution.expired():
+                                break
+                except CommandError as e:
+                    status = e.status
+                    self.write_error(execution, e, buffer)
+            if self.command.changes_unknown_paths:
+                # 같은 명령어 줄의 다음 명령어가 이전 세대의 캐시 결과를 사용하지 않도록 실행 직후 알림
+                user.mark_changed()
+            status = self.check_limit(execution, status, buffer)
+            self.store(user, key, chunks, status)
+            self.record(command_parts, status, time.perf_counter() - started)
+        return status
+
+    def lookup(self, user: User, command_parts: List[str]) -> Tuple[Optional[tuple], Optional[str]]:
+        """
+        읽기 전용 명령어(Command.cacheable)의 캐시 key 와 저장된 출력 반환
+
+        Returns
+        -------
+        Tuple[Optional[tuple], Optional[str]]
+            캐시 key (캐시하지 않는 명령어이면 None) 와 저장된 출력 (없으면 None)
+        """
+        # 스냅샷에서 복원 중인 세션은 명령어가 접근할 때 디렉토리가 생성되어 출력이 바뀔 수 있으므로 캐시하지 않음
+        if not self.command.cacheable or user.restore is not None:
+            return None, None
+        key = (tuple(command_parts), user.current_dir, user.generation)
+        output = user.results.get(key)
+        COMMAND_CACHE.inc('miss' if output is None else 'hit')
+        return key, output
+
+    def store(self, user: User, key: Optional[tuple], chunks: Optional[List[str]], status: int) -> None:
+        # 성공한 출력만 저장 (에러와 실행 제한으로 중단된 출력은 다음 실행에서 다시 계산)
+        if key is not None and status == 0 and self.limit is None:
+            user.results.put(key, ''.join(chunks))
+
+    def record(self, command_parts: List[str], status: int, elapsed: float) -> None:
+        # 명령어 이름별 실행 시간과 에러 수 기록 (파이프라인/redirection 은 'pipeline' 으로 묶어서 기록)
+        name = 'pipeline' if isinstance(self.command, Command_Pipeline) else command_parts[0]
+        COMMAND_SECONDS.observe(elapsed, name)
+        if status != 0:
+            COMMAND_ERRORS.inc(name)
+        if self.limit is not None:
+            COMMAND_LIMITS.inc(self.limit)
+
+    def write_error(self, execution: Execution, error: CommandError, buffer: OutputBuffer) -> None:
+        # 실행 제한으로 종료된 프로세스의 에러 메세지는 제외하고 제한 안내 메세지만 출력
+        execution.check_status(error.status)
+        if execution.reason is None:
+            buffer.write(error.message)
 
-    def execute(self, command_parts: List[str], allowed_commands: List[str], template=None):
+    def check_limit(self, execution: Execution, status: int, buffer: OutputBuffer) -> int:
+        # 제한을 초과한 경우 출력 끝에 안내 메세지를 추가하고 제한 종류를 기록
+        execution.check_status(status)
+        if execution.reason is None:
+            return status
+        self.limit = execution.reason
+        buffer.note(execution.message())
+        return TIMEOUT_STATUS if execution.reason == 'timeout' else status
+
+    async def execute_async(self, user: User, command_parts: List[str], allowed_commands: List[str], template=None):
+        return (await self.run_async(user, command_parts, allowed_commands, template)).output
+
+    async def run_async(self, user: User, command_parts: List[str], allowed_commands: List[str], template=None) -> CommandResult:
+        started: float = time.perf_counter()
+        buffer = OutputBuffer(EXECUTION_POLICY.max_output_bytes)
+        status = await self.capture_async(user, command_parts, allowed_commands, template, buffer)
+        return CommandResult.from_buffer(user, buffer, status, time.perf_counter() - started, self.limit)
+
+    async def capture_async(self, user: User, command_parts: List[str], allowed_commands: List[str], template, buffer: OutputBuffer) -> int:
         if command_parts[0] not in allowed_commands:
-            return f"'{command_parts[0]}' 는 지원하지 않는 명령어 입니다."
-        user = settings.get_user_instance()
-        return self.command.execute_command(user, command_parts, template)
\ No newline at end of file
+            COMMAND_ERRORS.inc('unsupported')
+            buffer.write(f"'{command_parts[0]}' 는 지원하지 않는 명령어 입니다.")
+            return 127
+        if not self.command.runs_in_event_loop:
+            # 블로킹 명령어는 스레드 풀에서 실행
+            return await asyncio.get_running_loop().run_in_executor(
+                COMMAND_EXECUTOR, self.capture, user, command_parts, allowed_commands, template, buffer)
+
+        await self.mount_template_async(user, template)
+        # 같은 세션의 다른 명령어(HTTP 요청, 웹소켓)와 동시에 실행되지 않도록 명령어가 끝날 때까지 user.lock 유지
+        async with user.hold_lock_async():
+            # 마운트한 뒤 lock 을 얻기 전에 다른 템플릿이 마운트된 경우에만 다시 마운트
+            user.mount_template(template)
+            status = 0
+            started: float = time.perf_counter()
+            with EXECUTION_POLICY.watch() as execution:
+                try:
+                    async with aclosing(self.command.stream_command_async(user, command_parts, template)) as stream:
+                        async for chunk in stream:
+                            buffer.write(chunk)
+                            if buffer.dropped:
+                                execution.stop('output')
+                            if execution.reason is not None or execution.expired():
+                                break
+                except CommandError as e:
+                    status = e.status
+                    self.write_error(execution, e, buffer)
+            if self.command.changes_unknown_paths:
+                user.mark_changed()
+            status = self.check_limit(execution, status, buffer)
+            self.record(command_parts, status, time.perf_counter() - started)
+        return status
+
+    async def stream_async(self, user: User, command_parts: List[str], allowed_commands: List[str], template=None) -> AsyncIterator[str]:
+        # 명령어 출력을 생성되는 즉시 chunk 단위로 반환 (웹소켓 터미널에서 사용)
+        if command_parts[0] not in allowed_commands:
+            COMMAND_ERRORS.inc('unsupported')
+            self.status = 127
+            yield f"'{command_parts[0]}' 는 지원하지 않는 명령어 입니다."
+            return
+        await self.mount_template_async(user, template)
+        if not self.command.runs_in_event_loop:
+            # 스레드에서 실행되는 명령어는 Command.stream_command_async 가 스레드에서 user.lock 을 얻음
+            async with aclosing(self.stream_output(user, command_parts, template)) as stream:
+                async for chunk in stream:
+                    yield chunk
+            return
+        # 이벤트 루프에서 실행되는 명령어는 캐시 조회부터 저장까지 user.lock 을 유지 (capture_async 와 같음)
+        async with user.hold_lock_async():
+            user.mount_template(template)
+            async with aclosing(self.stream_output(user, command_parts, template)) as stream:
+                async for chunk in stream:
+                    yield chunk
+
+    async def stream_output(self, user: User, command_parts: List[str], template) -> AsyncIterator[str]:
+        started: float = time.perf_counter()
+        key, cached = self.lookup(user, command_parts)
+        if cached is not None:
+            self.record(command_parts, self.status, time.perf_counter() - started)
+            yield cached
+            return
+        chunks: Optional[List[str]] = [] if key is not None else None
+        sent = 0
+        last_chunk = ''
+        with EXECUTION_POLICY.watch() as execution:
+            try:
+                # 중간에 종료된 경우에도 명령어 generator 가 바로 정리되도록 aclosing 사용
+                async with aclosing(self.command.stream_command_async(user, command_parts, template)) as stream:
+                    async for chunk in stream:
+                        sent += len(chunk.encode('utf-8'))
+                        if sent > EXECUTION_POLICY.max_output_bytes:
+                            execution.stop('output')
+                            break
+                        if chunks is not None:
+                            chunks.append(chunk)
+                        yield chunk
+                        last_chunk = chunk
+                        if execution.expired():
+                            break
+            except CommandError as e:
+                self.status = e.status
+                execution.check_status(e.status)
+                if e.message and execution.reason is None:
+                    yield e.message
+            finally:
+                # 연결이 끊겨 중간에 종료된 경우에도 외부 명령어가 변경했을 수 있는 상태는 무효화
+                if self.command.changes_unknown_paths:
+                    user.mark_changed()
+        execution.check_status(self.status)
+        if execution.reason is not None:
+            self.limit = execution.reason
+            if execution.reason == 'timeout':
+                self.status = TIMEOUT_STATUS
+        self.store(user, key, chunks, self.status)
+        self.record(command_parts, self.status, time.perf_counter() - started)
+        if self.limit is not None:
+            yield ('\n' if last_chunk and not last_chunk.endswith('\n') else '') + execution.message()
+
+    async def mount_template_async(self, user: User, template) -> None:
+        # 디스크 파일 시스템의 템플릿 마운트는 블로킹 작업이므로 스레드 풀에서 실행
+        if template is None or template is user.template:
+            return
+
+        def mount() -> None:
+            with user.lock:
+                user.check_open()
+                user.mount_template(template)
+        await asyncio.get_running_loop().run_in_executor(COMMAND_EXECUTOR, mount)
+
+def parse_line(line: str) -> CommandLine:
+    try:
+        return parse(line)
+    except ParseError as e:
+        raise CommandError(f"구문 오류: {e}", status=SYNTAX_ERROR_STATUS)
+
+def get_command_exec(pipeline: Pipeline, allowed_commands: List[str]):
+    """
+    Pipeline 을 실행할 Command_Exec 과 명령어 인자 반환
+
+    redirection 이 없는 단일 명령어는 명령어를 직접 실행하고, 파이프/redirection 이 있는 경우에만 Command_Pipeline 으로 실행
+    (파싱 결과는 캐시에서 공유되므로 명령어에는 복사한 리스트를 전달)
+    """
+    command_parts = list(pipeline.commands[0].args)
+    if len(pipeline.commands) == 1 and not pipeline.commands[0].redirects:
+        return Command_Exec(get_command(command_parts[0])), command_parts
+    return Command_Exec(Command_Pipeline(pipeline, allowed_commands)), command_parts
+
+def execute_line(user: User, line: str, allowed_commands: List[str], template=None) -> CommandResult:
+    """
+    명령어 줄(';', '&&', '|', '>', '>>' 포함)을 실행하고 결과 반환
+
+    Parameters
+    ----------
+    user : User
+        명령어를 실행하는 사용자
+    line : str
+        사용자가 입력한 명령어 줄
+    allowed_commands : List[str]
+        허용된 명령어 리스트
+    template : Optional[ProblemTemplate]
+        홈 디렉토리에 마운트할 템플릿
+
+    Returns
+    -------
+    CommandResult
+        명령어 출력을 줄바꿈으로 구분하여 합친 결과 (종료 코드는 마지막으로 실행된 명령어 기준)
+    """
+    started: float = time.perf_counter()
+    buffer = OutputBuffer(EXECUTION_POLICY.max_output_bytes)
+    status = 0
+    limit: Optional[str] = None
+    try:
+        for separator, pipeline in parse_line(line).items:
+            if separator == '&&' and status != 0:
+                continue
+            command_exec, command_parts = get_command_exec(pipeline, allowed_commands)
+            buffer.separate()
+            status = command_exec.capture(user, command_parts, allowed_commands, template, buffer)
+            if command_exec.limit is not None:
+                # 실행 제한을 초과한 경우 나머지 명령어는 실행하지 않음
+                limit = command_exec.limit
+                break
+    except CommandError as e:
+        buffer.write(e.message)
+        status = e.status
+    result = CommandResult.from_buffer(user, buffer, status, time.perf_counter() - started, limit)
+    # 기록은 버퍼에만 추가하고 DB 저장은 백그라운드 스레드에서 모아서 처리
+    HISTORY.record(user, line, result.status, result.elapsed, result.output_bytes)
+    return result
+
+async def execute_line_async(user: User, line: str, allowed_commands: List[str], template=None) -> CommandResult:
+    started: float = time.perf_counter()
+    buffer = OutputBuffer(EXECUTION_POLICY.max_output_bytes)
+    status = 0
+    limit: Optional[str] = None
+    try:
+        for separator, pipeline in parse_line(line).items:
+            if separator == '&&' and status != 0:
+                continue
+            command_exec, command_parts = get_command_exec(pipeline, allowed_commands)
+            buffer.separate()
+            status = await command_exec.capture_async(user, command_parts, allowed_commands, template, buffer)
+            if command_exec.limit is not None:
+                limit = command_exec.limit
+                break
+    except CommandError as e:
+        buffer.write(e.message)
+        status = e.status
+    result = CommandResult.from_buffer(user, buffer, status, time.perf_counter() - started, limit)
+    HISTORY.record(user, line, result.status, result.elapsed, result.output_bytes)
+    return result
+
+async def stream_line_async(user: User, line: str, allowed_commands: List[str], template=None) -> AsyncIterator[str]:
+    # 명령어 사이에는 이전 출력이 줄바꿈으로 끝나지 않은 경우에만 줄바꿈 추가 (OutputBuffer.separate 와 같은 형식)
+    started: float = time.perf_counter()
+    last_chunk = ''
+    status = 0
+    sent = 0
+    try:
+        for separator, pipeline in parse_line(line).items:
+            if separator == '&&' and status != 0:
+                continue
+            command_exec, command_parts = get_command_exec(pipeline, allowed_commands)
+            newline = bool(last_chunk) and not last_chunk.endswith('\n')
+            async with aclosing(command_exec.stream_async(user, command_parts, allowed_commands, template)) as stream:
+                async for chunk in stream:
+                    if not chunk:
+                        continue
+                    if newline:
+                        newline = False
+                        sent += 1
+                        yield '\n'
+                    sent += len(chunk.encode('utf-8'))
+                    yield chunk
+                    last_chunk = chunk
+            status = command_exec.status
+            if command_exec.limit is not None:
+                return
+    except CommandError as e:
+        status = e.status
+        if last_chunk and not last_chunk.endswith('\n'):
+            sent += 1
+            yield '\n'
+        sent += len(e.message.encode('utf-8'))
+        yield e.message
+    finally:
+        # 연결이 끊겨 중간에 종료된 경우에도 그때까지 전송한 출력 크기로 기록 (실행 전에 삭제/보관된 세션은 기록하지 않음)
+        if not user.closed:
+            HISTORY.record(user, line, status, time.perf_counter() - started, sent)
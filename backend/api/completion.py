@@ -0,0 +1,198 @@
+import bisect
+import itertools
+import posixpath
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Set, Tuple
+from django.conf import settings
+from api.filesystem.filesystem import FileSystem
+
+# 디렉토리 수정 시간이 목록을 읽은 시간과 이 시간(초) 이내이면 같은 시각에 다른 변경이 있었을 수 있으므로 다음 조회에서 다시 읽음
+# (파일 시스템의 수정 시간은 커널 tick 단위로 기록되어 같은 tick 안의 변경은 수정 시간이 같음)
+RACY_WINDOW: float = 0.05
+
+# 명령어 위치를 나타내는 연산자 (다음 단어는 명령어 이름)
+COMMAND_SEPARATORS: Tuple[str, ...] = ('|', ';', '&&')
+# 단어를 구분하는 문자 (공백과 연산자)
+WORD_BREAKS: str = ' \t|;&><'
+
+class DirEntry:
+    """
+    인덱스에 보관하는 디렉토리 하나의 항목 목록
+
+    Attributes
+    ----------
+    names : List[str]
+        정렬된 항목 이름 (prefix 조회는 bisect)
+    dirs : Set[str]
+        하위 디렉토리 이름
+    mtime : float
+        목록을 읽거나 갱신한 시점의 디렉토리 수정 시간
+    racy : bool
+        목록을 읽은 시점과 수정 시간이 가까워 다음 조회에서 다시 읽어야 하는지 여부
+    """
+    __slots__ = ('names', 'dirs', 'mtime', 'racy')
+
+    def __init__(self, names: List[str], dirs: Set[str], mtime: float, racy: bool):
+        self.names: List[str] = names
+        self.dirs: Set[str] = dirs
+        self.mtime: float = mtime
+        self.racy: bool = racy
+
+class DirectoryIndex:
+    """
+    세션별 디렉토리 항목 인덱스 (탭 자동 완성)
+
+    디렉토리를 처음 조회할 때 한번 읽어서 정렬된 이름 목록으로 보관하고,
+    명령어 계층에서 mkdir/touch/redirection 으로 생성한 항목은 add() 로 목록에 바로 추가하여 다시 읽지 않음
+    외부 명령어(rm, mv 등)의 변경은 디렉토리 수정 시간으로 확인하여 변경된 디렉토리만 다시 읽음
+    최근 조회한 max_dirs 개의 디렉토리만 보관
+
+    Methods
+    -------
+    complete(path: str, prefix: str, limit: int) -> List[Tuple[str, bool]]
+        디렉토리에서 prefix 로 시작하는 (이름, 디렉토리 여부) 목록 (prefix 가 '.' 으로 시작하지 않으면 숨김 파일 제외)
+    load(path: str)
+        디렉토리 목록을 인덱스에 추가 (cd 로 이동한 디렉토리를 미리 읽음)
+    add(path: str, is_dir: bool)
+        새로 생성된 경로를 인덱스에 추가 (mkdir -p 로 생성된 중간 디렉토리 포함)
+    clear()
+        인덱스 삭제 (템플릿 마운트 등 홈 디렉토리 전체가 바뀐 경우)
+    """
+    def __init__(self, fs: FileSystem, max_dirs: int):
+        self.fs: FileSystem = fs
+        self.max_dirs: int = max_dirs
+        self._dirs: 'OrderedDict[str, DirEntry]' = OrderedDict()
+        # 명령어 실행 중에도 자동 완성 요청을 처리할 수 있도록 세션 lock 과 별도로 보호
+        self._lock = threading.Lock()
+
+    def complete(self, path: str, prefix: str, limit: int) -> List[Tuple[str, bool]]:
+        entry = self._entry(path)
+        if entry is None:
+            return []
+        with self._lock:
+            names = entry.names
+            start = bisect.bisect_left(names, prefix)
+            # 숨김 파일은 '.' 을 입력한 경우에만 자동 완성 (제외한 뒤 limit 개를 채움)
+            show_hidden = prefix.startswith('.')
+            matches: List[Tuple[str, bool]] = []
+            for name in itertools.islice(names, start, None):
+                if not name.startswith(prefix) or len(matches) >= limit:
+                    break
+                if name.startswith('.') and not show_hidden:
+                    continue
+                matches.append((name, name in entry.dirs))
+        return matches
+
+    def load(self, path: str) -> None:
+        self._entry(path)
+
+    def add(self, path: str, is_dir: bool) -> None:
+        parts = [part for part in path.split('/') if part]
+        with self._lock:
+            for i, name in enumerate(parts):
+                entry = self._dirs.get('/' + '/'.join(parts[:i]))
+                if entry is None:
+                    continue
+                last = i == len(parts) - 1
+                index = bisect.bisect_left(entry.names, name)
+                if index == len(entry.names) or entry.names[index] != name:
+                    entry.names.insert(index, name)
+                if is_dir or not last:
+                    entry.dirs.add(name)
+                # 직접 변경한 디렉토리는 다시 읽지 않도록 변경 후의 수정 시간으로 갱신
+                entry.mtime = self._mtime('/' + '/'.join(parts[:i]))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._dirs.clear()
+
+    def _entry(self, path: str) -> Optional[DirEntry]:
+        mtime = self._mtime(path)
+        if mtime is None:
+            return None
+        with self._lock:
+            entry = self._dirs.get(path)
+            if entry is not None and not entry.racy and entry.mtime == mtime:
+                self._dirs.move_to_end(path)
+                return entry
+        # 처음 조회하거나 외부 명령어로 변경된 디렉토리만 다시 읽음
+        scanned_at = time.time()
+        try:
+            names = sorted(self.fs.list_dir(path))
+        except OSError:
+            return None
+        dirs = {name for name in names if self.fs.is_dir(posixpath.join(path, name))}
+        entry = DirEntry(names, dirs, mtime, scanned_at - mtime < RACY_WINDOW)
+        with self._lock:
+            self._dirs[path] = entry
+            self._dirs.move_to_end(path)
+            while len(self._dirs) > self.max_dirs:
+                self._dirs.popitem(last=False)
+        return entry
+
+    def _mtime(self, path: str) -> Optional[float]:
+        try:
+            stat = self.fs.stat(path)
+        except OSError:
+            return None
+        return stat.mtime if stat.is_dir else None
+
+@lru_cache(maxsize=64)
+def sorted_commands(allowed_commands: FrozenSet[str]) -> Tuple[str, ...]:
+    # 문제마다 허용된 명령어 집합은 바뀌지 않으므로 정렬 결과를 재사용
+    return tuple(sorted(allowed_commands))
+
+def split_word(line: str) -> Tuple[str, bool]:
+    """
+    입력 중인 명령어 줄에서 자동 완성할 마지막 단어와 명령어 이름 위치인지 여부 반환
+
+    ex) 'cat a | gr' -> ('gr', True), 'cd pro' -> ('pro', False), 'ls ' -> ('', False)
+    """
+    start = len(line)
+    while start > 0 and line[start - 1] not in WORD_BREAKS:
+        start -= 1
+    before = line[:start].rstrip()
+    # redirection 대상은 경로, 줄의 첫 단어와 연산자 다음 단어는 명령어 이름
+    command_position = not before or before.endswith(COMMAND_SEPARATORS)
+    return line[start:], command_position
+
+def complete_line(user, line: str, allowed_commands: FrozenSet[str]) -> dict:
+    """
+    명령어 이름 또는 경로 자동 완성
+
+    Parameters
+    ----------
+    user : User
+        자동 완성을 요청한 사용자
+    line : str
+        커서 앞까지 입력된 명령어 줄
+    allowed_commands : FrozenSet[str]
+        자동 완성할 명령어 이름 (세션에서 허용된 명령어)
+
+    Returns
+    -------
+    dict
+        word: 자동 완성할 단어, completions: 단어를 대체할 후보 목록 (디렉토리는 '/' 로 끝남),
+        common_prefix: 모든 후보의 공통 prefix (탭 한번으로 채울 수 있는 부분, 후보가 하나이면 뒤에 공백 포함)
+    """
+    limit: int = settings.COMPLETION_MAX_RESULTS
+    word, command_position = split_word(line)
+    if command_position and '/' not in word:
+        commands = sorted_commands(allowed_commands)
+        start = bisect.bisect_left(commands, word)
+        completions = [name for name in commands[start:start + limit] if name.startswith(word)]
+    else:
+        # 'dir/sub/pre' -> dir/sub 디렉토리에서 'pre' 로 시작하는 항목
+        head, _, prefix = word.rpartition('/')
+        directory = user.resolve_path(head or ('/' if word.startswith('/') else '.'))
+        completions = []
+        for name, is_dir in user.dir_index.complete(directory, prefix, limit):
+            completions.append(word[:len(word) - len(prefix)] + name + ('/' if is_dir else ''))
+    common_prefix = posixpath.commonprefix(completions) if completions else word
+    if len(completions) == 1 and not common_prefix.endswith('/'):
+        # 후보가 하나인 명령어/파일은 bash 와 같이 공백까지 채움
+        common_prefix += ' '
+    return {'word': word, 'completions': completions, 'common_prefix': common_prefix}
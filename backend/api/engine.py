@@ -0,0 +1,274 @@
+import asyncio
+import atexit
+import itertools
+import multiprocessing
+import os
+import queue
+import secrets
+import threading
+import zlib
+from concurrent.futures import Future
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from django.conf import settings
+from api.executor import COMMAND_EXECUTOR
+
+# api.operations 는 모델을 import 하므로 워커 프로세스에서 django.setup() 이후에 import 되도록 함수 안에서 import 함
+
+# 워커 프로세스 요청의 작업 이름 중 OPERATIONS 가 아닌 것 (명령어 출력 스트리밍과 중단)
+STREAM: str = '__stream__'
+CANCEL: str = '__cancel__'
+# 워커 프로세스 응답 종류 (RESULT/ERROR 는 요청의 마지막 응답, CHUNK 는 스트리밍 중인 출력)
+RESULT: str = 'result'
+ERROR: str = 'error'
+CHUNK: str = 'chunk'
+
+class LocalEngine:
+    """
+    현재 프로세스의 세션에서 작업을 실행하는 엔진 (settings.COMMAND_WORKER_PROCESSES = 0)
+
+    Methods
+    -------
+    connect(username: str, hostname: str) -> str
+        새 세션을 생성하고 토큰 반환
+    call(token: str, operation: str, *args)
+        세션 작업 실행 (api.operations.OPERATIONS)
+    call_async(token: str, operation: str, *args)
+        세션 작업을 이벤트 루프를 블로킹하지 않고 실행
+    stream_async(token: str, line: str) -> AsyncIterator[str]
+        명령어를 실행하고 출력을 chunk 단위로 반환
+    collect_metrics() -> str
+        metric 을 수집하여 Prometheus text format 으로 반환
+    """
+    def connect(self, username: str, hostname: str) -> str:
+        return self.call(secrets.token_urlsafe(16), 'connect', username, hostname)
+
+    def call(self, token: str, operation: str, *args):
+        from api.operations import OPERATIONS
+        return OPERATIONS[operation](token, *args)
+
+    async def call_async(self, token: str, operation: str, *args):
+        from api.operations import ASYNC_OPERATIONS, OPERATIONS
+        if operation in ASYNC_OPERATIONS:
+            return await ASYNC_OPERATIONS[operation](token, *args)
+        return await asyncio.get_running_loop().run_in_executor(COMMAND_EXECUTOR, OPERATIONS[operation], token, *args)
+
+    async def stream_async(self, token: str, line: str) -> AsyncIterator[str]:
+        from api.operations import stream_async
+        async for chunk in stream_async(token, line):
+            yield chunk
+
+    def collect_metrics(self) -> str:
+        from api.metrics import METRICS
+        from api.operations import collect_metrics
+        return METRICS.render(collect_metrics())
+
+def worker_main(requests, responses) -> None:
+    """
+    워커 프로세스 진입점
+
+    요청 (request_id, operation, token, args) 을 받아 스레드 풀에서 실행하고 (request_id, RESULT | ERROR, value) 로 응답
+    같은 세션의 명령어는 세션 lock 으로 순서대로 실행되고, 다른 세션의 명령어는 동시에 실행됨
+    STREAM 요청은 워커의 이벤트 루프에서 실행하고 출력이 생성될 때마다 (request_id, CHUNK, chunk) 로 전달하며,
+    CANCEL 요청을 받으면 실행 중인 스트리밍을 중단함 (명령어 generator 가 닫히면서 프로세스도 종료됨)
+    """
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'VirtualTerminal.settings')
+    django.setup()
+    from api.operations import OPERATIONS, stream_async
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name='command-worker-stream', daemon=True).start()
+    streams: Dict[int, Future] = {}
+
+    def handle(request_id: int, operation: str, token: str, args: tuple) -> None:
+        try:
+            responses.put((request_id, RESULT, OPERATIONS[operation](token, *args)))
+        except Exception as e:
+            responses.put((request_id, ERROR, e))
+
+    async def stream(request_id: int, token: str, line: str) -> None:
+        try:
+            async for chunk in stream_async(token, line):
+                responses.put((request_id, CHUNK, chunk))
+            responses.put((request_id, RESULT, None))
+        except Exception as e:
+            responses.put((request_id, ERROR, e))
+        finally:
+            streams.pop(request_id, None)
+
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        request_id, operation, token, args = request
+        if operation == STREAM:
+            streams[request_id] = asyncio.run_coroutine_threadsafe(stream(request_id, token, *args), loop)
+        elif operation == CANCEL:
+            future = streams.pop(request_id, None)
+            if future is not None:
+                future.cancel()
+        else:
+            COMMAND_EXECUTOR.submit(handle, *request)
+    # multiprocessing 의 자식 프로세스는 atexit 함수를 실행하지 않고 종료되므로 세션 샌드박스 정리를 직접 실행
+    atexit._run_exitfuncs()
+
+class WorkerProcess:
+    """
+    세션 일부를 소유하는 워커 프로세스와 요청/응답 큐
+    워커 프로세스가 비정상 종료되면 대기 중인 요청을 실패 처리하고 새 프로세스를 시작함 (해당 워커의 세션은 삭제됨)
+    """
+    def __init__(self, index: int):
+        self.index: int = index
+        self._context = multiprocessing.get_context('spawn')
+        self._futures: Dict[int, Future] = {}
+        # 스트리밍 중인 요청의 출력을 전달할 이벤트 루프와 queue
+        self._streams: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._start_process()
+        threading.Thread(target=self._read, name=f'command-worker-{index}-reader', daemon=True).start()
+
+    def _start_process(self) -> None:
+        self.requests = self._context.Queue()
+        self.responses = self._context.Queue()
+        self.process = self._context.Process(target=worker_main, args=(self.requests, self.responses),
+                                             name=f'command-worker-{self.index}', daemon=True)
+        self.process.start()
+
+    def submit(self, operation: str, token: str, args: tuple) -> Future:
+        future: Future = Future()
+        with self._lock:
+            request_id = next(self._ids)
+            self._futures[request_id] = future
+            self.requests.put((request_id, operation, token, args))
+        return future
+
+    def submit_stream(self, token: str, line: str) -> Tuple[int, asyncio.Queue]:
+        # 응답은 reader 스레드에서 받으므로 호출한 이벤트 루프의 queue 로 (종류, 값) 을 전달
+        chunks: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            request_id = next(self._ids)
+            self._streams[request_id] = (asyncio.get_running_loop(), chunks)
+            self.requests.put((request_id, STREAM, token, (line,)))
+        return request_id, chunks
+
+    def cancel_stream(self, request_id: int) -> None:
+        with self._lock:
+            if self._streams.pop(request_id, None) is not None:
+                self.requests.put((request_id, CANCEL, None, ()))
+
+    def _read(self) -> None:
+        while True:
+            try:
+                request_id, kind, value = self.responses.get(timeout=1)
+            except queue.Empty:
+                if not self.process.is_alive():
+                    self._restart()
+                continue
+            with self._lock:
+                if kind == CHUNK:
+                    future, stream = None, self._streams.get(request_id)
+                else:
+                    future, stream = self._futures.pop(request_id, None), self._streams.pop(request_id, None)
+            if stream is not None:
+                self._deliver(stream, kind, value)
+            elif future is None:
+                continue
+            elif kind == RESULT:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def _deliver(self, stream: Tuple[asyncio.AbstractEventLoop, asyncio.Queue], kind: str, value) -> None:
+        loop, chunks = stream
+        try:
+            loop.call_soon_threadsafe(chunks.put_nowait, (kind, value))
+        except RuntimeError:
+            # 요청한 이벤트 루프가 이미 종료된 경우
+            pass
+
+    def _restart(self) -> None:
+        with self._lock:
+            futures, self._futures = self._futures, {}
+            streams, self._streams = self._streams, {}
+            self._start_process()
+        error = RuntimeError(f'command worker {self.index} exited')
+        for future in futures.values():
+            future.set_exception(error)
+        for stream in streams.values():
+            self._deliver(stream, ERROR, error)
+
+    def stop(self) -> None:
+        self.requests.put(None)
+        self.process.join(timeout=5)
+
+class ProcessEngine:
+    """
+    세션을 여러 워커 프로세스에 나누어 실행하는 엔진 (settings.COMMAND_WORKER_PROCESSES > 0)
+
+    세션 토큰의 해시로 워커를 선택하므로 한 세션의 작업은 항상 같은 워커에서 실행되고(session affinity),
+    세션의 현재 디렉토리/상태는 해당 워커 프로세스만 소유함
+    장고 프로세스는 요청을 워커의 큐로 전달하기만 하므로 명령어 실행이 모든 CPU 코어로 분산됨
+    """
+    def __init__(self, processes: int, timeout: float):
+        self.processes: int = processes
+        self.timeout: float = timeout
+        self._workers: Optional[List[WorkerProcess]] = None
+        self._lock = threading.Lock()
+
+    def _get_worker(self, token: str) -> WorkerProcess:
+        # manage.py 명령어 등에서는 프로세스를 만들지 않도록 처음 사용될 때 시작
+        if self._workers is None:
+            with self._lock:
+                if self._workers is None:
+                    self._workers = [WorkerProcess(i) for i in range(self.processes)]
+        return self._workers[zlib.crc32(token.encode()) % self.processes]
+
+    def connect(self, username: str, hostname: str) -> str:
+        return self.call(secrets.token_urlsafe(16), 'connect', username, hostname)
+
+    def call(self, token: str, operation: str, *args):
+        return self._get_worker(token or '').submit(operation, token, args).result(timeout=self.timeout)
+
+    async def call_async(self, token: str, operation: str, *args):
+        future = self._get_worker(token or '').submit(operation, token, args)
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+
+    async def stream_async(self, token: str, line: str) -> AsyncIterator[str]:
+        # 워커 프로세스에서 생성되는 출력을 chunk 단위로 전달 (출력 제한은 워커의 명령어 실행에서 적용)
+        # 소비자가 중간에 종료하면 (ex. 웹소켓 연결 종료) 워커에 중단 요청
+        worker = self._get_worker(token or '')
+        request_id, chunks = worker.submit_stream(token, line)
+        finished = False
+        try:
+            while True:
+                kind, value = await asyncio.wait_for(chunks.get(), timeout=self.timeout)
+                if kind == CHUNK:
+                    yield value
+                    continue
+                finished = True
+                if kind == ERROR:
+                    raise value
+                return
+        finally:
+            if not finished:
+                worker.cancel_stream(request_id)
+
+    def collect_metrics(self) -> str:
+        # 뷰의 응답 시간은 장고 프로세스, 명령어 metric 과 세션은 워커 프로세스에 있으므로 모두 합쳐서 반환
+        # (api.operations 를 import 하여 워커 프로세스와 같은 metric 이 등록되도록 함)
+        from api.metrics import METRICS, merge
+        from api.operations import collect_metrics
+        futures = [worker.submit('collect_metrics', None, ()) for worker in self._workers or []]
+        return METRICS.render(merge([collect_metrics()] + [future.result(timeout=self.timeout) for future in futures]))
+
+    def stop(self) -> None:
+        for worker in self._workers or []:
+            worker.stop()
+
+def create_engine():
+    if settings.COMMAND_WORKER_PROCESSES > 0:
+        return ProcessEngine(settings.COMMAND_WORKER_PROCESSES, settings.COMMAND_WORKER_TIMEOUT)
+    return LocalEngine()
+
+ENGINE = create_engine()
@@ -0,0 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+
+# async 경로에서 블로킹 파일 시스템 작업을 실행하는 스레드 풀
+# 동시에 실행되는 작업 수를 settings.COMMAND_EXECUTOR_WORKERS 로 제한하여 이벤트 루프와 worker 를 보호
+COMMAND_EXECUTOR = ThreadPoolExecutor(max_workers=settings.COMMAND_EXECUTOR_WORKERS,
+                                      thread_name_prefix='command')
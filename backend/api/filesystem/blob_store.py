@@ -0,0 +1,63 @@
+import hashlib
+import threading
+import weakref
+from typing import Tuple
+
+class Blob:
+    """
+    내용 hash 로 식별되는 불변 파일 내용
+
+    Attributes
+    ----------
+    id : bytes
+        내용의 hash (blake2b 16 bytes)
+    data : bytes
+        파일 내용
+    """
+    __slots__ = ('id', 'data', '__weakref__')
+
+    def __init__(self, id: bytes, data: bytes):
+        self.id: bytes = id
+        self.data: bytes = data
+
+class BlobStore:
+    """
+    모든 세션이 공유하는 content-addressed 파일 내용 저장소 (hash -> Blob)
+
+    같은 내용은 세션/템플릿과 관계없이 Blob 하나로 저장하고, 파일 노드는 Blob 을 참조만 함
+    저장소는 Blob 을 weak reference 로 보관하므로 참조하는 노드가 모두 사라지면 (참조 카운트가 0 이 되면)
+    저장소에서도 바로 제거됨 (세션 삭제/초기화 시 따로 반납할 필요 없음)
+    Blob 은 수정하지 않으므로 파일을 수정하면 새 내용의 Blob 으로 교체됨 (copy-on-write)
+
+    Methods
+    -------
+    intern(data: bytes) -> Blob
+        내용에 해당하는 Blob 반환 (없으면 저장)
+    stats() -> Tuple[int, int]
+        저장된 Blob 수와 내용 크기 합계
+    """
+    def __init__(self):
+        self._blobs: 'weakref.WeakValueDictionary[bytes, Blob]' = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        # 빈 파일 (touch) 은 hash 를 계산하지 않고 하나의 Blob 을 공유
+        self.empty: Blob = Blob(hashlib.blake2b(b'', digest_size=16).digest(), b'')
+
+    def intern(self, data: bytes) -> Blob:
+        if not data:
+            return self.empty
+        key = hashlib.blake2b(data, digest_size=16).digest()
+        with self._lock:
+            blob = self._blobs.get(key)
+            if blob is None:
+                blob = self._blobs[key] = Blob(key, bytes(data))
+            return blob
+
+    def stats(self) -> Tuple[int, int]:
+        with self._lock:
+            blobs = list(self._blobs.values())
+        return len(blobs), sum(len(blob.data) for blob in blobs)
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+BLOBS = BlobStore()
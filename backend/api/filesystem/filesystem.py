@@ -0,0 +1,125 @@
+from abc import abstractmethod, ABC
+from typing import Iterable, Iterator, List, Optional
+from api.policy import check_deadline
+
+class FileStat:
+    """
+    'ls -l' 출력에 필요한 파일 정보
+
+    mode 는 os.stat 의 st_mode 와 같은 형식 (파일 종류와 권한 비트, stat.filemode 로 'drwxr-xr-x' 형식 변환)
+    """
+    __slots__ = ('is_dir', 'size', 'mtime', 'mode')
+
+    def __init__(self, is_dir: bool, size: int, mtime: float, mode: int):
+        self.is_dir: bool = is_dir
+        self.size: int = size
+        self.mtime: float = mtime
+        self.mode: int = mode
+
+class FileSystem(ABC):
+    """
+    사용자 샌드박스 파일 시스템의 기본 클래스
+
+    모든 경로는 샌드박스 루트('/')를 기준으로 정규화된 가상 절대 경로 문자열
+    ex) '/home/tmp/project'
+    실패 시에는 os 모듈과 같은 OSError 하위 예외(FileNotFoundError, FileExistsError, NotADirectoryError)를 발생시킴
+
+    Methods
+    -------
+    exists(path: str) -> bool
+        경로가 존재하는지 확인
+    is_dir(path: str) -> bool
+        경로가 디렉토리인지 확인
+    is_link(path: str) -> bool
+        경로가 심볼릭 링크인지 확인 (마지막 경로 요소는 따라가지 않음)
+    list_dir(path: str) -> List[str]
+        디렉토리 항목 이름 리스트 반환
+    make_dir(path: str, parents: bool)
+        디렉토리 생성
+    stat(path: str) -> FileStat
+        파일 정보 반환
+    touch(path: str)
+        빈 파일 생성 (이미 존재하는 경우 수정 시간 갱신)
+    read_file(path: str) -> bytes
+        파일 내용 반환
+    iter_file(path: str, chunk_size: int) -> Iterator[bytes]
+        파일 내용을 chunk 단위로 반환
+    write_file(path: str, chunks: Iterable[bytes], append: bool)
+        chunk 단위로 파일 내용 저장 (파일이 없으면 생성, append 가 False 이면 기존 내용을 덮어씀)
+    rename(source: str, target: str)
+        파일 또는 디렉토리 이름 변경 (target 이 이미 존재하면 FileExistsError)
+    reset(username: str)
+        샌드박스를 '/home/<username>' 만 존재하는 초기 상태로 되돌림
+    mount_template(path: str, template: ProblemTemplate)
+        경로(홈 디렉토리)를 템플릿 트리로 교체 (템플릿 내용은 세션 간 공유하고 수정 시 복사)
+    host_path(path: str) -> Optional[str]
+        실제 디스크 경로 반환 (디스크에 존재하지 않는 backend 는 None)
+    disk_usage() -> int
+        세션이 소유한 데이터 크기(바이트) 반환 (템플릿과 공유 중인 파일은 제외)
+    destroy()
+        샌드박스 삭제
+    """
+    @abstractmethod
+    def exists(self, path: str) -> bool:
+        pass
+
+    @abstractmethod
+    def is_dir(self, path: str) -> bool:
+        pass
+
+    @abstractmethod
+    def list_dir(self, path: str) -> List[str]:
+        pass
+
+    @abstractmethod
+    def make_dir(self, path: str, parents: bool = False) -> None:
+        pass
+
+    @abstractmethod
+    def stat(self, path: str) -> FileStat:
+        pass
+
+    @abstractmethod
+    def touch(self, path: str) -> None:
+        pass
+
+    @abstractmethod
+    def read_file(self, path: str) -> bytes:
+        pass
+
+    @abstractmethod
+    def write_file(self, path: str, chunks: Iterable[bytes], append: bool = False) -> None:
+        pass
+
+    @abstractmethod
+    def rename(self, source: str, target: str) -> None:
+        pass
+
+    @abstractmethod
+    def reset(self, username: str) -> None:
+        pass
+
+    @abstractmethod
+    def mount_template(self, path: str, template) -> None:
+        pass
+
+    def iter_file(self, path: str, chunk_size: int) -> Iterator[bytes]:
+        data = self.read_file(path)
+        for i in range(0, len(data), chunk_size):
+            check_deadline()
+            yield data[i:i + chunk_size]
+
+    def is_link(self, path: str) -> bool:
+        # 심볼릭 링크를 만들 수 없는 backend 는 항상 False
+        return False
+
+    def host_path(self, path: str) -> Optional[str]:
+        return None
+
+    @abstractmethod
+    def disk_usage(self) -> int:
+        pass
+
+    @abstractmethod
+    def destroy(self) -> None:
+        pass
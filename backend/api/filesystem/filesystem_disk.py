@@ -0,0 +1,198 @@
+import errno
+import os
+import shutil
+import stat
+import tempfile
+from typing import Iterable, Iterator, List, Optional
+from django.conf import settings
+from api.filesystem.filesystem import FileStat, FileSystem
+from api.policy import check_deadline
+from api.sandbox_owner import SANDBOX_OWNER
+from api.sandbox_path import DirHandleCache, SandboxResolver, split_path
+
+# 일반 파일이 아닌 경로의 내용을 읽거나 쓰려는 경우의 에러 메세지
+NOT_REGULAR_FILE: str = '일반 파일이 아닙니다'
+
+# 모든 디스크 샌드박스가 공유하는 디렉토리 fd 캐시 (세션 수와 관계없이 열린 fd 수 제한)
+DIR_HANDLES = DirHandleCache(settings.SANDBOX_DIR_HANDLES)
+
+class DiskFileSystem(FileSystem):
+    """
+    tempfile.mkdtemp 로 생성한 실제 디렉토리를 샌드박스로 사용하는 파일 시스템
+    디렉토리는 settings.SANDBOX_ROOT 에 'sandbox_<pid>_' 로 생성 (서버가 비정상 종료되면 cleanup_sandboxes 로 삭제)
+
+    모든 경로는 SandboxResolver 로 해석하여 부모 디렉토리 fd 기준(dir_fd)으로 접근하므로
+    심볼릭 링크나 '..' 으로 샌드박스 밖의 파일에 접근할 수 없음
+    """
+    def __init__(self, username: str, restricted_dir: Optional[str] = None):
+        restricted_dir = str(restricted_dir or settings.SANDBOX_ROOT)
+        prefix = SANDBOX_OWNER.prefix('sandbox', restricted_dir)
+        self.root: str = os.path.abspath(tempfile.mkdtemp(prefix=prefix, dir=restricted_dir))
+        os.makedirs(os.path.join(self.root, "home", username))
+        self.resolver: SandboxResolver = SandboxResolver(self.root, DIR_HANDLES)
+
+    def host_path(self, path: str) -> Optional[str]:
+        # ex) /home/tmp -> temp_root_dir/home/tmp (심볼릭 링크는 샌드박스 안에서 해석한 경로)
+        return self.resolver.host_path(path)
+
+    def exists(self, path: str) -> bool:
+        try:
+            return self.resolver.stat(path) is not None
+        except OSError:
+            return False
+
+    def is_dir(self, path: str) -> bool:
+        try:
+            st = self.resolver.stat(path)
+        except OSError:
+            return False
+        return st is not None and stat.S_ISDIR(st.st_mode)
+
+    def is_link(self, path: str) -> bool:
+        try:
+            with self.resolver.lookup(path, follow=False) as (_, _, st):
+                return st is not None and stat.S_ISLNK(st.st_mode)
+        except OSError:
+            return False
+
+    def list_dir(self, path: str) -> List[str]:
+        with self.resolver.open_dir(path) as dirfd:
+            return os.listdir(dirfd)
+
+    def make_dir(self, path: str, parents: bool = False) -> None:
+        if not parents:
+            with self.resolver.lookup(path) as (dirfd, name, _):
+                os.mkdir(name, dir_fd=dirfd)
+            return
+        parts = split_path(path)
+        for i in range(1, len(parts) + 1):
+            with self.resolver.lookup('/' + '/'.join(parts[:i])) as (dirfd, name, st):
+                if st is None:
+                    os.mkdir(name, dir_fd=dirfd)
+                elif not stat.S_ISDIR(st.st_mode):
+                    raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), path)
+
+    def stat(self, path: str) -> FileStat:
+        st = self.resolver.stat(path)
+        if st is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        return FileStat(stat.S_ISDIR(st.st_mode), st.st_size, st.st_mtime, st.st_mode)
+
+    def _open(self, path: str, flags: int, copy_on_write: bool = False, keep: bool = True, regular: bool = False) -> int:
+        # 경로를 해석한 부모 디렉토리 fd 기준으로 파일을 열어서 fd 반환 (읽기/쓰기는 lock 밖에서 처리)
+        # 외부 명령어가 만든 FIFO 는 반대쪽이 열릴 때까지 open 이 끝나지 않으므로 O_NONBLOCK 으로 열고 (일반 파일에는 영향 없음)
+        # regular 이면 내용을 읽고 쓸 수 없는 FIFO/장치 파일은 거부
+        with self.resolver.lookup(path) as (dirfd, name, st):
+            if copy_on_write:
+                self._break_link(dirfd, name, st, keep)
+            fd = os.open(name, flags | os.O_NOFOLLOW | os.O_CLOEXEC | os.O_NONBLOCK, 0o666, dir_fd=dirfd)
+        if regular and not stat.S_ISREG(os.fstat(fd).st_mode):
+            os.close(fd)
+            raise OSError(errno.EINVAL, NOT_REGULAR_FILE, path)
+        return fd
+
+    def _break_link(self, dirfd: int, name: str, st: Optional[os.stat_result], keep: bool) -> None:
+        # 템플릿과 하드링크로 공유 중인 파일은 수정 전에 세션 소유의 복사본으로 교체 (copy-on-write)
+        # 내용을 덮어쓰는 경우(keep=False)는 복사하지 않고 링크만 끊음
+        if st is None or st.st_nlink <= 1 or not stat.S_ISREG(st.st_mode):
+            return
+        if not keep:
+            os.unlink(name, dir_fd=dirfd)
+            return
+        copy_name = name + '.cow'
+        source = os.open(name, os.O_RDONLY | os.O_NOFOLLOW | os.O_CLOEXEC, dir_fd=dirfd)
+        with os.fdopen(source, 'rb') as src:
+            target = os.open(copy_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW | os.O_CLOEXEC,
+                             stat.S_IMODE(st.st_mode), dir_fd=dirfd)
+            with os.fdopen(target, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+        os.replace(copy_name, name, src_dir_fd=dirfd, dst_dir_fd=dirfd)
+
+    def touch(self, path: str) -> None:
+        fd = self._open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, copy_on_write=True)
+        try:
+            os.utime(fd)
+        finally:
+            os.close(fd)
+
+    def read_file(self, path: str) -> bytes:
+        with os.fdopen(self._open(path, os.O_RDONLY, regular=True), 'rb') as f:
+            return f.read()
+
+    def iter_file(self, path: str, chunk_size: int) -> Iterator[bytes]:
+        # 파일 전체를 메모리에 올리지 않고 chunk 단위로 읽음
+        with os.fdopen(self._open(path, os.O_RDONLY, regular=True), 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                check_deadline()
+                yield chunk
+
+    def write_file(self, path: str, chunks: Iterable[bytes], append: bool = False) -> None:
+        # 출력이 생성되는 대로 기록하여 출력 크기와 관계없이 메모리 사용량 일정
+        flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if append else os.O_TRUNC)
+        with os.fdopen(self._open(path, flags, copy_on_write=True, keep=append, regular=True), 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+
+    def rename(self, source: str, target: str) -> None:
+        with self.resolver.lookup(target, follow=False) as (target_fd, target_name, target_st):
+            if target_st is not None:
+                raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), target)
+            # source 를 해석하면서 캐시에서 제거될 수 있으므로 target 디렉토리 fd 는 복제해서 사용
+            target_fd = os.dup(target_fd)
+        try:
+            with self.resolver.lookup(source, follow=False) as (source_fd, source_name, _):
+                os.rename(source_name, target_name, src_dir_fd=source_fd, dst_dir_fd=target_fd)
+        finally:
+            os.close(target_fd)
+        # 이름이 변경된 디렉토리의 캐시된 fd 정리
+        self.resolver.invalidate()
+
+    def reset(self, username: str) -> None:
+        # 기존 디렉토리는 이름을 변경해서 분리한 뒤 삭제하고, 같은 경로에 빈 샌드박스를 다시 생성
+        self.resolver.invalidate()
+        self._remove_tree(self.root)
+        os.makedirs(os.path.join(self.root, "home", username))
+
+    def mount_template(self, path: str, template) -> None:
+        # 디렉토리는 세션마다 생성하지만 파일은 템플릿과 하드링크로 공유하여 내용을 복사하지 않음
+        # (외부 명령어가 허용된 문제는 공유 파일이 제자리에서 수정되지 않도록 복사)
+        host_path = self.host_path(path)
+        self.resolver.invalidate()
+        shutil.rmtree(host_path, ignore_errors=True)
+        with template.materialized() as template_path:
+            shutil.copytree(template_path, host_path, copy_function=os.link if template.link_files else shutil.copy2)
+
+    def disk_usage(self) -> int:
+        # 실제 할당된 블록 크기 기준 (템플릿과 하드링크로 공유 중인 파일은 제외)
+        # 명령어 실행과 동시에 호출될 수 있으므로 탐색 중 삭제된 경로는 무시
+        total = 0
+        stack = [self.root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        if stat.S_ISDIR(st.st_mode):
+                            stack.append(entry.path)
+                        elif st.st_nlink > 1:
+                            continue
+                        total += st.st_blocks * 512
+            except OSError:
+                continue
+        return total
+
+    def _remove_tree(self, path: str) -> None:
+        # 이름을 먼저 변경하면 삭제가 끝나기 전이라도 경로는 즉시 비워짐 (rename-then-delete)
+        trash_path = f"{path}.trash"
+        try:
+            os.rename(path, trash_path)
+        except OSError:
+            trash_path = path
+        shutil.rmtree(trash_path, ignore_errors=True)
+
+    def destroy(self) -> None:
+        self.resolver.invalidate()
+        self._remove_tree(self.root)
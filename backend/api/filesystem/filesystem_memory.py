@@ -0,0 +1,225 @@
+import errno
+import os
+import stat
+import time
+from typing import Dict, Iterable, List
+from api.filesystem.blob_store import BLOBS, Blob
+from api.filesystem.filesystem import FileStat, FileSystem
+from api.sandbox_path import split_path
+
+# 메모리 파일 시스템은 권한을 관리하지 않으므로 'ls -l' 에는 mkdir/touch 의 기본 권한(umask 022)으로 표시
+DIR_MODE: int = stat.S_IFDIR | 0o755
+FILE_MODE: int = stat.S_IFREG | 0o644
+
+class Inode:
+    """
+    메모리 파일 시스템의 노드 (파일)
+    shared 가 True 인 노드는 여러 세션이 공유하는 템플릿 노드로, 수정 전에 copy() 로 복사해야 함
+    내용은 BLOBS 에 한번만 저장하고 blob 을 참조 (같은 내용의 파일은 세션/템플릿과 관계없이 같은 blob 을 공유)
+    """
+    __slots__ = ('mtime', 'blob', 'shared')
+
+    def __init__(self, data: bytes = b'', shared: bool = False):
+        self.mtime: float = time.time()
+        self.blob: Blob = BLOBS.intern(data)
+        self.shared: bool = shared
+
+    @property
+    def data(self) -> bytes:
+        return self.blob.data
+
+    def copy(self) -> 'Inode':
+        # blob 은 불변 객체이므로 내용은 복사하지 않고 참조만 공유
+        node = Inode()
+        node.blob = self.blob
+        node.mtime = self.mtime
+        return node
+
+class DirNode:
+    """
+    메모리 파일 시스템의 노드 (디렉토리)
+    하위 항목은 이름 -> 노드 dict 로 관리하여 경로 탐색을 경로 요소마다 dict 조회 한번으로 처리
+    shared 가 True 인 노드는 여러 세션이 공유하는 템플릿 노드로, 수정 전에 copy() 로 복사해야 함
+    """
+    __slots__ = ('mtime', 'children', 'shared')
+
+    def __init__(self, shared: bool = False):
+        self.mtime: float = time.time()
+        self.children: Dict[str, object] = {}
+        self.shared: bool = shared
+
+    def copy(self) -> 'DirNode':
+        # 하위 노드는 공유한 채로 dict 만 복사 (하위 노드는 수정될 때 각각 복사됨)
+        node = DirNode()
+        node.mtime = self.mtime
+        node.children = dict(self.children)
+        return node
+
+class MemoryFileSystem(FileSystem):
+    """
+    디스크를 사용하지 않고 파이썬 객체 트리로 샌드박스를 구성하는 파일 시스템
+
+    템플릿은 노드를 공유하는 방식으로 O(1) 에 마운트되고(copy-on-write),
+    수정이 발생한 경로의 노드만 세션 소유로 복사되므로 메모리 사용량은 수정량에 비례함
+    """
+    def __init__(self, username: str):
+        self.root: DirNode = DirNode()
+        self.make_dir(f"/home/{username}", parents=True)
+
+    def _lookup(self, path: str):
+        node = self.root
+        for part in split_path(path):
+            if not isinstance(node, DirNode):
+                raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), path)
+            node = node.children.get(part)
+            if node is None:
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        return node
+
+    def _lookup_dir(self, path: str) -> DirNode:
+        node = self._lookup(path)
+        if not isinstance(node, DirNode):
+            raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), path)
+        return node
+
+    def _lookup_writable_dir(self, path: str) -> DirNode:
+        # 경로를 따라가면서 공유 중인 디렉토리 노드는 세션 소유로 복사 (copy-on-write)
+        node = self.root
+        for part in split_path(path):
+            child = node.children.get(part)
+            if child is None:
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+            if not isinstance(child, DirNode):
+                raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), path)
+            if child.shared:
+                child = node.children[part] = child.copy()
+            node = child
+        return node
+
+    def exists(self, path: str) -> bool:
+        try:
+            self._lookup(path)
+        except OSError:
+            return False
+        return True
+
+    def is_dir(self, path: str) -> bool:
+        try:
+            return isinstance(self._lookup(path), DirNode)
+        except OSError:
+            return False
+
+    def list_dir(self, path: str) -> List[str]:
+        return list(self._lookup_dir(path).children)
+
+    def make_dir(self, path: str, parents: bool = False) -> None:
+        parts = split_path(path)
+        if not parts:
+            if parents:
+                return
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), path)
+
+        if parents:
+            node = self.root
+            for part in parts:
+                child = node.children.get(part)
+                if child is None:
+                    child = node.children[part] = DirNode()
+                    node.mtime = child.mtime
+                elif not isinstance(child, DirNode):
+                    raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), path)
+                elif child.shared:
+                    child = node.children[part] = child.copy()
+                node = child
+            return
+
+        parent = self._lookup_writable_dir('/' + '/'.join(parts[:-1]))
+        if parts[-1] in parent.children:
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), path)
+        child = parent.children[parts[-1]] = DirNode()
+        parent.mtime = child.mtime
+
+    def stat(self, path: str) -> FileStat:
+        node = self._lookup(path)
+        if isinstance(node, DirNode):
+            return FileStat(True, 4096, node.mtime, DIR_MODE)
+        return FileStat(False, len(node.data), node.mtime, FILE_MODE)
+
+    def touch(self, path: str) -> None:
+        parts = split_path(path)
+        if not parts:
+            self.root.mtime = time.time()
+            return
+        parent = self._lookup_writable_dir('/' + '/'.join(parts[:-1]))
+        node = parent.children.get(parts[-1])
+        if node is None:
+            node = parent.children[parts[-1]] = Inode()
+            parent.mtime = node.mtime
+            return
+        if node.shared:
+            node = parent.children[parts[-1]] = node.copy()
+        node.mtime = time.time()
+
+    def read_file(self, path: str) -> bytes:
+        node = self._lookup(path)
+        if isinstance(node, DirNode):
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), path)
+        return node.data
+
+    def write_file(self, path: str, chunks: Iterable[bytes], append: bool = False) -> None:
+        parts = split_path(path)
+        if not parts:
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), path)
+        parent = self._lookup_writable_dir('/' + '/'.join(parts[:-1]))
+        node = parent.children.get(parts[-1])
+        if isinstance(node, DirNode):
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), path)
+        data = b''.join(chunks)
+        if append and node is not None:
+            data = node.data + data
+        # 공유 중인 노드는 수정하지 않고 새 노드로 교체 (copy-on-write)
+        parent.children[parts[-1]] = Inode(data)
+        if node is None:
+            parent.mtime = time.time()
+
+    def rename(self, source: str, target: str) -> None:
+        source_parts = split_path(source)
+        target_parts = split_path(target)
+        if not source_parts or not target_parts:
+            raise PermissionError(errno.EBUSY, os.strerror(errno.EBUSY), source)
+        if self.exists(target):
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), target)
+        source_parent = self._lookup_writable_dir('/' + '/'.join(source_parts[:-1]))
+        target_parent = self._lookup_writable_dir('/' + '/'.join(target_parts[:-1]))
+        if source_parts[-1] not in source_parent.children:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), source)
+        target_parent.children[target_parts[-1]] = source_parent.children.pop(source_parts[-1])
+        source_parent.mtime = target_parent.mtime = time.time()
+
+    def reset(self, username: str) -> None:
+        self.root = DirNode()
+        self.make_dir(f"/home/{username}", parents=True)
+
+    def mount_template(self, path: str, template) -> None:
+        # 템플릿 트리의 루트 노드를 그대로 연결 (복사 없음)
+        parts = split_path(path)
+        parent = self._lookup_writable_dir('/' + '/'.join(parts[:-1]))
+        parent.children[parts[-1]] = template.root
+
+    def disk_usage(self) -> int:
+        # 세션 소유 파일 내용의 크기 합계 (공유 중인 템플릿 노드와 그 하위 노드는 모두 공유 중이므로 탐색하지 않음)
+        # 다른 세션과 같은 내용의 파일도 크기에 포함 (실제 메모리 사용량은 BLOBS.stats())
+        total = 0
+        stack = [self.root]
+        while stack:
+            for child in list(stack.pop().children.values()):
+                if child.shared:
+                    continue
+                if isinstance(child, DirNode):
+                    stack.append(child)
+                else:
+                    total += len(child.data)
+        return total
+
+    def destroy(self) -> None:
+        self.root.children.clear()
@@ -0,0 +1,8 @@
+from api.filesystem.filesystem_disk import DiskFileSystem
+from api.filesystem.filesystem_memory import MemoryFileSystem
+
+# settings.FILESYSTEM_BACKEND 값으로 사용할 샌드박스 파일 시스템 선택
+FILESYSTEM_DICT = {
+    'disk': DiskFileSystem,
+    'memory': MemoryFileSystem,
+}
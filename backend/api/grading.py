@@ -0,0 +1,190 @@
+import hashlib
+import posixpath
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from api.completion import RACY_WINDOW
+from api.filesystem.filesystem import FileSystem
+
+# 파일 내용을 hash 할 때 한번에 읽는 크기
+READ_CHUNK_SIZE: int = 64 * 1024
+
+class TreeNode:
+    """
+    Merkle tree 의 노드 (파일 또는 디렉토리)
+
+    파일의 digest 는 내용의 hash, 디렉토리의 digest 는 이름순으로 정렬한 (이름, 자식 digest) 목록의 hash
+    두 트리의 루트 digest 가 같으면 전체 트리가 같으므로 비교는 digest 비교 한번으로 끝나고,
+    다른 경우에도 digest 가 다른 하위 트리만 내려가서 차이를 찾음
+    한번 만든 노드는 수정하지 않음 (변경된 경로의 노드만 새로 만들고 나머지는 공유)
+
+    Attributes
+    ----------
+    digest : bytes
+        노드의 hash
+    children : Optional[Dict[str, TreeNode]]
+        디렉토리의 자식 노드 (파일이면 None)
+    """
+    __slots__ = ('digest', 'children')
+
+    def __init__(self, digest: bytes, children: Optional[Dict[str, 'TreeNode']] = None):
+        self.digest: bytes = digest
+        self.children: Optional[Dict[str, TreeNode]] = children
+
+    @property
+    def is_dir(self) -> bool:
+        return self.children is not None
+
+def file_node(chunks: Iterable[bytes]) -> TreeNode:
+    h = hashlib.blake2b(b'f', digest_size=16)
+    for chunk in chunks:
+        h.update(chunk)
+    return TreeNode(h.digest())
+
+def dir_node(children: Dict[str, TreeNode]) -> TreeNode:
+    # 이름에는 '\0' 이 없고 digest 는 고정 길이이므로 구분자 없이 이어 붙여도 목록이 하나로 결정됨
+    h = hashlib.blake2b(b'd', digest_size=16)
+    for name in sorted(children):
+        h.update(name.encode('utf-8', 'surrogateescape') + b'\0' + children[name].digest)
+    return TreeNode(h.digest(), children)
+
+# 읽을 수 없는 항목과 심볼릭 링크, 기대 트리에는 존재하지 않으므로 항상 차이로 표시됨
+UNREADABLE: TreeNode = TreeNode(hashlib.blake2b(b'e', digest_size=16).digest())
+
+def build_tree(spec: dict) -> TreeNode:
+    """
+    문제 템플릿과 같은 형식의 트리 정의로 Merkle tree 생성 (문제의 기대 상태)
+
+    Parameters
+    ----------
+    spec : dict
+        홈 디렉토리 기준 트리 정의 (dict: 디렉토리, str: 파일 내용)
+        ex) {'project': {'src': {}, 'README.md': 'hello'}}
+    """
+    children: Dict[str, TreeNode] = {}
+    for name, child in spec.items():
+        if isinstance(child, dict):
+            children[name] = build_tree(child)
+        else:
+            children[name] = file_node([child.encode('utf-8') if isinstance(child, str) else child])
+    return dir_node(children)
+
+class TreeHashIndex:
+    """
+    세션 홈 디렉토리의 Merkle tree (채점용)
+
+    디렉토리별 노드를 보관하고, 명령어 계층에서 변경을 알린 경로(invalidate)와 그 상위 디렉토리의 노드만 다시 계산함
+    변경된 경로를 알 수 없는 외부 명령어 실행 후에는 invalidate_all() 로 디렉토리 노드를 모두 버리지만,
+    파일 노드는 (수정 시간, 크기)가 같으면 재사용하므로 내용을 다시 읽지 않음
+
+    Methods
+    -------
+    tree() -> TreeNode
+        홈 디렉토리의 현재 트리 (변경이 없으면 저장된 루트 노드를 그대로 반환)
+    invalidate(path: str)
+        경로와 상위 디렉토리의 노드 삭제 (mkdir, touch, redirection)
+    invalidate_all()
+        모든 디렉토리 노드 삭제 (외부 명령어)
+    clear()
+        파일 노드까지 모두 삭제 (템플릿 마운트 등 홈 디렉토리 전체가 바뀐 경우)
+    """
+    def __init__(self, fs: FileSystem, root: str):
+        self.fs: FileSystem = fs
+        self.root: str = root
+        self._dirs: Dict[str, TreeNode] = {}
+        # 경로 -> (수정 시간, 크기, 노드)
+        self._files: Dict[str, Tuple[float, int, TreeNode]] = {}
+        self._lock = threading.Lock()
+
+    def tree(self) -> TreeNode:
+        with self._lock:
+            try:
+                return self._dir(self.root)
+            except OSError:
+                # 홈 디렉토리가 삭제된 경우 빈 디렉토리와 같이 비교
+                return dir_node({})
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            self._files.pop(path, None)
+            self._dirs.pop(path, None)
+            while path != self.root and path.startswith(self.root + '/'):
+                path = posixpath.dirname(path)
+                self._dirs.pop(path, None)
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self._dirs.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._dirs.clear()
+            self._files.clear()
+
+    def _dir(self, path: str) -> TreeNode:
+        node = self._dirs.get(path)
+        if node is not None:
+            return node
+        children = {name: self._child(posixpath.join(path, name)) for name in self.fs.list_dir(path)}
+        node = self._dirs[path] = dir_node(children)
+        return node
+
+    def _child(self, path: str) -> TreeNode:
+        if self.fs.is_link(path):
+            # 심볼릭 링크는 따라가지 않음 (링크가 서로를 가리키는 경우 같은 트리를 반복해서 읽지 않도록)
+            return UNREADABLE
+        try:
+            stat = self.fs.stat(path)
+            if stat.is_dir:
+                return self._dir(path)
+            cached = self._files.get(path)
+            if cached is not None and cached[0] == stat.mtime and cached[1] == stat.size:
+                return cached[2]
+            node = file_node(self.fs.iter_file(path, READ_CHUNK_SIZE))
+        except OSError:
+            return UNREADABLE
+        # 방금 수정된 파일은 같은 수정 시간 안에 다시 바뀔 수 있으므로 저장하지 않음 (completion.RACY_WINDOW 와 같은 이유)
+        if time.time() - stat.mtime >= RACY_WINDOW:
+            self._files[path] = (stat.mtime, stat.size, node)
+        return node
+
+def diff_trees(expected: TreeNode, actual: TreeNode, limit: int, path: str = '~') -> List[dict]:
+    """
+    기대 트리와 세션 트리의 차이 목록 (digest 가 같은 하위 트리는 내려가지 않음)
+
+    없는 디렉토리나 추가된 디렉토리는 하위 항목을 나열하지 않고 디렉토리 하나로 표시
+
+    Returns
+    -------
+    List[dict]
+        path: 홈 디렉토리 기준 경로 ex) '~/project/src',
+        status: 'missing' (없음), 'unexpected' (기대하지 않은 항목), 'modified' (파일 내용이 다름),
+        'type_mismatch' (파일/디렉토리 종류가 다름), type: 기대 항목의 종류 ('file', 'directory', unexpected 는 실제 항목의 종류)
+        최대 limit 개
+    """
+    diff: List[dict] = []
+    _diff(expected, actual, path, diff, limit)
+    return diff
+
+def _diff(expected: TreeNode, actual: TreeNode, path: str, diff: List[dict], limit: int) -> None:
+    if expected.digest == actual.digest or len(diff) >= limit:
+        return
+    if not expected.is_dir or not actual.is_dir:
+        status = 'modified' if expected.is_dir == actual.is_dir else 'type_mismatch'
+        diff.append({'path': path, 'status': status, 'type': node_type(expected)})
+        return
+    for name in sorted(expected.children.keys() | actual.children.keys()):
+        if len(diff) >= limit:
+            return
+        child_path = f'{path}/{name}'
+        expected_child = expected.children.get(name)
+        actual_child = actual.children.get(name)
+        if actual_child is None:
+            diff.append({'path': child_path, 'status': 'missing', 'type': node_type(expected_child)})
+        elif expected_child is None:
+            diff.append({'path': child_path, 'status': 'unexpected', 'type': node_type(actual_child)})
+        else:
+            _diff(expected_child, actual_child, child_path, diff, limit)
+
+def node_type(node: TreeNode) -> str:
+    return 'directory' if node.is_dir else 'file'
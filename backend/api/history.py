@@ -0,0 +1,149 @@
+import atexit
+import threading
+from typing import List, Optional, Tuple
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+from api.metrics import HISTORY_DROPPED, HISTORY_FLUSHED
+from api.models import CommandHistory
+from api.user import User
+
+class HistoryBuffer:
+    """
+    명령어 기록의 write-behind 버퍼
+
+    명령어 실행 경로에서는 메모리 리스트에 추가만 하고, 백그라운드 스레드가 flush_size 개가 쌓이거나
+    flush_interval 초가 지날 때마다 모아서 bulk_create 로 저장 (명령어 하나마다 SQLite 에 동기로 쓰지 않음)
+    저장 중인 기록도 조회할 수 있도록 저장이 끝날 때까지 _flushing 에 보관
+
+    Methods
+    -------
+    record(user: User, line: str, status: int, duration: float, output_bytes: int)
+        실행된 명령어 줄 기록 (세션 토큰이 없는 사용자는 기록하지 않음)
+    history(session: str, before: Optional[int], limit: int) -> List[CommandHistory]
+        seq 가 before 보다 작은 기록을 최신 순으로 최대 limit 개 (DB 와 버퍼를 합쳐서 조회)
+    flush() -> int
+        버퍼의 기록을 DB 에 저장하고 저장한 개수 반환
+    shutdown()
+        백그라운드 스레드 종료 후 남은 기록 저장 (프로세스 종료 시 atexit 으로 호출)
+    """
+    def __init__(self, flush_size: int, flush_interval: float, max_pending: int):
+        self.flush_size: int = flush_size
+        self.flush_interval: float = flush_interval
+        self.max_pending: int = max_pending
+        self._pending: List[CommandHistory] = []
+        self._flushing: List[CommandHistory] = []
+        self._lock = threading.Lock()
+        # 백그라운드 스레드와 shutdown 의 flush 가 동시에 실행되지 않도록 보호
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped: bool = False
+
+    def record(self, user: User, line: str, status: int, duration: float, output_bytes: int) -> None:
+        if user.token is None:
+            return
+        entry = CommandHistory(session=user.token, seq=next(user.history_seq), username=user.username,
+                               problem_id=user.problem_id, command=line, status=status, duration=duration,
+                               output_bytes=output_bytes, created_at=timezone.now())
+        with self._lock:
+            self._pending.append(entry)
+            self._trim()
+            full = len(self._pending) >= self.flush_size
+        self._start()
+        if full:
+            self._wakeup.set()
+
+    def history(self, session: str, before: Optional[int], limit: int) -> List[CommandHistory]:
+        # 버퍼를 먼저 복사하고 DB 를 조회 (그 사이에 저장된 기록은 DB 조회 결과에 포함됨)
+        with self._lock:
+            buffered = [entry for entry in self._flushing + self._pending
+                        if entry.session == session and (before is None or entry.seq < before)]
+        query = CommandHistory.objects.filter(session=session)
+        if before is not None:
+            query = query.filter(seq__lt=before)
+        # 저장 중인 기록은 DB 와 버퍼 양쪽에서 조회될 수 있으므로 seq 로 중복 제거
+        entries = {entry.seq: entry for entry in query.order_by('-seq')[:limit]}
+        entries.update((entry.seq, entry) for entry in buffered)
+        return sorted(entries.values(), key=lambda entry: entry.seq, reverse=True)[:limit]
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._flushing = batch
+            if not batch:
+                return 0
+            close_old_connections()
+            try:
+                CommandHistory.objects.bulk_create(batch)
+            except DatabaseError:
+                # 저장에 실패한 기록은 다음 flush 에서 다시 저장 (database is locked 등)
+                with self._lock:
+                    self._pending[:0] = batch
+                    self._trim()
+                return 0
+            finally:
+                with self._lock:
+                    self._flushing = []
+                close_old_connections()
+        HISTORY_FLUSHED.inc(amount=len(batch))
+        return len(batch)
+
+    def shutdown(self) -> None:
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _trim(self) -> None:
+        # DB 에 계속 저장하지 못하는 경우 메모리가 무한히 늘어나지 않도록 오래된 기록부터 버림 (_lock 을 잡은 상태에서 호출)
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            HISTORY_DROPPED.inc(amount=overflow)
+
+    def _start(self) -> None:
+        # manage.py 명령어 등에서는 스레드를 만들지 않도록 처음 기록될 때 시작
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='history-flush', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+def get_history(user: User, before: Optional[int] = None, limit: Optional[int] = None) -> Tuple[List[CommandHistory], Optional[int]]:
+    """
+    세션의 명령어 기록 한 페이지 반환
+
+    Parameters
+    ----------
+    user : User
+        기록을 조회할 사용자
+    before : Optional[int]
+        이 seq 보다 이전 기록만 조회 (None 이면 최신 기록부터)
+    limit : Optional[int]
+        최대 개수 (None 이거나 settings.HISTORY_PAGE_SIZE 보다 크면 HISTORY_PAGE_SIZE)
+
+    Returns
+    -------
+    Tuple[List[CommandHistory], Optional[int]]
+        최신 순 기록과 다음 페이지를 조회할 before 값 (마지막 페이지이면 None)
+    """
+    if limit is None or limit > settings.HISTORY_PAGE_SIZE:
+        limit = settings.HISTORY_PAGE_SIZE
+    if user.token is None or limit <= 0:
+        return [], None
+    entries = HISTORY.history(user.token, before, limit)
+    next_before = entries[-1].seq if len(entries) == limit and entries[-1].seq > 1 else None
+    return entries, next_before
+
+HISTORY = HistoryBuffer(settings.HISTORY_FLUSH_SIZE, settings.HISTORY_FLUSH_INTERVAL, settings.HISTORY_MAX_PENDING)
+atexit.register(HISTORY.shutdown)
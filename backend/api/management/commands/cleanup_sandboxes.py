@@ -0,0 +1,24 @@
+import os
+import shutil
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.sandbox_owner import find_orphans
+
+class Command(BaseCommand):
+    help = '서버가 비정상 종료되어 남아있는 샌드박스/템플릿 디렉토리 삭제 (실행 중인 서버 프로세스의 디렉토리는 유지)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=str(settings.SANDBOX_ROOT), help='샌드박스가 생성되는 디렉토리 (settings.SANDBOX_ROOT)')
+
+    def handle(self, *args, **options):
+        removed = 0
+        for path in find_orphans(options['dir']):
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+            else:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+        self.stdout.write(f"Removed {removed} sandbox directories.")
@@ -0,0 +1,246 @@
+import contextlib
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+
+# 세션 하나가 실행하는 명령어 비율 (실제 사용 패턴과 비슷하게 조회 명령어 위주)
+COMMAND_WEIGHTS: Dict[str, int] = {'ls': 30, 'pwd': 20, 'cd': 20, 'mkdir': 15, 'touch': 15}
+# 세션이 만드는 디렉토리의 최대 깊이 (cd 로 계속 내려가지 않도록 제한)
+MAX_DEPTH: int = 3
+# 기준 결과 대비 이 비율 이상 느려지면 회귀로 표시
+REGRESSION_THRESHOLD: float = 0.10
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    # nearest-rank 방식 백분위수 (sorted_values 는 정렬된 리스트)
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(latencies: List[float]) -> dict:
+    # 지연 시간(초) 목록을 밀리초 단위 통계로 변환
+    values = sorted(latencies)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values) * 1000, 3),
+        'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3),
+    }
+
+def git_commit() -> Optional[str]:
+    # 결과 파일에 측정한 커밋을 기록하여 커밋 간 비교에 사용
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class LoadTestServer(ThreadedWSGIServer):
+    # socketserver 기본 listen backlog(5)는 동시 접속이 많으면 SYN 재전송(1초)으로 p99 가 왜곡되므로 늘림
+    request_queue_size = 1024
+
+class QuietRequestHandler(WSGIRequestHandler):
+    # 요청마다 출력되는 접근 로그가 측정에 영향을 주지 않도록 출력하지 않음
+    def log_message(self, format, *args):
+        pass
+
+class CommandMix:
+    """
+    세션 하나의 명령어 생성기
+
+    COMMAND_WEIGHTS 비율로 명령어를 고르고, 만든 디렉토리를 기억해서 cd 가 실제로 존재하는 디렉토리로 이동하도록 함
+    (실패하는 명령어만 반복하지 않도록 세션의 현재 위치를 추적)
+    """
+    def __init__(self, rng: random.Random):
+        self.rng: random.Random = rng
+        self.depth: int = 0
+        # 깊이별로 만든 디렉토리 이름 (현재 위치의 하위 디렉토리만 cd 대상)
+        self.dirs: List[List[str]] = [[]]
+        self.counter: int = 0
+
+    def next(self) -> str:
+        name = self.rng.choices(list(COMMAND_WEIGHTS), weights=list(COMMAND_WEIGHTS.values()))[0]
+        if name == 'cd':
+            children = self.dirs[self.depth]
+            if self.depth >= MAX_DEPTH or not children or self.rng.random() < 0.3:
+                if self.depth == 0:
+                    return 'cd ~'
+                self.depth -= 1
+                self.dirs.pop()
+                return 'cd ..'
+            self.depth += 1
+            self.dirs.append([])
+            return f'cd {self.rng.choice(children)}'
+        if name == 'mkdir':
+            self.counter += 1
+            directory = f'd{self.counter}'
+            self.dirs[self.depth].append(directory)
+            return f'mkdir {directory}'
+        if name == 'touch':
+            self.counter += 1
+            return f'touch f{self.counter}.txt'
+        return name
+
+class Command(BaseCommand):
+    help = '여러 세션이 동시에 connect-user/, input-command/ 를 호출하는 부하 테스트 (처리량, p50/p95/p99 지연 시간)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, default=20, help='동시에 실행하는 세션 수')
+        parser.add_argument('--commands', type=int, default=200, help='세션별로 실행하는 명령어 수')
+        parser.add_argument('--url', default=None,
+                            help='측정할 서버 주소 ex) http://127.0.0.1:8000 (없으면 임시 서버를 실행해서 측정)')
+        parser.add_argument('--endpoint', default='input-command', choices=['input-command', 'input-command-async'],
+                            help='명령어 실행 API')
+        parser.add_argument('--seed', type=int, default=0, help='명령어 생성 seed (같은 seed 는 같은 명령어 순서)')
+        parser.add_argument('--output', default='loadtest.json', help='결과 JSON 파일 경로')
+        parser.add_argument('--baseline', default=None, help='비교할 이전 결과 JSON 파일 경로')
+
+    def handle(self, *args, **options):
+        server = None
+        url = options['url']
+        if url is None:
+            # 같은 프로세스에서 멀티 스레드 WSGI 서버를 실행 (runserver 와 같은 서버, 자동 reload 와 접근 로그 제외)
+            server = LoadTestServer(('127.0.0.1', 0), QuietRequestHandler)
+            server.set_app(get_wsgi_application())
+            threading.Thread(target=server.serve_forever, name='loadtest-server', daemon=True).start()
+            url = f'http://127.0.0.1:{server.server_address[1]}'
+        try:
+            # 뷰에서 print() 하는 요청 내용이 측정 결과 출력과 섞이지 않도록 임시 서버의 출력은 버림
+            with open(os.devnull, 'w') as devnull:
+                with contextlib.redirect_stdout(devnull) if server is not None else contextlib.nullcontext():
+                    result = self.run_load(url.rstrip('/'), options)
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+        with open(options['output'], 'w') as f:
+            json.dump(result, f, indent=2)
+        self.report(result)
+        self.stdout.write(f"Saved results to {options['output']}")
+        if options['baseline']:
+            self.compare(result, options['baseline'])
+
+    def run_load(self, url: str, options) -> dict:
+        sessions: int = options['sessions']
+        commands: int = options['commands']
+        latencies: Dict[str, List[float]] = {}
+        connect_latencies: List[float] = []
+        errors: List[int] = [0]
+        lock = threading.Lock()
+        # 모든 세션이 연결된 뒤 동시에 명령어 실행을 시작
+        barrier = threading.Barrier(sessions + 1)
+
+        def post(path: str, body: dict) -> dict:
+            request = urllib.request.Request(f'{url}/api/{path}/', data=json.dumps(body).encode(),
+                                             headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return json.loads(response.read())
+
+        def run_session(index: int) -> None:
+            mix = CommandMix(random.Random(options['seed'] * 100003 + index))
+            local: Dict[str, List[float]] = {}
+            local_errors = 0
+            token = None
+            try:
+                started = time.perf_counter()
+                token = post('connect-user', {'username': f'load{index}', 'hostname': 'bench'})['session']
+                connect_latency = time.perf_counter() - started
+            except (urllib.error.URLError, OSError, ValueError, KeyError):
+                connect_latency = None
+                local_errors += 1
+            barrier.wait()
+            if token is not None:
+                for _ in range(commands):
+                    line = mix.next()
+                    started = time.perf_counter()
+                    try:
+                        post(options['endpoint'], {'session': token, 'call': line})
+                    except (urllib.error.URLError, OSError, ValueError):
+                        local_errors += 1
+                        continue
+                    local.setdefault(line.split()[0], []).append(time.perf_counter() - started)
+                try:
+                    post('disconnect-user', {'session': token})
+                except (urllib.error.URLError, OSError, ValueError):
+                    pass
+            with lock:
+                for name, values in local.items():
+                    latencies.setdefault(name, []).extend(values)
+                if connect_latency is not None:
+                    connect_latencies.append(connect_latency)
+                errors[0] += local_errors
+
+        threads = [threading.Thread(target=run_session, args=(i,), name=f'loadtest-{i}') for i in range(sessions)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - started
+
+        total = [value for values in latencies.values() for value in values]
+        if not total:
+            raise CommandError(f'No command succeeded against {url} ({errors[0]} errors).')
+        return {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'config': {key: options[key] for key in ('sessions', 'commands', 'endpoint', 'seed')},
+            'duration_s': round(duration, 3),
+            'requests': len(total),
+            'errors': errors[0],
+            'throughput_rps': round(len(total) / duration, 1),
+            'latency': summarize(total),
+            'connect': summarize(connect_latencies),
+            'commands': {name: summarize(values) for name, values in sorted(latencies.items())},
+        }
+
+    def report(self, result: dict) -> None:
+        self.stdout.write(f"commit {result['commit']}  {result['config']['sessions']} sessions  "
+                          f"{result['requests']} requests  {result['errors']} errors  {result['duration_s']}s")
+        self.stdout.write(f"throughput {result['throughput_rps']} req/s")
+        self.stdout.write(f"{'':10} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        rows = [('all', result['latency']), ('connect', result['connect'])] + list(result['commands'].items())
+        for name, stats in rows:
+            if stats['count']:
+                self.stdout.write(f"{name:10} {stats['count']:>7} {stats['p50_ms']:>9} {stats['p95_ms']:>9} "
+                                  f"{stats['p99_ms']:>9} {stats['max_ms']:>9}")
+
+    def compare(self, result: dict, path: str) -> None:
+        # 이전 결과 대비 변화율 출력 (지연 시간은 증가, 처리량은 감소가 회귀)
+        try:
+            with open(path) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read baseline {path}: {e}')
+        if baseline.get('config') != result['config']:
+            self.stderr.write(f"Warning: baseline config {baseline.get('config')} differs from {result['config']}")
+
+        self.stdout.write(f"compared with {path} (commit {baseline.get('commit')})")
+        checks = [('throughput_rps', baseline.get('throughput_rps'), result['throughput_rps'], False)]
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            checks.append((key, baseline.get('latency', {}).get(key), result['latency'][key], True))
+        regressions = 0
+        for name, before, after, higher_is_worse in checks:
+            if not before:
+                continue
+            change = (after - before) / before
+            regressed = change > REGRESSION_THRESHOLD if higher_is_worse else change < -REGRESSION_THRESHOLD
+            regressions += regressed
+            self.stdout.write(f"{name:15} {before:>10} -> {after:>10} ({change:+.1%}){'  REGRESSION' if regressed else ''}")
+        if regressions:
+            self.stderr.write(f'{regressions} metric(s) regressed by more than {REGRESSION_THRESHOLD:.0%}.')
@@ -0,0 +1,210 @@
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+from django.conf import settings
+
+# 수집 결과 (metric 이름 -> label 값 tuple -> 값)
+# counter/gauge 의 값은 숫자, histogram 의 값은 [bucket 별 개수..., 합계, 개수] 리스트
+# 워커 프로세스의 수집 결과를 pickle 로 전달하고 merge() 로 합칠 수 있도록 기본 자료형만 사용
+Snapshot = Dict[str, Dict[Tuple[str, ...], object]]
+
+class Metric:
+    """
+    metric 의 기본 클래스 (label 값 조합별로 값을 보관)
+
+    Attributes
+    ----------
+    name : str
+        metric 이름 ex) 'virtualterminal_command_seconds'
+    help : str
+        metric 설명 (# HELP)
+    kind : str
+        'counter', 'gauge', 'histogram' (# TYPE)
+    labelnames : Tuple[str, ...]
+        label 이름 목록
+    """
+    kind: str = ''
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name: str = name
+        self.help: str = help
+        self.labelnames: Tuple[str, ...] = labelnames
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def collect(self) -> Dict[Tuple[str, ...], object]:
+        with self._lock:
+            return {labels: list(value) if isinstance(value, list) else value for labels, value in self._values.items()}
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+class Histogram(Metric):
+    """
+    값의 분포를 bucket 별 개수로 기록하는 metric (ex. 명령어 실행 시간)
+    bucket 별 개수는 누적하지 않고 보관하고, 출력할 때 누적 개수(le)로 변환
+    """
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Iterable[float] = ()):
+        super().__init__(name, help, labelnames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                # 마지막 bucket 은 +Inf, 그 뒤에 합계와 개수
+                counts = self._values[labels] = [0] * (len(self.buckets) + 3)
+            counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+class Gauge(Metric):
+    """
+    수집할 때 callback 으로 현재 값을 계산하는 metric (ex. 활성 세션 수)
+
+    callback 은 {label 값 tuple: 값} dict 를 반환
+    """
+    kind = 'gauge'
+
+    def __init__(self, name: str, help: str, callback: Callable[[], Dict[Tuple[str, ...], float]], labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+
+    def collect(self) -> Dict[Tuple[str, ...], object]:
+        return dict(self.callback())
+
+class MetricsRegistry:
+    """
+    프로세스의 metric 목록
+
+    Methods
+    -------
+    counter(name: str, help: str, labelnames: Tuple[str, ...]) -> Counter
+    histogram(name: str, help: str, labelnames: Tuple[str, ...], buckets: Iterable[float]) -> Histogram
+    gauge(name: str, help: str, callback, labelnames: Tuple[str, ...]) -> Gauge
+        metric 등록
+    collect() -> Snapshot
+        현재 프로세스의 모든 metric 값 수집
+    render(snapshot: Snapshot) -> str
+        수집 결과를 Prometheus text format 으로 변환
+    """
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Iterable[float] = ()) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name: str, help: str, callback, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, help, callback, labelnames))
+
+    def collect(self) -> Snapshot:
+        return {name: metric.collect() for name, metric in self._metrics.items()}
+
+    def render(self, snapshot: Snapshot) -> str:
+        lines: List[str] = []
+        for name, metric in self._metrics.items():
+            lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for labels, value in sorted(snapshot.get(name, {}).items()):
+                pairs = list(zip(metric.labelnames, labels))
+                if metric.kind != 'histogram':
+                    lines.append(f'{name}{format_labels(pairs)} {format_value(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float('inf'),), value):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{format_labels(pairs + [("le", format_value(bound))])} {cumulative}')
+                lines.append(f'{name}_sum{format_labels(pairs)} {format_value(value[-2])}')
+                lines.append(f'{name}_count{format_labels(pairs)} {value[-1]}')
+        return '\n'.join(lines) + '\n'
+
+def merge(snapshots: Iterable[Snapshot]) -> Snapshot:
+    # 여러 프로세스의 수집 결과를 합침 (counter/histogram 은 프로세스별 누적값의 합, gauge 는 세션 수처럼 프로세스별 값의 합)
+    merged: Snapshot = {}
+    for snapshot in snapshots:
+        for name, values in snapshot.items():
+            target = merged.setdefault(name, {})
+            for labels, value in values.items():
+                if labels not in target:
+                    target[labels] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    target[labels] = [a + b for a, b in zip(target[labels], value)]
+                else:
+                    target[labels] += value
+    return merged
+
+def format_labels(pairs) -> str:
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def timed_view(name: str):
+    # 뷰의 응답 시간을 REQUEST_SECONDS 에 기록하는 데코레이터 (sync/async 뷰 모두 지원, api_view 보다 안쪽에 적용)
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await view(*args, **kwargs)
+                finally:
+                    REQUEST_SECONDS.observe(time.perf_counter() - started, name)
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                REQUEST_SECONDS.observe(time.perf_counter() - started, name)
+        return wrapper
+    return decorator
+
+METRICS = MetricsRegistry()
+
+REQUEST_SECONDS = METRICS.histogram('virtualterminal_request_seconds',
+                                    'Time spent handling command requests in views.',
+                                    ('view',), settings.METRICS_LATENCY_BUCKETS)
+COMMAND_SECONDS = METRICS.histogram('virtualterminal_command_seconds',
+                                    'Command execution time by command name (pipelines and redirections are labelled "pipeline").',
+                                    ('command',), settings.METRICS_LATENCY_BUCKETS)
+COMMAND_ERRORS = METRICS.counter('virtualterminal_command_errors_total',
+                                 'Commands that finished with a non-zero exit status.',
+                                 ('command',))
+COMMAND_LIMITS = METRICS.counter('virtualterminal_command_limits_total',
+                                 'Commands stopped by the execution policy.',
+                                 ('reason',))
+PROCESS_SPAWNS = METRICS.counter('virtualterminal_process_spawns_total',
+                                 'External command processes started.',
+                                 ('command',))
+COMMAND_CACHE = METRICS.counter('virtualterminal_command_cache_total',
+                                'Read-only command lookups in the per-session result cache.',
+                                ('result',))
+HISTORY_FLUSHED = METRICS.counter('virtualterminal_history_flushed_total',
+                                  'Command history entries written to the database.')
+HISTORY_DROPPED = METRICS.counter('virtualterminal_history_dropped_total',
+                                  'Command history entries dropped because the write-behind buffer was full.')
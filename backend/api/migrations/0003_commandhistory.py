@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:52
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_problem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommandHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session', models.CharField(max_length=64)),
+                ('seq', models.PositiveIntegerField()),
+                ('username', models.CharField(max_length=100)),
+                ('problem_id', models.IntegerField(blank=True, null=True)),
+                ('command', models.TextField()),
+                ('status', models.IntegerField()),
+                ('duration', models.FloatField()),
+                ('output_bytes', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['session', 'seq'], name='api_command_session_6a7e23_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_commandhistory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='expected',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 class Item(models.Model):
@@ -8,4 +9,55 @@ class Item(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+# 문제 정보 (허용된 명령어, 초기 디렉토리 템플릿)
+class Problem(models.Model):
+    title = models.CharField(max_length=100)
+    description = models.TextField(blank=True)
+    allowed_commands = models.JSONField(default=list)   # 허용된 명령어 리스트 ex) ["cd", "ls"]
+    template = models.JSONField(default=dict, blank=True)   # 홈 디렉토리 기준 트리 ex) {"project": {"README.md": "hello"}}
+    expected = models.JSONField(null=True, blank=True)  # 채점 기준인 홈 디렉토리의 최종 상태 (template 과 같은 형식, 없으면 채점하지 않음)
+    version = models.PositiveIntegerField(default=1)    # 수정될 때마다 증가 (캐시 무효화에 사용)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            self.version += 1
+            # update_fields 로 일부 필드만 저장하는 경우에도 증가한 버전을 함께 저장 (캐시된 이전 버전이 계속 사용되지 않도록)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'version' not in update_fields:
+                kwargs['update_fields'] = [*update_fields, 'version']
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.title
+
+# 세션에서 실행된 명령어 기록 (api.history.HISTORY 가 모아서 bulk_create 로 저장)
+class CommandHistory(models.Model):
+    session = models.CharField(max_length=64)           # 세션 토큰
+    seq = models.PositiveIntegerField()                 # 세션 안에서의 실행 순서 (1 부터 시작, 페이지 cursor 로 사용)
+    username = models.CharField(max_length=100)
+    problem_id = models.IntegerField(null=True, blank=True)
+    command = models.TextField()                        # 사용자가 입력한 명령어 줄
+    status = models.IntegerField()                      # 종료 코드
+    duration = models.FloatField()                      # 실행 시간 (초)
+    output_bytes = models.PositiveIntegerField()        # 출력 크기 (바이트)
+    created_at = models.DateTimeField(default=timezone.now)    # 실행 시각 (저장 시각이 아닌 기록 시각)
+
+    class Meta:
+        indexes = [models.Index(fields=['session', 'seq'])]
+
+    def to_dict(self) -> dict:
+        return {
+            'seq': self.seq,
+            'command': self.command,
+            'status': self.status,
+            'duration': self.duration,
+            'output_bytes': self.output_bytes,
+            'created_at': self.created_at.isoformat(),
+        }
+
+    def __str__(self):
+        return f'{self.session}#{self.seq} {self.command}'
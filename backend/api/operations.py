@@ -0,0 +1,248 @@
+import asyncio
+import functools
+import threading
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional
+from django.conf import settings
+from api.command_exec import CommandResult, execute_line, execute_line_async, stream_line_async
+from api.completion import complete_line
+from api.executor import COMMAND_EXECUTOR
+from api.grading import diff_trees
+from api.history import get_history
+from api.metrics import METRICS, Snapshot
+from api.models import Problem
+from api.output import get_page
+from api.problem import PROBLEMS, get_problem_context, get_problem_context_async
+from api.session import SESSIONS
+from api.snapshot import SNAPSHOTS
+from api.user import SessionClosed, User
+
+# 세션이 존재하는 프로세스에서 실행되는 세션 단위 작업
+# 뷰와 웹소켓은 세션에 직접 접근하지 않고 api.engine.ENGINE 을 통해 이 함수들을 호출함
+# (워커 프로세스를 사용하는 경우 세션을 소유한 워커 프로세스에서 실행됨)
+
+class SessionNotFound(LookupError):
+    pass
+
+class ProblemNotFound(LookupError):
+    pass
+
+class OutputNotFound(LookupError):
+    pass
+
+class ExpectedStateNotFound(LookupError):
+    pass
+
+def retry_closed(function):
+    # 명령어가 user.lock 을 기다리는 동안 세션이 삭제/보관된 경우 세션을 다시 조회하여 한번 더 실행 (보관된 세션은 스냅샷에서 복원)
+    @functools.wraps(function)
+    def wrapper(token, *args, **kwargs):
+        try:
+            return function(token, *args, **kwargs)
+        except SessionClosed:
+            pass
+        try:
+            return function(token, *args, **kwargs)
+        except SessionClosed:
+            raise SessionNotFound(token)
+    return wrapper
+
+def retry_closed_async(function):
+    @functools.wraps(function)
+    async def wrapper(token, *args, **kwargs):
+        try:
+            return await function(token, *args, **kwargs)
+        except SessionClosed:
+            pass
+        try:
+            return await function(token, *args, **kwargs)
+        except SessionClosed:
+            raise SessionNotFound(token)
+    return wrapper
+
+# 같은 세션의 스냅샷을 동시에 복원하지 않도록 보호
+RESUME_LOCK = threading.Lock()
+
+def get_user(token: Optional[str]) -> User:
+    user = SESSIONS.get(token)
+    if user is None:
+        # 스냅샷으로 보관된 세션은 처음 요청될 때 복원
+        user = resume_user(token)
+        if user is None:
+            raise SessionNotFound(token)
+    return user
+
+async def get_user_async(token: Optional[str]) -> User:
+    # 스냅샷 복원은 파일을 읽고 샌드박스를 만들므로 이벤트 루프를 막지 않도록 스레드에서 실행
+    user = SESSIONS.get(token)
+    if user is None:
+        user = await asyncio.get_running_loop().run_in_executor(COMMAND_EXECUTOR, resume_user, token)
+        if user is None:
+            raise SessionNotFound(token)
+    return user
+
+def resume_user(token: Optional[str]) -> Optional[User]:
+    # index 만 읽어서 세션을 등록하고, 디렉토리는 명령어가 접근할 때 생성
+    with RESUME_LOCK:
+        user = SESSIONS.get(token)
+        if user is None:
+            user = SNAPSHOTS.load(token)
+            if user is not None:
+                SESSIONS.add(token, user)
+        return user
+
+def connect(token: str, username: str, hostname: str) -> str:
+    return SESSIONS.create(username, hostname, token)
+
+def disconnect(token: str) -> None:
+    # 보관된 세션은 스냅샷만 삭제
+    if not SESSIONS.remove(token) and not SNAPSHOTS.discard(token):
+        raise SessionNotFound(token)
+
+@retry_closed
+def suspend(token: str) -> dict:
+    # 세션을 스냅샷으로 저장하고 샌드박스를 반납 (다음 요청 또는 resume 에서 복원)
+    user = get_user(token)
+    # 저장한 뒤 반납하기 전에 다른 명령어가 실행되어 변경 내용이 스냅샷에서 빠지지 않도록 반납까지 lock 유지
+    with user.lock:
+        user.check_open()
+        size = SNAPSHOTS.save(user)
+        SESSIONS.detach(token, user)
+    return {'session': token, 'bytes': size}
+
+def resume(token: str) -> dict:
+    return {'session': token, 'prompt': get_user(token).get_prompt()}
+
+def get_prompt(token: str) -> str:
+    return get_user(token).get_prompt()
+
+def select_problem(token: str, problem_id) -> dict:
+    user = get_user(token)
+    try:
+        definition = PROBLEMS.get(problem_id)
+    except (ValueError, TypeError, Problem.DoesNotExist):
+        raise ProblemNotFound(problem_id)
+    # 이후 명령어는 선택된 문제의 허용된 명령어와 템플릿으로 실행 (템플릿은 다음 명령어 실행 시 마운트)
+    user.problem_id = definition.problem_id
+    return definition.to_dict()
+
+@retry_closed
+def execute(token: str, line: str) -> CommandResult:
+    user = get_user(token)
+    allowed_commands, template = get_problem_context(user)
+    return execute_line(user, line, allowed_commands, template)
+
+@retry_closed
+def execute_script(token: str, lines: List[str], stop_on_error: bool = False) -> List[dict]:
+    user = get_user(token)
+    allowed_commands, template = get_problem_context(user)
+    results: List[dict] = []
+    for line in lines:
+        result = execute_line(user, line, allowed_commands, template)
+        results.append({'command': line, **result.to_dict()})
+        if stop_on_error and result.status != 0:
+            break
+    return results
+
+@retry_closed
+def grade(token: str) -> dict:
+    """
+    세션 홈 디렉토리를 선택된 문제의 기대 상태와 비교
+
+    두 Merkle tree 의 루트 digest 만 비교하므로 변경이 없는 세션은 트리를 다시 읽지 않고,
+    일치하지 않는 경우에만 digest 가 다른 하위 트리를 따라가서 차이 목록을 만듦
+    """
+    user = get_user(token)
+    if user.problem_id is None:
+        raise ProblemNotFound(None)
+    try:
+        definition = PROBLEMS.get(user.problem_id)
+    except Problem.DoesNotExist:
+        raise ProblemNotFound(user.problem_id)
+    if definition.expected is None:
+        raise ExpectedStateNotFound(user.problem_id)
+    with user.lock:
+        user.check_open()
+        # 아직 명령어를 실행하지 않은 세션도 템플릿이 마운트된 상태로 채점
+        user.mount_template(definition.template)
+        user.ensure_restored()
+        actual = user.tree_hash.tree()
+    passed = actual.digest == definition.expected.digest
+    return {
+        'passed': passed,
+        'digest': actual.digest.hex(),
+        'diff': [] if passed else diff_trees(definition.expected, actual, settings.GRADING_MAX_DIFF),
+    }
+
+def complete(token: str, line: str) -> dict:
+    # 명령어 실행 중에도 응답할 수 있도록 세션 lock 없이 인덱스만 조회
+    user = get_user(token)
+    allowed_commands, _ = get_problem_context(user)
+    return complete_line(user, line, allowed_commands)
+
+def history(token: str, before: Optional[int] = None, limit: Optional[int] = None) -> dict:
+    # 세션의 명령어 기록을 최신 순으로 한 페이지 반환 (아직 DB 에 저장되지 않은 기록 포함)
+    entries, next_before = get_history(get_user(token), before, limit)
+    return {'results': [entry.to_dict() for entry in entries], 'next_before': next_before}
+
+def get_output(token: str, output_id: str, cursor: int) -> dict:
+    # 한 페이지를 초과한 명령어 출력의 cursor 위치부터 한 페이지 반환 (cursor 가 음수이면 ValueError)
+    data = get_user(token).outputs.get(output_id)
+    if data is None:
+        raise OutputNotFound(output_id)
+    output, next_cursor = get_page(data, cursor, settings.OUTPUT_PAGE_BYTES)
+    return {'output': output, 'output_id': output_id, 'next_cursor': next_cursor}
+
+def collect_metrics(token: Optional[str] = None) -> Snapshot:
+    # 세션과 관계없이 현재 프로세스의 metric 수집 (워커 프로세스를 사용하는 경우 워커마다 호출)
+    return METRICS.collect()
+
+@retry_closed_async
+async def execute_async(token: str, line: str) -> CommandResult:
+    user = await get_user_async(token)
+    allowed_commands, template = await get_problem_context_async(user)
+    return await execute_line_async(user, line, allowed_commands, template)
+
+async def complete_async(token: str, line: str) -> dict:
+    # 자동 완성은 디렉토리 항목 조회만 하므로 스레드로 넘기지 않고 이벤트 루프에서 바로 처리
+    user = await get_user_async(token)
+    allowed_commands, _ = await get_problem_context_async(user)
+    return complete_line(user, line, allowed_commands)
+
+async def stream_async(token: str, line: str) -> AsyncIterator[str]:
+    # 출력을 보내기 전에 세션이 삭제/보관된 경우에만 다시 조회하여 실행 (retry_closed 와 같음)
+    for retry in (False, True):
+        user = await get_user_async(token)
+        allowed_commands, template = await get_problem_context_async(user)
+        sent = False
+        try:
+            async with aclosing(stream_line_async(user, line, allowed_commands, template)) as stream:
+                async for chunk in stream:
+                    sent = True
+                    yield chunk
+            return
+        except SessionClosed:
+            if sent or retry:
+                raise SessionNotFound(token)
+
+OPERATIONS: Dict[str, object] = {
+    'connect': connect,
+    'disconnect': disconnect,
+    'suspend': suspend,
+    'resume': resume,
+    'get_prompt': get_prompt,
+    'select_problem': select_problem,
+    'execute': execute,
+    'execute_script': execute_script,
+    'get_output': get_output,
+    'complete': complete,
+    'grade': grade,
+    'history': history,
+    'collect_metrics': collect_metrics,
+}
+
+# 이벤트 루프에서 직접 실행할 수 있는 작업 (나머지는 스레드 풀에서 실행)
+ASYNC_OPERATIONS: Dict[str, object] = {
+    'execute': execute_async,
+    'complete': complete_async,
+}
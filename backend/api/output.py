@@ -0,0 +1,167 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+def char_boundary(data: bytes, index: int) -> int:
+    # utf-8 문자 중간에서 잘리지 않도록 index 를 문자 시작 위치로 조정 (continuation byte: 0b10xxxxxx)
+    while 0 < index < len(data) and data[index] & 0xC0 == 0x80:
+        index -= 1
+    return index
+
+class OutputBuffer:
+    """
+    명령어 출력을 최대 limit 바이트까지만 보관하는 버퍼
+
+    limit 을 초과한 출력은 저장하지 않고 크기만 기록함 (명령어 실행은 Command_Exec 이 중단하고 note() 로 생략 표시를 추가)
+    명령어가 출력을 생성하는 대로 write() 하므로 출력이 아무리 커도 메모리 사용량은 limit 으로 제한됨
+
+    Attributes
+    ----------
+    limit : int
+        보관하는 최대 바이트 수
+    size : int
+        보관 중인 바이트 수
+    dropped : int
+        limit 초과로 버려진 바이트 수
+
+    Methods
+    -------
+    write(text: str)
+        출력 추가
+    note(text: str)
+        limit 과 관계없이 출력 끝에 안내 메세지 추가 (ex. 실행 제한 초과 메세지)
+    separate()
+        다음 출력 앞에 줄바꿈 추가 (여러 명령어의 출력 구분, 출력이 없는 명령어는 구분하지 않음)
+    getvalue() -> bytes
+        보관된 출력
+    """
+    __slots__ = ('limit', 'chunks', 'size', 'dropped', 'last', 'pending_newline')
+
+    def __init__(self, limit: int):
+        self.limit: int = limit
+        self.chunks: List[bytes] = []
+        self.size: int = 0
+        self.dropped: int = 0
+        self.last: str = ''
+        self.pending_newline: bool = False
+
+    def write(self, text: str) -> None:
+        if not text:
+            return
+        if self.pending_newline:
+            self.pending_newline = False
+            self.write('\n')
+        data = text.encode('utf-8')
+        room = self.limit - self.size
+        last = text[-1]
+        if len(data) > room:
+            cut = char_boundary(data, max(room, 0))
+            self.dropped += len(data) - cut
+            data = data[:cut]
+            if not data:
+                return
+            # 줄바꿈 여부는 실제로 보관한 출력의 마지막 문자로 판단 (버린 부분의 문자는 클라이언트에 전달되지 않음)
+            last = data[char_boundary(data, len(data) - 1):].decode('utf-8')
+        self.last = last
+        self.chunks.append(data)
+        self.size += len(data)
+
+    def note(self, text: str) -> None:
+        if self.last and self.last != '\n':
+            self.chunks.append(b'\n')
+        data = text.encode('utf-8')
+        self.chunks.append(data)
+        self.size += len(data)
+        self.last = text[-1:]
+        self.pending_newline = False
+
+    def separate(self) -> None:
+        if self.last and self.last != '\n':
+            self.pending_newline = True
+
+    def getvalue(self) -> bytes:
+        return b''.join(self.chunks)
+
+def get_page(data: bytes, cursor: int, page_size: int) -> Tuple[str, Optional[int]]:
+    """
+    출력의 cursor 위치부터 최대 page_size 바이트 반환
+
+    Returns
+    -------
+    Tuple[str, Optional[int]]
+        출력 문자열과 다음 페이지 cursor (마지막 페이지이면 None)
+    """
+    if cursor < 0:
+        raise ValueError(cursor)
+    end = char_boundary(data, min(cursor + page_size, len(data)))
+    return data[cursor:end].decode('utf-8', errors='replace'), (end if end < len(data) else None)
+
+class OutputStore:
+    """
+    세션별로 한 페이지를 초과한 명령어 출력을 잠시 보관하는 저장소 (get-output/ 으로 나머지 페이지 조회)
+
+    최근 max_entries 개의 출력만 보관하고, ttl 초가 지난 출력은 삭제됨
+    """
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries: int = max_entries
+        self.ttl: float = ttl
+        self._outputs: 'OrderedDict[str, Tuple[float, bytes]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, data: bytes) -> str:
+        output_id = secrets.token_urlsafe(8)
+        now = time.monotonic()
+        with self._lock:
+            self._outputs[output_id] = (now + self.ttl, data)
+            while self._outputs:
+                oldest_id, (expires, _) = next(iter(self._outputs.items()))
+                if len(self._outputs) <= self.max_entries and expires > now:
+                    break
+                del self._outputs[oldest_id]
+        return output_id
+
+    def get(self, output_id: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._outputs.get(output_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._outputs[output_id]
+                return None
+            return entry[1]
+
+class ResultCache:
+    """
+    세션별 읽기 전용 명령어(ls, pwd, cat)의 출력 캐시 (LRU)
+
+    key 는 (명령어 인자, 현재 디렉토리, 파일 시스템 세대 번호 User.generation) 이고,
+    파일 시스템을 변경하는 명령어가 실행되면 세대 번호가 증가하므로 이전 세대의 결과는 다시 조회되지 않음 (LRU 로 밀려나서 삭제)
+    """
+    def __init__(self, max_entries: int, max_length: int):
+        self.max_entries: int = max_entries
+        # 이보다 긴 출력은 저장하지 않음 (큰 파일의 cat 결과로 메모리를 차지하지 않도록)
+        self.max_length: int = max_length
+        self._results: 'OrderedDict[tuple, str]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            output = self._results.get(key)
+            if output is not None:
+                self._results.move_to_end(key)
+            return output
+
+    def put(self, key: tuple, output: str) -> None:
+        if self.max_entries <= 0 or len(output) > self.max_length:
+            return
+        with self._lock:
+            self._results[key] = output
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
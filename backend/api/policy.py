@@ -0,0 +1,182 @@
+import errno
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+from django.conf import settings
+
+try:
+    import resource
+except ImportError:
+    # resource 모듈이 없는 환경(windows)에서는 시간 제한과 출력 제한만 적용
+    resource = None
+
+# 제한을 초과하여 중단된 경우의 종료 코드 (timeout 명령어와 동일)
+TIMEOUT_STATUS: int = 124
+
+# 현재 실행 중인 명령어 (스레드와 asyncio task 별로 구분되도록 ContextVar 사용)
+CURRENT_EXECUTION: ContextVar = ContextVar('current_execution', default=None)
+
+# 제한 종류별 사용자에게 전달하는 메세지
+LIMIT_MESSAGES = {
+    'timeout': "명령어 실행 시간이 {timeout}초를 초과하여 종료되었습니다.",
+    'cpu': "명령어의 CPU 사용 시간이 {cpu_seconds}초를 초과하여 종료되었습니다.",
+    'output': "출력이 {max_output_bytes} 바이트를 초과하여 실행을 중단했습니다.",
+}
+
+def register_process(pid: int) -> None:
+    # 외부 명령어 프로세스를 현재 실행 중인 명령어에 등록 (Command_Exec 밖에서 실행된 경우 제한 없음)
+    execution = CURRENT_EXECUTION.get()
+    if execution is not None:
+        execution.register(pid)
+
+def check_deadline() -> None:
+    """
+    builtin 명령어의 파일 읽기 중간에 시간 제한 확인 (출력 chunk 사이가 아니라 읽기 단위로 확인)
+
+    redirection 과 같이 출력을 Command_Exec 에 전달하지 않고 소비하는 경우에도 시간 제한이 적용되도록
+    파일 시스템의 읽기 loop 에서 호출하고, 제한을 초과하면 TimeoutError (OSError) 를 발생시킴
+    """
+    execution = CURRENT_EXECUTION.get()
+    if execution is not None and execution.expired():
+        raise TimeoutError(errno.ETIMEDOUT, os.strerror(errno.ETIMEDOUT))
+
+def kill_process_group(pid: int) -> None:
+    # 외부 명령어는 새 세션(프로세스 그룹)으로 실행되므로 그룹 전체를 종료하여 자식 프로세스도 함께 정리
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (OSError, AttributeError):
+        pass
+
+class Execution:
+    """
+    명령어 하나(파이프라인 포함)의 실행 상태
+
+    외부 명령어 프로세스는 생성될 때 등록되고, 시간 제한을 초과하면 watchdog 타이머가 등록된 프로세스를 모두 종료함
+    (타이머는 프로세스가 처음 등록될 때만 생성되므로 builtin 명령어에는 비용이 없음)
+
+    Attributes
+    ----------
+    deadline : float
+        실행 제한 시각 (time.monotonic 기준)
+    reason : Optional[str]
+        실행을 중단한 제한 종류 ('timeout', 'cpu', 'output'), 제한에 걸리지 않았으면 None
+    """
+    __slots__ = ('policy', 'deadline', 'reason', '_pids', '_timer', '_lock')
+
+    def __init__(self, policy: 'ExecutionPolicy'):
+        self.policy: ExecutionPolicy = policy
+        self.deadline: float = time.monotonic() + policy.timeout
+        self.reason: Optional[str] = None
+        self._pids: List[int] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def register(self, pid: int) -> None:
+        self.policy.limit_process(pid)
+        with self._lock:
+            self._pids.append(pid)
+            if self.reason is not None:
+                kill_process_group(pid)
+            elif self._timer is None:
+                self._timer = threading.Timer(max(self.deadline - time.monotonic(), 0), self.expire)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def expired(self) -> bool:
+        if self.reason is None and time.monotonic() >= self.deadline:
+            self.stop('timeout')
+        return self.reason == 'timeout'
+
+    def expire(self) -> None:
+        self.stop('timeout')
+
+    def stop(self, reason: str) -> None:
+        with self._lock:
+            if self.reason is None:
+                self.reason = reason
+            for pid in self._pids:
+                kill_process_group(pid)
+
+    def finish(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+
+    def check_status(self, status: int) -> None:
+        # RLIMIT_CPU 의 soft limit 을 초과하면 SIGXCPU 로 종료됨 (종료 코드 128 + signal)
+        if self.reason is None and resource is not None and status == 128 + signal.SIGXCPU:
+            self.reason = 'cpu'
+
+    def message(self) -> str:
+        return LIMIT_MESSAGES[self.reason].format(timeout=self.policy.timeout,
+                                                  cpu_seconds=self.policy.cpu_seconds,
+                                                  max_output_bytes=self.policy.max_output_bytes)
+
+class ExecutionPolicy:
+    """
+    명령어 실행 제한 (Command_Exec 이 모든 명령어에 동일하게 적용)
+
+    Attributes
+    ----------
+    timeout : float
+        명령어 하나의 최대 실행 시간(초), 초과하면 프로세스 그룹을 종료하고 종료 코드 124
+    cpu_seconds : int
+        외부 명령어 프로세스의 최대 CPU 시간(초, RLIMIT_CPU), 0 이면 제한 없음
+    memory_bytes : int
+        외부 명령어 프로세스의 최대 주소 공간 크기(바이트, RLIMIT_AS), 0 이면 제한 없음
+    max_processes : int
+        외부 명령어 실행 사용자의 최대 프로세스 수(RLIMIT_NPROC), 0 이면 제한 없음
+    max_output_bytes : int
+        명령어 줄 하나의 최대 출력 크기(바이트), 초과하면 실행 중단
+
+    Methods
+    -------
+    watch() -> Execution
+        명령어 실행 동안 현재 실행 context 의 Execution 을 설정하는 context manager
+    limit_process(pid: int)
+        외부 명령어 프로세스에 resource limit 적용
+    """
+    def __init__(self, timeout: float, cpu_seconds: int, memory_bytes: int, max_processes: int, max_output_bytes: int):
+        self.timeout: float = timeout
+        self.cpu_seconds: int = cpu_seconds
+        self.memory_bytes: int = memory_bytes
+        self.max_processes: int = max_processes
+        self.max_output_bytes: int = max_output_bytes
+
+    @contextmanager
+    def watch(self) -> Iterator[Execution]:
+        execution = Execution(self)
+        token = CURRENT_EXECUTION.set(execution)
+        try:
+            yield execution
+        finally:
+            execution.finish()
+            try:
+                CURRENT_EXECUTION.reset(token)
+            except ValueError:
+                # 중간에 종료된 async generator 가 다른 context 에서 정리되는 경우 (설정한 context 는 이미 사용되지 않음)
+                pass
+
+    def limit_process(self, pid: int) -> None:
+        # preexec_fn 은 멀티 스레드 환경에서 안전하지 않으므로 프로세스 생성 직후 prlimit 으로 적용 (linux)
+        if resource is None or not hasattr(resource, 'prlimit'):
+            return
+        limits = ((resource.RLIMIT_CPU, self.cpu_seconds),
+                  (resource.RLIMIT_AS, self.memory_bytes),
+                  (resource.RLIMIT_NPROC, self.max_processes))
+        for limit, value in limits:
+            if value > 0:
+                try:
+                    # soft limit 초과 시 SIGXCPU, hard limit 초과 시 SIGKILL (CPU 시간 기준 1초 여유)
+                    resource.prlimit(pid, limit, (value, value + 1 if limit == resource.RLIMIT_CPU else value))
+                except (OSError, ValueError):
+                    pass
+
+EXECUTION_POLICY = ExecutionPolicy(settings.COMMAND_TIMEOUT,
+                                   settings.COMMAND_CPU_SECONDS,
+                                   settings.COMMAND_MEMORY_BYTES,
+                                   settings.COMMAND_MAX_PROCESSES,
+                                   settings.MAX_OUTPUT_BYTES)
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Tuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from api.command_dict import is_builtin
+from api.grading import TreeNode, build_tree
+from api.models import Problem
+from api.template import TEMPLATES, ProblemTemplate
+
+# 문제가 선택되지 않은 세션에서 허용되는 명령어
+DEFAULT_ALLOWED_COMMANDS: FrozenSet[str] = frozenset(['cd', 'pwd', 'mkdir', 'ls', 'touch', 'echo', 'cat', 'history'])
+
+class ProblemDefinition:
+    """
+    명령어 실행 시 필요한 문제 정보 (DB 조회 결과를 캐시하기 위한 불변 객체)
+
+    Attributes
+    ----------
+    problem_id : int
+        문제 id
+    version : int
+        문제 버전 (Problem 이 수정될 때마다 증가)
+    title : str
+        문제 제목
+    description : str
+        문제 설명
+    allowed_commands : FrozenSet[str]
+        허용된 명령어 집합
+    template : Optional[ProblemTemplate]
+        홈 디렉토리에 마운트할 템플릿 (없으면 None)
+    expected : Optional[TreeNode]
+        채점 기준인 홈 디렉토리 최종 상태의 Merkle tree (없으면 None)
+    """
+    __slots__ = ('problem_id', 'version', 'title', 'description', 'allowed_commands', 'template', 'expected')
+
+    def __init__(self, problem: Problem):
+        self.problem_id: int = problem.pk
+        self.version: int = problem.version
+        self.title: str = problem.title
+        self.description: str = problem.description
+        self.allowed_commands: FrozenSet[str] = frozenset(problem.allowed_commands)
+        # 외부 명령어가 허용된 문제는 템플릿 파일을 하드링크로 공유하지 않음 (ProblemTemplate.link_files)
+        link_files = all(is_builtin(name) for name in self.allowed_commands)
+        self.template: Optional[ProblemTemplate] = (
+            TEMPLATES.get(template_id(problem.pk, problem.template, link_files), problem.template, link_files)
+            if problem.template else None
+        )
+        # 기대 상태의 hash 는 문제 버전마다 한번만 계산하고 모든 세션의 채점에서 공유
+        self.expected: Optional[TreeNode] = build_tree(problem.expected) if problem.expected is not None else None
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.problem_id,
+            'title': self.title,
+            'description': self.description,
+            'allowed_commands': sorted(self.allowed_commands),
+        }
+
+def template_id(problem_id: int, spec: dict, link_files: bool) -> str:
+    """
+    템플릿 내용으로 정해지는 템플릿 식별자
+
+    문제 버전이 아닌 내용의 hash 를 사용하므로 제목/설명만 수정된 경우에는 같은 템플릿이 유지되어
+    세션의 홈 디렉토리가 다시 마운트되지 않음
+    """
+    content = json.dumps([spec, link_files], sort_keys=True, separators=(',', ':'))
+    return f"{problem_id}:{hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()}"
+
+class ProblemStore:
+    """
+    문제 정보 LRU 캐시
+
+    명령어를 실행할 때마다 DB 를 조회하지 않도록 문제 정보를 프로세스 메모리에 보관
+    Problem 이 저장/삭제되면 signal 로 해당 문제의 캐시가 무효화됨 (오래된 버전은 다시 저장되지 않음)
+    signal 은 저장한 프로세스에서만 실행되므로 check_interval 초가 지난 항목은 DB 의 버전만 조회하여 다시 확인
+
+    Methods
+    -------
+    get(problem_id: int) -> ProblemDefinition
+        문제 정보 반환 (캐시에 없거나 버전이 다르면 DB 조회, 존재하지 않으면 Problem.DoesNotExist)
+    get_cached(problem_id: int) -> Optional[ProblemDefinition]
+        최근에 확인한 캐시 항목만 반환 (DB 조회 없음, 확인이 필요하면 None)
+    invalidate(problem_id: int, version: Optional[int])
+        문제 캐시 삭제
+    """
+    def __init__(self, maxsize: int, check_interval: float):
+        self.maxsize: int = maxsize
+        self.check_interval: float = check_interval
+        # 문제 id -> (문제 정보, DB 의 버전과 마지막으로 비교한 시간 time.monotonic)
+        self._cache: 'OrderedDict[int, Tuple[ProblemDefinition, float]]' = OrderedDict()
+        # 문제별로 확인된 최신 버전 (무효화 이후 이전 버전이 다시 캐시되는 것을 방지)
+        self._versions = {}
+        # 문제별로 마지막에 캐시한 템플릿 식별자 (내용이 바뀐 경우에만 이전 템플릿 삭제)
+        self._template_ids: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def get_cached(self, problem_id: int) -> Optional[ProblemDefinition]:
+        with self._lock:
+            entry = self._cache.get(problem_id)
+            if entry is None or time.monotonic() - entry[1] >= self.check_interval:
+                return None
+            self._cache.move_to_end(problem_id)
+            return entry[0]
+
+    def get(self, problem_id: int) -> ProblemDefinition:
+        definition = self.get_cached(problem_id)
+        if definition is not None:
+            return definition
+
+        with self._lock:
+            entry = self._cache.get(problem_id)
+        if entry is not None:
+            # 버전만 조회하여 다른 프로세스에서 수정/삭제되지 않았으면 그대로 사용
+            version = Problem.objects.filter(pk=problem_id).values_list('version', flat=True).first()
+            if version is None:
+                self.invalidate(problem_id)
+                raise Problem.DoesNotExist(f'Problem {problem_id} does not exist.')
+            if version == entry[0].version:
+                with self._lock:
+                    if self._cache.get(problem_id) is entry:
+                        self._cache[problem_id] = (entry[0], time.monotonic())
+                        self._cache.move_to_end(problem_id)
+                return entry[0]
+
+        definition = ProblemDefinition(Problem.objects.get(pk=problem_id))
+        with self._lock:
+            if definition.version < self._versions.get(problem_id, 0):
+                # 조회하는 동안 문제가 수정된 경우 캐시하지 않음
+                return definition
+            self._versions[problem_id] = definition.version
+            self._cache[problem_id] = (definition, time.monotonic())
+            self._cache.move_to_end(problem_id)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            current = definition.template.template_id if definition.template is not None else None
+            previous = self._template_ids.pop(problem_id, None)
+            if current is not None:
+                self._template_ids[problem_id] = current
+        if previous is not None and previous != current:
+            TEMPLATES.remove(previous)
+        return definition
+
+    def invalidate(self, problem_id: int, version: Optional[int] = None) -> None:
+        # 수정된 문제의 템플릿은 다음 조회에서 내용이 바뀐 것을 확인한 뒤 삭제 (삭제된 문제는 바로 삭제)
+        with self._lock:
+            self._cache.pop(problem_id, None)
+            if version is not None:
+                self._versions[problem_id] = max(version, self._versions.get(problem_id, 0))
+                return
+            previous = self._template_ids.pop(problem_id, None)
+        if previous is not None:
+            TEMPLATES.remove(previous)
+
+PROBLEMS = ProblemStore(settings.PROBLEM_CACHE_SIZE, settings.PROBLEM_CACHE_CHECK_INTERVAL)
+
+def get_problem_context(user):
+    """
+    세션에 선택된 문제의 허용된 명령어와 템플릿 반환
+
+    Parameters
+    ----------
+    user : User
+        명령어를 실행하는 사용자
+
+    Returns
+    -------
+    Tuple[FrozenSet[str], Optional[ProblemTemplate]]
+        허용된 명령어 집합과 템플릿 (문제가 선택되지 않은 경우 기본 명령어 집합과 None)
+    """
+    if user.problem_id is None:
+        return DEFAULT_ALLOWED_COMMANDS, None
+    try:
+        definition = PROBLEMS.get(user.problem_id)
+    except Problem.DoesNotExist:
+        return DEFAULT_ALLOWED_COMMANDS, None
+    return definition.allowed_commands, definition.template
+
+async def get_problem_context_async(user):
+    # 캐시에 있는 경우 이벤트 루프에서 바로 반환하고, DB 조회가 필요한 경우에만 스레드에서 실행
+    if user.problem_id is None:
+        return DEFAULT_ALLOWED_COMMANDS, None
+    definition = PROBLEMS.get_cached(user.problem_id)
+    if definition is not None:
+        return definition.allowed_commands, definition.template
+    return await sync_to_async(get_problem_context)(user)
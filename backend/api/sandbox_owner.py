@@ -0,0 +1,103 @@
+import atexit
+import errno
+import fcntl
+import os
+import re
+import threading
+from typing import Dict, List, Tuple
+
+# 샌드박스 루트에 생성하는 디렉토리 종류 (이름: <종류>_<pid>_<임의 문자열>, 삭제 중인 디렉토리는 '.trash' 가 붙음)
+SANDBOX_KINDS: Tuple[str, ...] = ('sandbox', 'template')
+ENTRY_PATTERN = re.compile(r'(?:%s)_(\d+)_.+' % '|'.join(SANDBOX_KINDS))
+LOCK_PATTERN = re.compile(r'(\d+)\.lock')
+
+class SandboxOwner:
+    """
+    샌드박스 루트(settings.SANDBOX_ROOT)에 생성한 디렉토리의 소유 프로세스 표시
+
+    디렉토리 이름에 프로세스 pid 를 넣고, 프로세스는 실행되는 동안 '<pid>.lock' 파일에 flock 을 유지함
+    프로세스가 비정상 종료되어도 커널이 lock 을 해제하므로 lock 을 얻을 수 있으면 그 pid 의 디렉토리는 남은 것으로 판단
+    (디렉토리의 수정 시간과 달리 하위 경로만 수정되는 세션이나 오래 사용되는 템플릿도 실행 중에는 삭제되지 않음)
+
+    Methods
+    -------
+    prefix(kind: str, root: str) -> str
+        현재 프로세스가 root 에 생성할 디렉토리 이름 prefix (처음 호출할 때 lock 파일 생성)
+    release()
+        lock 파일 삭제 (프로세스 종료 시 세션/풀/템플릿 정리가 끝난 뒤 atexit 으로 호출)
+    """
+    def __init__(self):
+        # root -> (pid, lock fd), fork 된 자식 프로세스는 자신의 pid 로 다시 생성
+        self._locks: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def prefix(self, kind: str, root: str) -> str:
+        pid = os.getpid()
+        root = os.path.abspath(root)
+        with self._lock:
+            owner = self._locks.get(root)
+            if owner is None or owner[0] != pid:
+                os.makedirs(root, exist_ok=True)
+                fd = os.open(os.path.join(root, f'{pid}.lock'), os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o600)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                self._locks[root] = (pid, fd)
+        return f'{kind}_{pid}_'
+
+    def release(self) -> None:
+        pid = os.getpid()
+        with self._lock:
+            locks = [(root, fd) for root, (owner, fd) in self._locks.items() if owner == pid]
+            self._locks.clear()
+        for root, fd in locks:
+            try:
+                os.unlink(os.path.join(root, f'{pid}.lock'))
+            except FileNotFoundError:
+                pass
+            os.close(fd)
+
+def is_owner_alive(root: str, pid: int) -> bool:
+    # lock 파일이 없거나 lock 을 얻을 수 있으면 소유 프로세스가 종료된 것으로 판단
+    try:
+        fd = os.open(os.path.join(root, f'{pid}.lock'), os.O_RDWR | os.O_CLOEXEC)
+    except FileNotFoundError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError as e:
+        if e.errno in (errno.EWOULDBLOCK, errno.EAGAIN):
+            return True
+        raise
+    finally:
+        os.close(fd)
+    return False
+
+def find_orphans(root: str) -> List[str]:
+    """
+    소유 프로세스가 종료된 샌드박스/템플릿 디렉토리와 lock 파일의 경로 목록
+
+    Parameters
+    ----------
+    root : str
+        샌드박스 루트 디렉토리
+    """
+    try:
+        names = os.listdir(root)
+    except FileNotFoundError:
+        return []
+    alive: Dict[int, bool] = {}
+    orphans: List[str] = []
+    for name in names:
+        match = ENTRY_PATTERN.fullmatch(name) or LOCK_PATTERN.fullmatch(name)
+        if match is None:
+            continue
+        pid = int(match.group(1))
+        if pid not in alive:
+            alive[pid] = is_owner_alive(root, pid)
+        if not alive[pid]:
+            orphans.append(os.path.join(root, name))
+    # lock 파일은 디렉토리를 모두 삭제한 뒤 삭제
+    return sorted(orphans, key=lambda path: path.endswith('.lock'))
+
+SANDBOX_OWNER = SandboxOwner()
+# 샌드박스를 삭제하는 다른 atexit 함수보다 먼저 등록되므로 가장 마지막에 실행됨
+atexit.register(SANDBOX_OWNER.release)
@@ -0,0 +1,265 @@
+import errno
+import os
+import posixpath
+import stat
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+# 장고 API 의 User / DiskFileSystem 과 test.py 의 ShellState 가 함께 사용하는 샌드박스 경로 처리 (장고에 의존하지 않음)
+# 사용자 입력 경로는 normalize_path() 로 가상 절대 경로로 정규화하고,
+# 실제 디스크 접근은 SandboxResolver 가 샌드박스 루트부터 경로 요소 단위로 탐색하여 심볼릭 링크도 샌드박스 안에서 해석함
+
+# 경로 하나를 해석할 때 따라가는 최대 심볼릭 링크 수 (리눅스 커널과 동일, 초과하면 ELOOP)
+MAX_SYMLINKS: int = 40
+
+# 디렉토리 fd 를 여는 flag (심볼릭 링크는 직접 해석하므로 O_NOFOLLOW 로 경로 요소가 링크로 바뀌는 경우도 거부)
+DIR_FLAGS: int = os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW | os.O_CLOEXEC
+
+def split_path(path: str) -> List[str]:
+    # 가상 절대 경로를 경로 요소 리스트로 변환 ex) '/home/tmp' -> ['home', 'tmp'], '/' -> []
+    # 정규화된 경로를 가정하지만 남아있는 '.', '..' 도 SandboxResolver 가 루트 밖으로 나가지 않도록 처리함
+    return [part for part in path.split('/') if part]
+
+def normalize_path(path: str, current_dir: str, home_dir: str) -> str:
+    """
+    사용자가 입력한 경로를 샌드박스 기준 정규화된 가상 절대 경로로 변환
+
+    Parameters
+    ----------
+    path : str
+        사용자가 입력한 경로 ('~', 상대 경로, 절대 경로)
+    current_dir : str
+        현재 디렉토리의 가상 절대 경로
+    home_dir : str
+        홈 디렉토리의 가상 절대 경로
+
+    Returns
+    -------
+    str
+        정규화된 가상 절대 경로 ex) '~/a/../b' -> '/home/tmp/b'
+    """
+    if path == '~' or path.startswith('~/'):
+        path = home_dir + path[1:]
+    # 루트보다 상위로 가는 '..' 은 normpath 에서 루트로 고정됨 ex) /../.. -> /
+    new_path = posixpath.normpath(posixpath.join(current_dir, path))
+    # posix 규칙상 '//' 로 시작하는 경로는 normpath 에서 유지되므로 하나로 정리
+    return '/' + new_path.lstrip('/')
+
+class DirHandleCache:
+    """
+    샌드박스 디렉토리 fd 의 LRU 캐시 (같은 디렉토리를 다시 사용할 때 루트부터 경로를 다시 탐색하지 않음)
+
+    여러 샌드박스가 하나의 캐시를 공유하여 세션 수와 관계없이 열린 fd 수는 max_handles 로 제한됨
+    캐시된 fd 는 lock 을 잡은 동안에만 사용해야 함 (다른 스레드가 제거하면서 닫을 수 있음)
+
+    Attributes
+    ----------
+    max_handles : int
+        열어두는 최대 디렉토리 fd 수
+    lock : threading.RLock
+        캐시와 캐시된 fd 사용 보호
+    """
+    def __init__(self, max_handles: int):
+        self.max_handles: int = max_handles
+        self.lock = threading.RLock()
+        # (샌드박스 루트, 경로 요소 tuple) -> (fd, st_dev, st_ino, 실제 디스크 경로)
+        self._handles: 'OrderedDict[Tuple[str, Tuple[str, ...]], Tuple[int, int, int, str]]' = OrderedDict()
+
+    def get(self, key: Tuple[str, Tuple[str, ...]], st: Optional[os.stat_result] = None) -> Optional[int]:
+        # st 가 주어지면 현재 경로의 디렉토리와 같은 디렉토리(inode)인 경우에만 사용 (이름 변경/삭제된 디렉토리의 fd 는 버림)
+        entry = self._handles.get(key)
+        if entry is None:
+            return None
+        if st is not None and (st.st_dev != entry[1] or st.st_ino != entry[2]):
+            self._close(key)
+            return None
+        self._handles.move_to_end(key)
+        return entry[0]
+
+    def validate(self, key: Tuple[str, Tuple[str, ...]]) -> Optional[int]:
+        # 외부 명령어가 디렉토리를 이동/삭제했을 수 있으므로 현재 경로의 inode 와 비교한 뒤 반환
+        # (경로 중간이 심볼릭 링크로 바뀐 경우에도 다른 inode 이므로 사용하지 않음)
+        entry = self._handles.get(key)
+        if entry is None:
+            return None
+        try:
+            st = os.stat(entry[3], follow_symlinks=False)
+        except OSError:
+            self._close(key)
+            return None
+        return self.get(key, st)
+
+    def put(self, key: Tuple[str, Tuple[str, ...]], fd: int) -> int:
+        st = os.fstat(fd)
+        self._handles[key] = (fd, st.st_dev, st.st_ino, os.path.join(key[0], *key[1]))
+        while len(self._handles) > self.max_handles:
+            self._close(next(iter(self._handles)))
+        return fd
+
+    def discard(self, root: str) -> None:
+        # 샌드박스의 모든 fd 닫기 (샌드박스 초기화/삭제, 디렉토리 이름 변경)
+        with self.lock:
+            for key in [key for key in self._handles if key[0] == root]:
+                self._close(key)
+
+    def _close(self, key: Tuple[str, Tuple[str, ...]]) -> None:
+        os.close(self._handles.pop(key)[0])
+
+class SandboxResolver:
+    """
+    가상 경로를 샌드박스 루트 기준으로 해석하는 클래스
+
+    루트 디렉토리 fd 부터 경로 요소를 하나씩 dirfd 기준으로 확인하므로 문자열 비교 없이 샌드박스 밖으로 나갈 수 없음
+    심볼릭 링크는 샌드박스를 루트로 해석함 (chroot 와 동일) ex) 링크 대상 '/etc' -> 샌드박스의 /etc
+    캐시된 부모 디렉토리 fd 가 있으면 마지막 경로 요소만 확인
+
+    Attributes
+    ----------
+    root : str
+        샌드박스 루트의 실제 디스크 경로
+
+    Methods
+    -------
+    stat(path: str) -> Optional[os.stat_result]
+        심볼릭 링크를 해석한 경로의 stat 결과 (존재하지 않으면 None)
+    lookup(path: str, follow: bool) -> ContextManager[Tuple[int, str, Optional[os.stat_result]]]
+        경로의 부모 디렉토리 fd, 마지막 경로 요소 이름, 마지막 경로 요소의 lstat 결과 (존재하지 않으면 None)
+    open_dir(path: str) -> ContextManager[int]
+        디렉토리 fd
+    host_path(path: str) -> str
+        심볼릭 링크를 해석한 실제 디스크 경로 (외부 프로세스에 전달)
+    virtual_path(host_path: str) -> Optional[str]
+        실제 디스크 경로를 가상 절대 경로로 변환 (샌드박스 밖이면 None)
+    invalidate()
+        캐시된 디렉토리 fd 닫기
+    """
+    def __init__(self, root: str, handles: DirHandleCache):
+        self.root: str = os.path.abspath(root)
+        self.handles: DirHandleCache = handles
+
+    def stat(self, path: str) -> Optional[os.stat_result]:
+        with self.handles.lock:
+            return self._lookup(path, True)[3]
+
+    @contextmanager
+    def lookup(self, path: str, follow: bool = True) -> Iterator[Tuple[int, str, Optional[os.stat_result]]]:
+        with self.handles.lock:
+            yield self._lookup(path, follow)[1:]
+
+    @contextmanager
+    def open_dir(self, path: str) -> Iterator[int]:
+        with self.handles.lock:
+            parent, dirfd, name, st = self._lookup(path, True)
+            if st is None:
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+            if not stat.S_ISDIR(st.st_mode):
+                raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), path)
+            yield dirfd if name == '.' else self._open_child(parent, name, st, dirfd)
+
+    def host_path(self, path: str) -> str:
+        # 존재하지 않는 경로 요소부터는 그대로 이어붙임 (외부 프로세스가 생성하거나 에러를 출력)
+        with self.handles.lock:
+            components, rest = self._walk(split_path(path), True, strict=False)
+        return os.path.join(self.root, *components, *rest)
+
+    def virtual_path(self, host_path: str) -> Optional[str]:
+        # 문자열 접두사가 아닌 경로 요소 단위로 비교 (ex. 루트가 /tmp/a_1 이면 /tmp/a_12 는 샌드박스 밖)
+        host_path = os.path.abspath(host_path)
+        if os.path.commonpath([self.root, host_path]) != self.root:
+            return None
+        relative = os.path.relpath(host_path, self.root)
+        return '/' if relative == '.' else '/' + relative.replace(os.sep, '/')
+
+    def invalidate(self) -> None:
+        self.handles.discard(self.root)
+
+    def _lookup(self, path: str, follow: bool) -> Tuple[Tuple[str, ...], int, str, Optional[os.stat_result]]:
+        # (부모 디렉토리 경로 요소, 부모 디렉토리 fd, 마지막 경로 요소 이름, lstat 결과) 반환, 루트는 (루트, 루트 fd, '.', 루트 stat)
+        parts = split_path(path)
+        if parts and parts[-1] != '..' and parts[-1] != '.':
+            # 캐시된 부모 디렉토리가 현재도 같은 경로에 있으면 마지막 경로 요소만 확인
+            # ('..' 이 포함된 경로 요소 tuple 은 캐시되지 않으므로 항상 처음부터 탐색)
+            parent = tuple(parts[:-1])
+            dirfd = self.handles.validate((self.root, parent)) if parent else self._root_fd()
+            if dirfd is not None:
+                st = self._lstat(parts[-1], dirfd)
+                if st is None or not follow or not stat.S_ISLNK(st.st_mode):
+                    return parent, dirfd, parts[-1], st
+        components, _ = self._walk(parts, follow, strict=True)
+        if not components:
+            dirfd = self._root_fd()
+            return (), dirfd, '.', os.fstat(dirfd)
+        parent = tuple(components[:-1])
+        dirfd = self._dir_fd(parent)
+        return parent, dirfd, components[-1], self._lstat(components[-1], dirfd)
+
+    def _walk(self, parts: List[str], follow: bool, strict: bool) -> Tuple[List[str], List[str]]:
+        # 심볼릭 링크를 해석한 경로 요소 리스트와 (strict 가 아니면) 존재하지 않아 해석하지 못한 나머지 경로 요소 반환
+        # 링크 대상의 '..' 은 링크를 해석한 실제 위치 기준 (커널과 동일), 루트보다 상위로 갈 수 없음
+        pending = parts[::-1]
+        components: List[str] = []
+        dirfd = self._root_fd()
+        links = 0
+        while pending:
+            name = pending.pop()
+            if name == '..':
+                if components:
+                    components.pop()
+                    dirfd = self._dir_fd(tuple(components))
+                continue
+            if name == '.':
+                continue
+            st = self._lstat(name, dirfd)
+            if st is not None and stat.S_ISLNK(st.st_mode) and (pending or follow):
+                links += 1
+                if links > MAX_SYMLINKS:
+                    raise OSError(errno.ELOOP, os.strerror(errno.ELOOP), '/' + '/'.join(parts))
+                target = os.readlink(name, dir_fd=dirfd)
+                if target.startswith('/'):
+                    components = []
+                    dirfd = self._root_fd()
+                pending.extend(part for part in reversed(target.split('/')) if part)
+                continue
+            if pending:
+                if st is None or not stat.S_ISDIR(st.st_mode):
+                    if not strict:
+                        return components, [name] + pending[::-1]
+                    code = errno.ENOENT if st is None else errno.ENOTDIR
+                    raise OSError(code, os.strerror(code), '/' + '/'.join(parts))
+                dirfd = self._open_child(tuple(components), name, st, dirfd)
+            components.append(name)
+        return components, []
+
+    def _dir_fd(self, components: Tuple[str, ...]) -> int:
+        # 해석된 경로(심볼릭 링크 없음)의 디렉토리 fd, 캐시에 없으면 부모 디렉토리 fd 기준으로 열어서 캐시
+        if not components:
+            return self._root_fd()
+        key = (self.root, components)
+        dirfd = self.handles.get(key)
+        if dirfd is not None:
+            return dirfd
+        parent_fd = self._dir_fd(components[:-1])
+        return self.handles.put(key, os.open(components[-1], DIR_FLAGS, dir_fd=parent_fd))
+
+    def _open_child(self, parent: Tuple[str, ...], name: str, st: os.stat_result, parent_fd: int) -> int:
+        # lookup 으로 확인한 디렉토리의 fd (캐시된 fd 가 같은 디렉토리가 아니면 다시 열기)
+        key = (self.root, parent + (name,))
+        dirfd = self.handles.get(key, st)
+        if dirfd is None:
+            dirfd = self.handles.put(key, os.open(name, DIR_FLAGS, dir_fd=parent_fd))
+        return dirfd
+
+    def _root_fd(self) -> int:
+        key = (self.root, ())
+        dirfd = self.handles.get(key)
+        if dirfd is None:
+            dirfd = self.handles.put(key, os.open(self.root, os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC))
+        return dirfd
+
+    def _lstat(self, name: str, dirfd: int) -> Optional[os.stat_result]:
+        try:
+            return os.stat(name, dir_fd=dirfd, follow_symlinks=False)
+        except FileNotFoundError:
+            return None
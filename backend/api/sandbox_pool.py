@@ -0,0 +1,123 @@
+import atexit
+import threading
+from collections import deque
+from typing import Deque, Dict
+from django.conf import settings
+from api.filesystem.filesystem import FileSystem
+from api.filesystem_dict import FILESYSTEM_DICT
+
+# 풀에서 대기 중인 샌드박스의 홈 디렉토리 사용자 이름 (/home/sandbox)
+POOL_USERNAME: str = 'sandbox'
+
+class SandboxPool:
+    """
+    미리 생성해둔 샌드박스 풀
+
+    connect-user/ 요청에서는 대기 중인 샌드박스의 홈 디렉토리 이름만 변경해서 넘겨주고,
+    샌드박스 생성과 반납된 샌드박스 초기화/삭제는 백그라운드 스레드에서 처리함
+    (수업 시작 시 모든 학생이 동시에 접속해도 요청마다 디렉토리 생성 작업을 기다리지 않음)
+
+    Methods
+    -------
+    acquire(username: str) -> FileSystem
+        샌드박스를 하나 꺼내 '/home/<username>' 으로 이름을 변경하여 반환 (풀이 비어있으면 바로 생성)
+    release(fs: FileSystem)
+        사용이 끝난 샌드박스 반납 (백그라운드에서 초기화 후 풀에 다시 넣거나 삭제)
+    shutdown()
+        백그라운드 스레드를 종료하고 대기 중인 샌드박스 삭제
+    """
+    def __init__(self, size: int):
+        self.size: int = size
+        # backend 이름별 대기 중인 샌드박스
+        self._idle: Dict[str, Deque[FileSystem]] = {}
+        self._released: Deque[FileSystem] = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._stopped: bool = False
+
+    def acquire(self, username: str) -> FileSystem:
+        backend: str = settings.FILESYSTEM_BACKEND
+        self._start()
+        with self._lock:
+            idle = self._idle.get(backend)
+            fs = idle.popleft() if idle else None
+        # 꺼낸 만큼 백그라운드에서 다시 채움
+        self._wakeup.set()
+
+        if fs is None:
+            return FILESYSTEM_DICT[backend](username)
+        if username != POOL_USERNAME:
+            fs.rename(f"/home/{POOL_USERNAME}", f"/home/{username}")
+        return fs
+
+    def release(self, fs: FileSystem) -> None:
+        with self._lock:
+            self._released.append(fs)
+        self._wakeup.set()
+
+    def shutdown(self) -> None:
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        with self._lock:
+            remaining = [fs for idle in self._idle.values() for fs in idle] + list(self._released)
+            self._idle.clear()
+            self._released.clear()
+        for fs in remaining:
+            fs.destroy()
+
+    def _start(self) -> None:
+        # manage.py 명령어 등에서는 스레드를 만들지 않도록 처음 사용될 때 시작
+        if self._thread is not None or self.size <= 0:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='sandbox-pool', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            self._reclaim()
+            self._fill()
+
+    def _reclaim(self) -> None:
+        while not self._stopped:
+            with self._lock:
+                if not self._released:
+                    return
+                fs = self._released.popleft()
+            backend = self._backend_of(fs)
+            with self._lock:
+                reusable = backend is not None and len(self._idle.get(backend, ())) < self.size
+            try:
+                if reusable:
+                    fs.reset(POOL_USERNAME)
+                    with self._lock:
+                        self._idle.setdefault(backend, deque()).append(fs)
+                else:
+                    fs.destroy()
+            except OSError:
+                fs.destroy()
+
+    def _fill(self) -> None:
+        backend: str = settings.FILESYSTEM_BACKEND
+        while not self._stopped:
+            with self._lock:
+                if len(self._idle.get(backend, ())) >= self.size:
+                    return
+            fs = FILESYSTEM_DICT[backend](POOL_USERNAME)
+            with self._lock:
+                self._idle.setdefault(backend, deque()).append(fs)
+
+    def _backend_of(self, fs: FileSystem):
+        for backend, filesystem_class in FILESYSTEM_DICT.items():
+            if type(fs) is filesystem_class:
+                return backend
+        return None
+
+SANDBOX_POOL = SandboxPool(settings.SANDBOX_POOL_SIZE)
+atexit.register(SANDBOX_POOL.shutdown)
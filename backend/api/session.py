@@ -0,0 +1,193 @@
+import atexit
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from django.conf import settings
+from api.filesystem.blob_store import BLOBS
+from api.metrics import METRICS
+from api.sandbox_pool import SANDBOX_POOL
+from api.snapshot import SNAPSHOTS
+from api.user import User
+
+class SessionRegistry:
+    """
+    세션 토큰별 사용자 상태(User) 관리
+
+    connect-user/ 에서 발급한 토큰으로 사용자를 조회하므로 한 프로세스에서 여러 사용자를 동시에 처리할 수 있음
+    모든 접근은 lock 으로 보호되어 threaded/async worker 에서도 안전함
+
+    세션은 마지막 사용 순서(LRU)로 관리되며
+    - settings.SESSION_IDLE_TIMEOUT 초 동안 사용되지 않은 세션은 백그라운드 스레드에서 삭제
+    - settings.MAX_SESSIONS 개를 넘으면 가장 오래 사용되지 않은 세션부터 삭제
+    삭제된 세션의 샌드박스는 샌드박스 풀에 반납되어 백그라운드에서 정리됨
+    settings.SESSION_HIBERNATE 가 True 이면 유휴 세션은 삭제하기 전에 스냅샷으로 저장 (다음 요청에서 복원)
+
+    Methods
+    -------
+    create(username: str, hostname: str, token: Optional[str]) -> str
+        새 사용자 세션을 생성하고 토큰 반환 (token 이 없으면 새로 발급)
+    add(token: str, user: User)
+        스냅샷에서 복원한 사용자를 세션으로 등록
+    get(token: str) -> Optional[User]
+        토큰에 해당하는 사용자 반환 (없으면 None), 마지막 사용 시간 갱신
+    remove(token: str) -> bool
+        세션을 삭제하고 샌드박스 반납 (실행 중인 명령어가 끝난 뒤 반납)
+    detach(token: str, user: User)
+        user.lock 을 가진 상태에서 세션을 삭제하고 샌드박스 반납 (스냅샷을 저장한 직후)
+    evict_idle() -> int
+        유휴 시간이 초과된 세션 삭제 (hibernate 이면 스냅샷을 저장한 세션만 삭제)
+    users() -> List[User]
+        현재 세션의 사용자 목록 (metric 수집용 복사본)
+    shutdown()
+        남아있는 모든 세션의 샌드박스 삭제 (프로세스 종료 시 atexit 으로 호출)
+    """
+    def __init__(self, max_sessions: int, idle_timeout: float, reap_interval: float, hibernate: bool = False):
+        self.max_sessions: int = max_sessions
+        self.idle_timeout: float = idle_timeout
+        self.reap_interval: float = reap_interval
+        self.hibernate: bool = hibernate
+        # 마지막 사용 순서로 정렬 (앞쪽이 가장 오래 사용되지 않은 세션)
+        self._sessions: 'OrderedDict[str, User]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def create(self, username: str, hostname: str, token: Optional[str] = None) -> str:
+        token = token or secrets.token_urlsafe(16)
+        self.add(token, User(username, hostname))
+        return token
+
+    def add(self, token: str, user: User) -> None:
+        self._start_reaper()
+        user.token = token
+        with self._lock:
+            self._sessions[token] = user
+            evicted: List[User] = []
+            while len(self._sessions) > self.max_sessions:
+                evicted.append(self._sessions.popitem(last=False)[1])
+        self._release(evicted)
+
+    def get(self, token: Optional[str]) -> Optional[User]:
+        with self._lock:
+            user = self._sessions.get(token)
+            if user is not None:
+                user.last_activity = time.monotonic()
+                self._sessions.move_to_end(token)
+            return user
+
+    def remove(self, token: Optional[str]) -> bool:
+        with self._lock:
+            user = self._sessions.pop(token, None)
+        if user is None:
+            return False
+        self._release([user])
+        return True
+
+    def detach(self, token: str, user: User) -> None:
+        with self._lock:
+            if self._sessions.get(token) is user:
+                del self._sessions[token]
+        self._close(user)
+
+    def evict_idle(self) -> int:
+        deadline: float = time.monotonic() - self.idle_timeout
+        idle: List[Tuple[str, User]] = []
+        with self._lock:
+            # LRU 순서이므로 앞에서부터 유휴 시간이 초과되지 않은 세션을 만나면 중단
+            for token, user in self._sessions.items():
+                if user.last_activity > deadline:
+                    break
+                idle.append((token, user))
+            if not self.hibernate:
+                for token, _ in idle:
+                    del self._sessions[token]
+        if not self.hibernate:
+            self._release([user for _, user in idle])
+            return len(idle)
+        evicted = 0
+        for token, user in idle:
+            # 스냅샷을 저장한 뒤 등록을 해제하므로 그 사이에 도착한 요청은 스냅샷에서 복원된 세션을 사용
+            with user.lock:
+                if user.closed or user.last_activity > deadline:
+                    # 선택한 뒤 다시 사용된 세션은 유지
+                    continue
+                if not self._save(user):
+                    # 저장에 실패한 세션은 삭제하지 않고 다음 정리에서 다시 저장
+                    continue
+                self.detach(token, user)
+            evicted += 1
+        return evicted
+
+    def users(self) -> List[User]:
+        with self._lock:
+            return list(self._sessions.values())
+
+    def shutdown(self) -> None:
+        # 풀의 백그라운드 스레드는 곧 종료되므로 반납하지 않고 바로 삭제 (hibernate 이면 먼저 스냅샷으로 저장)
+        with self._lock:
+            users = list(self._sessions.values())
+            self._sessions.clear()
+        for user in users:
+            with user.lock:
+                if self.hibernate and not user.closed:
+                    self._save(user)
+                user.closed = True
+                if user.restore is not None:
+                    user.restore.close()
+                user.fs.destroy()
+
+    def _save(self, user: User) -> bool:
+        # user.lock 을 가진 상태에서 호출, 저장에 성공하면 True
+        try:
+            SNAPSHOTS.save(user)
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def _release(self, users: List[User]) -> None:
+        # 실행 중인 명령어가 끝날 때까지 기다린 뒤 반납 (lock 을 기다리던 명령어는 closed 를 확인하고 실행하지 않음)
+        for user in users:
+            with user.lock:
+                self._close(user)
+
+    def _close(self, user: User) -> None:
+        # user.lock 을 가진 상태에서 호출, 샌드박스 초기화/삭제는 풀의 백그라운드 스레드에서 처리
+        if user.closed:
+            return
+        user.closed = True
+        if user.restore is not None:
+            user.restore.close()
+        SANDBOX_POOL.release(user.fs)
+
+    def _start_reaper(self) -> None:
+        if self._reaper is not None:
+            return
+        with self._lock:
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap, name='session-reaper', daemon=True)
+                self._reaper.start()
+
+    def _reap(self) -> None:
+        while True:
+            time.sleep(self.reap_interval)
+            self.evict_idle()
+            SNAPSHOTS.prune(settings.SNAPSHOT_TTL)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+SESSIONS = SessionRegistry(settings.MAX_SESSIONS, settings.SESSION_IDLE_TIMEOUT, settings.SESSION_REAP_INTERVAL,
+                           settings.SESSION_HIBERNATE)
+# SANDBOX_POOL.shutdown 보다 먼저 실행됨 (atexit 은 등록의 역순으로 실행)
+atexit.register(SESSIONS.shutdown)
+
+def sandbox_usage() -> dict:
+    # 수집할 때마다 모든 세션의 샌드박스를 탐색하므로 scrape 주기를 너무 짧게 설정하지 않음
+    return {(): sum(user.fs.disk_usage() for user in SESSIONS.users())}
+
+METRICS.gauge('virtualterminal_active_sessions', 'Sessions held by this process.', lambda: {(): len(SESSIONS)})
+METRICS.gauge('virtualterminal_sandbox_bytes', 'Bytes owned by session sandboxes (files shared with problem templates excluded).', sandbox_usage)
+METRICS.gauge('virtualterminal_blob_store_blobs', 'Distinct file contents held by the memory filesystem blob store.', lambda: {(): len(BLOBS)})
+METRICS.gauge('virtualterminal_blob_store_bytes', 'Bytes held by the memory filesystem blob store (each distinct content counted once).',
+              lambda: {(): BLOBS.stats()[1]})
@@ -0,0 +1,214 @@
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple
+
+# 장고 API 와 test.py 의 ShellSimulator 가 함께 사용하는 명령어 파서 (장고 / api 패키지의 다른 모듈에 의존하지 않음)
+
+# 파싱 결과를 보관하는 명령어 줄 수 (같은 명령어를 반복 입력하는 경우 다시 파싱하지 않음)
+PARSE_CACHE_SIZE: int = 1024
+
+# 연산자 토큰 (긴 연산자를 먼저 비교)
+OPERATORS: Tuple[str, ...] = ('&&', '>>', ';', '|', '>')
+REDIRECTS: Tuple[str, ...] = ('>', '>>')
+
+class ParseError(ValueError):
+    """
+    명령어 줄의 구문 오류 (닫히지 않은 따옴표, 잘못된 위치의 연산자 등)
+    """
+
+class Token(NamedTuple):
+    """
+    명령어 줄을 나눈 토큰
+
+    Attributes
+    ----------
+    kind : str
+        'word' 또는 'op'
+    value : str
+        따옴표와 escape 가 처리된 단어 또는 연산자 문자열
+    """
+    kind: str
+    value: str
+
+class Redirect(NamedTuple):
+    """
+    출력 redirection ex) '> out.txt', '>> log.txt'
+
+    Attributes
+    ----------
+    op : str
+        '>' (덮어쓰기) 또는 '>>' (이어쓰기)
+    target : str
+        출력 파일 경로
+    """
+    op: str
+    target: str
+
+class SimpleCommand(NamedTuple):
+    """
+    연산자가 없는 단일 명령어
+
+    Attributes
+    ----------
+    args : Tuple[str, ...]
+        명령어 이름과 인자 ex) ('mkdir', 'my dir')
+    redirects : Tuple[Redirect, ...]
+        출력 redirection 목록 (입력 순서)
+    """
+    args: Tuple[str, ...]
+    redirects: Tuple[Redirect, ...] = ()
+
+class Pipeline(NamedTuple):
+    """
+    '|' 로 연결된 명령어 목록 (명령어가 하나인 경우도 Pipeline)
+    """
+    commands: Tuple[SimpleCommand, ...]
+
+class CommandLine(NamedTuple):
+    """
+    명령어 줄 전체의 파싱 결과
+
+    Attributes
+    ----------
+    items : Tuple[Tuple[str, Pipeline], ...]
+        (앞의 명령어와의 연결 연산자, Pipeline) 목록 (첫 Pipeline 의 연산자는 '')
+        ex) 'mkdir a && cd a; pwd' -> (('', mkdir a), ('&&', cd a), (';', pwd))
+    """
+    items: Tuple[Tuple[str, Pipeline], ...]
+
+def tokenize(line: str) -> List[Token]:
+    """
+    명령어 줄을 단어와 연산자 토큰으로 분리
+
+    공백 여러 개는 하나의 구분자로 처리하고, 작은따옴표 안은 그대로, 큰따옴표 안은 '\\' 로 '"', '\\', '$', '`' 만 escape
+    따옴표 밖의 '\\' 는 다음 문자를 그대로 사용 (따옴표로 감싼 연산자 문자는 단어로 처리)
+
+    Raises
+    ------
+    ParseError
+        따옴표가 닫히지 않았거나 '&' 가 단독으로 사용된 경우
+    """
+    tokens: List[Token] = []
+    word: List[str] = []
+    # 빈 따옴표('') 도 하나의 인자로 처리하기 위해 단어가 시작되었는지 따로 기록
+    in_word = False
+    i, length = 0, len(line)
+
+    while i < length:
+        char = line[i]
+        if char in ' \t\n':
+            if in_word:
+                tokens.append(Token('word', ''.join(word)))
+                word, in_word = [], False
+            i += 1
+        elif char == "'":
+            end = line.find("'", i + 1)
+            if end < 0:
+                raise ParseError("닫히지 않은 작은따옴표 (')")
+            word.append(line[i + 1:end])
+            in_word = True
+            i = end + 1
+        elif char == '"':
+            i += 1
+            while True:
+                if i >= length:
+                    raise ParseError('닫히지 않은 큰따옴표 (")')
+                char = line[i]
+                if char == '"':
+                    break
+                if char == '\\' and i + 1 < length and line[i + 1] in '"\\$`':
+                    i += 1
+                    char = line[i]
+                word.append(char)
+                i += 1
+            in_word = True
+            i += 1
+        elif char == '\\':
+            # 줄 끝의 '\' 는 무시
+            if i + 1 < length:
+                word.append(line[i + 1])
+                in_word = True
+            i += 2
+        elif char in ';|>&':
+            if in_word:
+                tokens.append(Token('word', ''.join(word)))
+                word, in_word = [], False
+            for op in OPERATORS:
+                if line.startswith(op, i):
+                    tokens.append(Token('op', op))
+                    i += len(op)
+                    break
+            else:
+                raise ParseError(f"예기치 않은 토큰 '{char}'")
+        else:
+            word.append(char)
+            in_word = True
+            i += 1
+
+    if in_word:
+        tokens.append(Token('word', ''.join(word)))
+    return tokens
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse(line: str) -> CommandLine:
+    """
+    명령어 줄을 파싱하여 CommandLine 반환
+
+    결과는 불변 객체(NamedTuple/tuple)이므로 LRU 캐시에 보관하여 같은 명령어 줄은 다시 파싱하지 않음
+
+    Parameters
+    ----------
+    line : str
+        사용자가 입력한 명령어 줄
+
+    Returns
+    -------
+    CommandLine
+        파싱 결과 (빈 줄이면 items 가 빈 CommandLine)
+
+    Raises
+    ------
+    ParseError
+        구문 오류가 있는 경우 (ParseError 는 캐시되지 않음)
+    """
+    items: List[Tuple[str, Pipeline]] = []
+    commands: List[SimpleCommand] = []
+    args: List[str] = []
+    redirects: List[Redirect] = []
+    separator = ''
+    tokens = tokenize(line)
+    i = 0
+
+    def end_command(op: str) -> None:
+        if not args:
+            raise ParseError(f"예기치 않은 토큰 '{op}'")
+        commands.append(SimpleCommand(tuple(args), tuple(redirects)))
+        args.clear()
+        redirects.clear()
+
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if kind == 'word':
+            args.append(value)
+        elif value in REDIRECTS:
+            if i + 1 >= len(tokens) or tokens[i + 1].kind != 'word':
+                raise ParseError(f"'{value}' 다음에 파일 이름이 필요합니다")
+            redirects.append(Redirect(value, tokens[i + 1].value))
+            i += 1
+        elif value == '|':
+            end_command(value)
+        else:
+            # ';' 는 항상 다음 명령어 실행, '&&' 는 이전 명령어가 성공한 경우에만 실행
+            end_command(value)
+            items.append((separator, Pipeline(tuple(commands))))
+            commands.clear()
+            separator = value
+        i += 1
+
+    if args or redirects:
+        end_command('newline')
+    elif commands or separator == '&&':
+        # 'ls |', 'mkdir a &&' 처럼 연산자 뒤에 명령어가 없는 경우 (';' 로 끝나는 것은 허용)
+        raise ParseError('명령어가 완료되지 않았습니다')
+    if commands:
+        items.append((separator, Pipeline(tuple(commands))))
+    return CommandLine(tuple(items))
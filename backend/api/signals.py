@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from api.models import Problem
+from api.problem import PROBLEMS
+
+# 문제가 수정/삭제되면 캐시된 문제 정보를 무효화
+@receiver(post_save, sender=Problem)
+def invalidate_problem_on_save(sender, instance: Problem, **kwargs):
+    PROBLEMS.invalidate(instance.pk, instance.version)
+
+@receiver(post_delete, sender=Problem)
+def invalidate_problem_on_delete(sender, instance: Problem, **kwargs):
+    PROBLEMS.invalidate(instance.pk)
@@ -0,0 +1,287 @@
+import hashlib
+import itertools
+import json
+import os
+import posixpath
+import re
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from typing import BinaryIO, Dict, List, Optional
+from django.conf import settings
+from api.filesystem.filesystem import FileSystem
+from api.sandbox_path import split_path
+from api.user import User
+
+# 스냅샷 파일 형식
+#   MAGIC | 파일 내용 blob ... | index (zlib 압축 JSON) | TRAILER
+# index 는 세션 정보(meta), 디렉토리별 항목 목록(dirs: 경로 -> [[이름, blob 번호 (디렉토리는 -1)], ...]),
+# blob 목록(blobs: [[파일 내 offset, 저장된 길이, 원래 길이, 압축 여부], ...])
+# 같은 내용의 파일은 blob 하나로 저장하고, 압축해서 작아지는 blob 만 zlib 으로 압축
+# index 가 파일 끝에 있으므로 트리를 탐색하면서 blob 을 바로 기록할 수 있고, 복원할 때는 index 만 읽고 blob 은 필요할 때 읽음
+MAGIC: bytes = b'VTSNAP01'
+# index 시작 위치, index 길이, MAGIC
+TRAILER = struct.Struct('<QI8s')
+READ_CHUNK_SIZE: int = 64 * 1024
+# 세션 토큰을 파일 이름으로 사용하므로 secrets.token_urlsafe 형식만 허용
+TOKEN_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+class SnapshotError(ValueError):
+    pass
+
+def write_snapshot(user: User, f: BinaryIO) -> None:
+    """
+    세션 정보와 샌드박스 전체 트리를 스냅샷 형식으로 기록
+
+    심볼릭 링크와 읽을 수 없는 항목은 저장하지 않음
+    """
+    fs: FileSystem = user.fs
+    blobs: List[list] = []
+    digests: Dict[bytes, int] = {}
+    dirs: Dict[str, List[list]] = {}
+    f.write(MAGIC)
+    stack: List[str] = ['/']
+    while stack:
+        path = stack.pop()
+        entries: List[list] = []
+        for name in sorted(fs.list_dir(path)):
+            child = posixpath.join(path, name)
+            if fs.is_link(child):
+                continue
+            if fs.is_dir(child):
+                entries.append([name, -1])
+                stack.append(child)
+                continue
+            try:
+                data = b''.join(fs.iter_file(child, READ_CHUNK_SIZE))
+            except OSError:
+                continue
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            blob = digests.get(digest)
+            if blob is None:
+                compressed = zlib.compress(data)
+                stored = compressed if len(compressed) < len(data) else data
+                blob = digests[digest] = len(blobs)
+                blobs.append([f.tell(), len(stored), len(data), stored is compressed])
+                f.write(stored)
+            entries.append([name, blob])
+        dirs[path] = entries
+
+    template_id = user.template.template_id if user.template is not None else user.restored_template_id
+    meta = {
+        'username': user.username,
+        'hostname': user.hostname,
+        'current_dir': user.current_dir,
+        'problem_id': user.problem_id,
+        'template_id': template_id,
+        # 보관된 세션은 더 이상 명령어를 실행하지 않으므로 다음 번호를 꺼내서 저장
+        'history_seq': next(user.history_seq),
+    }
+    index = zlib.compress(json.dumps({'meta': meta, 'dirs': dirs, 'blobs': blobs}, separators=(',', ':')).encode('utf-8'))
+    index_offset = f.tell()
+    f.write(index)
+    f.write(TRAILER.pack(index_offset, len(index), MAGIC))
+
+class SnapshotArchive:
+    """
+    복원 중인 스냅샷 (아직 생성하지 않은 디렉토리의 항목 목록과 blob 을 읽을 파일)
+
+    복원할 때는 index 만 읽고, 디렉토리는 명령어가 그 경로에 처음 접근할 때 항목(하위 디렉토리와 파일 내용)을 생성함
+    모든 디렉토리를 생성하면 파일을 닫음 (스냅샷 파일은 열자마자 삭제하므로 같은 스냅샷이 두 번 복원되지 않음)
+
+    Attributes
+    ----------
+    meta : dict
+        스냅샷을 만든 시점의 세션 정보
+
+    Methods
+    -------
+    open(path: str) -> SnapshotArchive
+        스냅샷 파일의 index 읽기 (형식이 잘못된 경우 SnapshotError)
+    materialize(fs: FileSystem, path: Optional[str]) -> bool
+        경로와 상위 디렉토리의 항목 생성 (path 가 None 이면 전체), 모두 생성되었으면 True
+    close()
+        스냅샷 파일 닫기
+    """
+    def __init__(self, fd: int, index: dict):
+        self.meta: dict = index['meta']
+        self._fd: Optional[int] = fd
+        self._dirs: Dict[str, List[list]] = index['dirs']
+        self._blobs: List[list] = index['blobs']
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: str) -> 'SnapshotArchive':
+        fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            size = os.fstat(fd).st_size
+            if size < len(MAGIC) + TRAILER.size or os.pread(fd, len(MAGIC), 0) != MAGIC:
+                raise SnapshotError(f'{path}: not a snapshot')
+            index_offset, index_length, magic = TRAILER.unpack(os.pread(fd, TRAILER.size, size - TRAILER.size))
+            if magic != MAGIC:
+                raise SnapshotError(f'{path}: truncated snapshot')
+            index = json.loads(zlib.decompress(os.pread(fd, index_length, index_offset)))
+            return cls(fd, index)
+        except SnapshotError:
+            os.close(fd)
+            raise
+        except (ValueError, KeyError, TypeError, zlib.error) as e:
+            # 형식이 잘못된 스냅샷만 SnapshotError (EIO, EMFILE 등 일시적인 OSError 는 그대로 발생시켜 스냅샷을 유지)
+            os.close(fd)
+            raise SnapshotError(f'{path}: {e}')
+        except BaseException:
+            os.close(fd)
+            raise
+
+    def materialize(self, fs: FileSystem, path: Optional[str] = None) -> bool:
+        with self._lock:
+            if self._fd is None:
+                return True
+            if path is None:
+                # 경로 순으로 정렬하면 상위 디렉토리가 하위 디렉토리보다 먼저 생성됨
+                targets = sorted(self._dirs)
+            else:
+                parts = split_path(path)
+                targets = ['/' + '/'.join(parts[:i]) for i in range(len(parts) + 1)]
+            for target in targets:
+                entries = self._dirs.pop(target, None)
+                if entries is not None:
+                    self._create(fs, target, entries)
+            if self._dirs:
+                return False
+            self._close()
+            return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _create(self, fs: FileSystem, path: str, entries: List[list]) -> None:
+        for name, blob in entries:
+            child = posixpath.join(path, name)
+            try:
+                if blob < 0:
+                    fs.make_dir(child)
+                else:
+                    fs.write_file(child, [self._read(blob)])
+            except FileExistsError:
+                # 샌드박스를 만들 때 생성된 /home/<username> 등
+                pass
+            except OSError:
+                # 복원 전에 같은 이름의 파일이 생성된 경우 등 (사용자가 만든 항목 유지)
+                pass
+
+    def _read(self, blob: int) -> bytes:
+        offset, stored, _, compressed = self._blobs[blob]
+        data = os.pread(self._fd, stored, offset)
+        return zlib.decompress(data) if compressed else data
+
+    def _close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            self._dirs = {}
+
+class SnapshotStore:
+    """
+    세션 토큰별 스냅샷 파일 저장소 (settings.SNAPSHOT_DIR)
+
+    Methods
+    -------
+    save(user: User) -> int
+        세션 스냅샷을 저장하고 파일 크기 반환
+    load(token: str) -> Optional[User]
+        스냅샷에서 사용자 상태를 복원 (파일 시스템은 명령어가 접근할 때 생성), 스냅샷이 없으면 None
+    discard(token: str) -> bool
+        스냅샷 삭제
+    prune(ttl: float) -> int
+        ttl 초 동안 복원되지 않은 스냅샷 삭제
+    """
+    def __init__(self, directory: str):
+        self.directory: str = str(directory)
+
+    def path(self, token: Optional[str]) -> Optional[str]:
+        if token is None or not TOKEN_PATTERN.fullmatch(token):
+            return None
+        return os.path.join(self.directory, token + '.snap')
+
+    def save(self, user: User) -> int:
+        path = self.path(user.token)
+        if path is None:
+            raise SnapshotError(f'invalid session token: {user.token!r}')
+        # 복원 중인 세션은 아직 생성하지 않은 디렉토리까지 모두 생성한 뒤 저장
+        user.ensure_restored()
+        os.makedirs(self.directory, exist_ok=True)
+        # 저장 중에 프로세스가 종료되어도 이전 스냅샷이 깨지지 않도록 임시 파일에 기록한 뒤 교체
+        fd, temp_path = tempfile.mkstemp(prefix='.snapshot_', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write_snapshot(user, f)
+                size = f.tell()
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return size
+
+    def load(self, token: str) -> Optional[User]:
+        path = self.path(token)
+        if path is None:
+            return None
+        try:
+            archive = SnapshotArchive.open(path)
+        except FileNotFoundError:
+            return None
+        except SnapshotError:
+            # 형식이 잘못된 스냅샷만 삭제 (그 외의 OSError 는 호출한 쪽으로 전달되고 스냅샷은 다음 요청에서 다시 복원)
+            self.discard(token)
+            return None
+        meta = archive.meta
+        try:
+            user = User(meta['username'], meta['hostname'])
+        except BaseException:
+            archive.close()
+            raise
+        # 샌드박스를 만든 뒤 삭제 (열린 파일은 삭제되어도 읽을 수 있음)
+        os.unlink(path)
+        user.current_dir = meta['current_dir']
+        user.problem_id = meta['problem_id']
+        user.restored_template_id = meta['template_id']
+        # 복원한 홈 디렉토리는 문제의 템플릿이 바뀌어도 교체하지 않음
+        if meta['template_id'] is not None:
+            user.template_problem_id = meta['problem_id']
+            user.home_modified = True
+        user.history_seq = itertools.count(meta['history_seq'])
+        user.restore = archive
+        return user
+
+    def discard(self, token: Optional[str]) -> bool:
+        path = self.path(token)
+        if path is None:
+            return False
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def prune(self, ttl: float) -> int:
+        deadline = time.time() - ttl
+        removed = 0
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                if os.stat(path).st_mtime < deadline:
+                    os.unlink(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+SNAPSHOTS = SnapshotStore(settings.SNAPSHOT_DIR)
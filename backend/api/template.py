@@ -0,0 +1,135 @@
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Union
+from django.conf import settings
+from api.filesystem.filesystem_memory import DirNode, Inode
+from api.sandbox_owner import SANDBOX_OWNER
+
+class ProblemTemplate:
+    """
+    문제별로 미리 구성된 디렉토리/파일 트리
+
+    한번 생성된 템플릿은 모든 세션이 읽기 전용으로 공유하고, 세션에서 발생한 수정만 세션별로 따로 저장됨 (copy-on-write)
+
+    Attributes
+    ----------
+    template_id : str
+        템플릿 식별자
+    spec : dict
+        홈 디렉토리 기준 트리 정의 (dict: 디렉토리, str: 파일 내용)
+        ex) {'project': {'src': {}, 'README.md': 'hello'}}
+    root : DirNode
+        메모리 파일 시스템에서 공유하는 템플릿 트리 루트 (모든 노드 shared=True)
+    link_files : bool
+        디스크 파일 시스템에서 파일을 하드링크로 공유할지 여부
+        외부 명령어는 파일을 제자리에서 수정할 수 있으므로 (sed -i, cp 등) builtin 명령어만 허용된 문제에서만 공유하고,
+        그 외에는 세션마다 복사함 (builtin 명령어는 수정 전에 링크를 끊음)
+
+    Methods
+    -------
+    materialized() -> ContextManager[str]
+        디스크 파일 시스템에서 공유할 템플릿 디렉토리를 한번만 생성하고, 사용하는 동안 삭제되지 않도록 보호
+    retire()
+        더 이상 사용하지 않는 템플릿의 디렉토리 삭제 (마운트 중인 세션이 있으면 마운트가 끝난 뒤 삭제)
+    """
+    def __init__(self, template_id: str, spec: dict, link_files: bool = True):
+        self.template_id: str = template_id
+        self.spec: dict = spec
+        self.link_files: bool = link_files
+        self.root: DirNode = self._build_tree(spec)
+        self._disk_path: Optional[str] = None
+        # 템플릿 디렉토리를 복사 중인 세션 수
+        self._mounting: int = 0
+        self._retired: bool = False
+        self._lock = threading.Lock()
+
+    def _build_tree(self, spec: dict) -> DirNode:
+        node = DirNode(shared=True)
+        for name, child in spec.items():
+            if isinstance(child, dict):
+                node.children[name] = self._build_tree(child)
+            else:
+                node.children[name] = Inode(self._encode(child), shared=True)
+        return node
+
+    def _encode(self, content: Union[str, bytes]) -> bytes:
+        return content.encode('utf-8') if isinstance(content, str) else content
+
+    @contextmanager
+    def materialized(self) -> Iterator[str]:
+        with self._lock:
+            if self._disk_path is None:
+                root = str(settings.SANDBOX_ROOT)
+                path = os.path.abspath(tempfile.mkdtemp(prefix=SANDBOX_OWNER.prefix('template', root), dir=root))
+                self._write_tree(path, self.spec)
+                self._disk_path = path
+            self._mounting += 1
+            path = self._disk_path
+        try:
+            yield path
+        finally:
+            with self._lock:
+                self._mounting -= 1
+                remove = self._retired and self._mounting == 0
+            if remove:
+                self._remove()
+
+    def retire(self) -> None:
+        # 마운트가 끝난 세션의 파일은 하드링크 또는 복사본이므로 템플릿 디렉토리를 삭제해도 유지됨
+        with self._lock:
+            self._retired = True
+            remove = self._mounting == 0
+        if remove:
+            self._remove()
+
+    def _remove(self) -> None:
+        with self._lock:
+            path, self._disk_path = self._disk_path, None
+        if path is not None:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _write_tree(self, path: str, spec: dict) -> None:
+        for name, child in spec.items():
+            child_path = os.path.join(path, name)
+            if isinstance(child, dict):
+                os.mkdir(child_path)
+                self._write_tree(child_path, child)
+            else:
+                with open(child_path, 'wb') as f:
+                    f.write(self._encode(child))
+
+class TemplateRegistry:
+    """
+    템플릿 식별자별로 한번만 생성된 ProblemTemplate 을 보관
+    """
+    def __init__(self):
+        self._templates: Dict[str, ProblemTemplate] = {}
+        self._lock = threading.Lock()
+
+    def get(self, template_id: str, spec: dict, link_files: bool = True) -> ProblemTemplate:
+        with self._lock:
+            template = self._templates.get(template_id)
+            if template is None:
+                template = self._templates[template_id] = ProblemTemplate(template_id, spec, link_files)
+            return template
+
+    def remove(self, template_id: str) -> None:
+        with self._lock:
+            template = self._templates.pop(template_id, None)
+        if template is not None:
+            template.retire()
+
+    def shutdown(self) -> None:
+        # 프로세스 종료 시 디스크에 생성한 템플릿 디렉토리 삭제
+        with self._lock:
+            templates = list(self._templates.values())
+            self._templates.clear()
+        for template in templates:
+            template.retire()
+
+TEMPLATES = TemplateRegistry()
+atexit.register(TEMPLATES.shutdown)
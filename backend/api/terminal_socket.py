@@ -0,0 +1,92 @@
+import asyncio
+import json
+from contextlib import aclosing
+from typing import Optional
+from urllib.parse import parse_qs
+from api.engine import ENGINE
+from api.executor import COMMAND_EXECUTOR
+from api.operations import SessionNotFound
+
+class TerminalSocket:
+    """
+    웹소켓 터미널 ASGI 애플리케이션 (ws://<host>/ws/terminal/)
+
+    연결 하나에 세션 하나가 고정되어 명령어마다 세션 정보를 다시 보낼 필요가 없고,
+    명령어 출력은 생성되는 즉시 chunk 단위로 전달됨
+
+    연결
+        ?session=<token>                  connect-user/ 에서 발급받은 기존 세션 사용
+        ?username=<name>&hostname=<host>  새 세션 생성 (연결 종료 시 삭제)
+    client -> server
+        {"call": "ls -al"}
+        {"complete": "cd pro"}              (탭 자동 완성, 커서 앞까지 입력된 명령어 줄)
+    server -> client
+        {"type": "prompt", "prompt": "tmp@host:~$ "}
+        {"type": "completions", "word": "pro", "completions": ["project/"], "common_prefix": "project/"}
+        {"type": "output", "data": "..."}   (명령어 출력 chunk, 0개 이상)
+        {"type": "done", "prompt": "..."}   (명령어 실행 완료)
+        {"type": "error", "message": "..."}
+    """
+    async def __call__(self, scope, receive, send):
+        message = await receive()
+        if message['type'] != 'websocket.connect':
+            return
+
+        query = parse_qs(scope.get('query_string', b'').decode())
+        token: Optional[str] = query.get('session', [None])[0]
+        owns_session: bool = False
+        try:
+            if token is None and 'username' in query:
+                token = await self.run(ENGINE.connect, query['username'][0], query.get('hostname', ['host'])[0])
+                owns_session = True
+            prompt: str = await ENGINE.call_async(token, 'get_prompt')
+        except SessionNotFound:
+            await send({'type': 'websocket.close', 'code': 4404})
+            return
+        await send({'type': 'websocket.accept'})
+
+        try:
+            await self.send_json(send, {'type': 'prompt', 'prompt': prompt})
+            while True:
+                message = await receive()
+                if message['type'] == 'websocket.disconnect':
+                    break
+                if message['type'] != 'websocket.receive':
+                    continue
+                try:
+                    command = json.loads(message.get('text') or message.get('bytes') or b'')
+                    operation = 'complete' if 'complete' in command else 'call'
+                    line: str = command[operation]
+                    if not isinstance(line, str):
+                        raise TypeError(line)
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    await self.send_json(send, {'type': 'error', 'message': 'Invalid message.'})
+                    continue
+
+                try:
+                    if operation == 'complete':
+                        result = await ENGINE.call_async(token, 'complete', line)
+                        await self.send_json(send, {'type': 'completions', **result})
+                        continue
+                    async with aclosing(ENGINE.stream_async(token, line)) as stream:
+                        async for chunk in stream:
+                            await self.send_json(send, {'type': 'output', 'data': chunk})
+                    prompt = await ENGINE.call_async(token, 'get_prompt')
+                except SessionNotFound:
+                    # 유휴 시간 초과 등으로 세션이 삭제된 경우 연결 종료
+                    await self.send_json(send, {'type': 'error', 'message': 'Session not found.'})
+                    await send({'type': 'websocket.close', 'code': 4404})
+                    break
+                await self.send_json(send, {'type': 'done', 'prompt': prompt})
+        finally:
+            if owns_session:
+                try:
+                    await ENGINE.call_async(token, 'disconnect')
+                except SessionNotFound:
+                    pass
+
+    async def run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(COMMAND_EXECUTOR, function, *args)
+
+    async def send_json(self, send, data: dict) -> None:
+        await send({'type': 'websocket.send', 'text': json.dumps(data, ensure_ascii=False)})
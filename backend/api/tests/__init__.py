@@ -0,0 +1,4 @@
+from api.sandbox_pool import SANDBOX_POOL
+
+# 테스트에서는 백그라운드 스레드로 샌드박스를 미리 생성하지 않음 (샌드박스는 테스트마다 임시 디렉토리에 생성)
+SANDBOX_POOL.size = 0
@@ -0,0 +1,28 @@
+import shutil
+import tempfile
+from django.test import override_settings
+from api.user import User
+
+def make_sandbox_root(test_case) -> str:
+    # 테스트가 끝나면 삭제되는 샌드박스 루트 디렉토리 (settings.SANDBOX_ROOT)
+    sandbox_root = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, sandbox_root, True)
+    return sandbox_root
+
+def make_user(test_case, username: str = 'tester', backend: str = 'memory') -> User:
+    """
+    테스트용 사용자 생성 (테스트가 끝나면 샌드박스 삭제)
+
+    Parameters
+    ----------
+    test_case : TestCase
+        cleanup 을 등록할 테스트
+    username : str
+        사용자 이름
+    backend : str
+        샌드박스 파일 시스템 ('disk' | 'memory')
+    """
+    with override_settings(FILESYSTEM_BACKEND=backend, SANDBOX_ROOT=make_sandbox_root(test_case)):
+        user = User(username, 'test')
+    test_case.addCleanup(user.fs.destroy)
+    return user
@@ -0,0 +1,57 @@
+import gc
+from django.test import SimpleTestCase
+from api.filesystem.blob_store import BLOBS, BlobStore
+from api.tests.helpers import make_user
+
+class BlobStoreTest(SimpleTestCase):
+    def test_intern_deduplicates(self):
+        store = BlobStore()
+        first = store.intern(b'same')
+        self.assertIs(store.intern(bytearray(b'same')), first)
+        other = store.intern(b'other')
+        self.assertIsNot(other, first)
+        self.assertIs(store.intern(b''), store.empty)
+        self.assertEqual(store.stats(), (2, 9))
+
+    def test_unreferenced_blobs_are_released(self):
+        store = BlobStore()
+        blob = store.intern(b'data')
+        self.assertEqual(len(store), 1)
+        del blob
+        gc.collect()
+        self.assertEqual(len(store), 0)
+
+class MemoryBlobSharingTest(SimpleTestCase):
+    def setUp(self):
+        self.first = make_user(self, 'first')
+        self.second = make_user(self, 'second')
+        self.data = b'blob sharing test ' * 100
+
+    def test_sessions_share_blob(self):
+        count = len(BLOBS)
+        self.first.fs.write_file('/home/first/a', [self.data])
+        self.second.fs.write_file('/home/second/b', [self.data])
+        self.assertEqual(len(BLOBS), count + 1)
+        blob = BLOBS.intern(self.data)
+        self.assertIs(self.first.fs._lookup('/home/first/a').blob, blob)
+        self.assertIs(self.second.fs._lookup('/home/second/b').blob, blob)
+
+    def test_append_copies_on_write(self):
+        self.first.fs.write_file('/home/first/a', [self.data])
+        self.second.fs.write_file('/home/second/a', [self.data])
+        self.first.fs.write_file('/home/first/a', [b'!'], append=True)
+        self.assertEqual(self.first.fs.read_file('/home/first/a'), self.data + b'!')
+        self.assertEqual(self.second.fs.read_file('/home/second/a'), self.data)
+
+    def test_destroy_releases_blobs(self):
+        data = b'released after destroy'
+        self.first.fs.write_file('/home/first/a', [data])
+        self.second.fs.write_file('/home/second/a', [data])
+        count = len(BLOBS)
+        self.first.fs.destroy()
+        gc.collect()
+        # 다른 세션이 참조하는 동안은 유지
+        self.assertEqual(len(BLOBS), count)
+        self.second.fs.destroy()
+        gc.collect()
+        self.assertEqual(len(BLOBS), count - 1)
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+from django.test import SimpleTestCase
+from api.command_exec import execute_line_async, stream_line_async
+from api.problem import DEFAULT_ALLOWED_COMMANDS
+from api.tests.helpers import make_user
+from api.user import SessionClosed
+
+ALLOWED = DEFAULT_ALLOWED_COMMANDS | {'seq'}
+
+async def collect(user, line: str) -> str:
+    return ''.join([chunk async for chunk in stream_line_async(user, line, ALLOWED)])
+
+class EventLoopCommandLockTest(SimpleTestCase):
+    def setUp(self):
+        self.user = make_user(self, backend='disk')
+
+    def run_while_locked(self, coroutine_function) -> str:
+        # 다른 명령어가 user.lock 을 가진 동안에는 외부 명령어를 실행하지 않음
+        results = []
+        with self.user.lock:
+            worker = threading.Thread(target=lambda: results.append(asyncio.run(coroutine_function())))
+            worker.start()
+            worker.join(0.3)
+            self.assertTrue(worker.is_alive())
+        worker.join()
+        return results[0]
+
+    def test_execute_waits_for_session_lock(self):
+        result = self.run_while_locked(lambda: execute_line_async(self.user, 'seq 3', ALLOWED))
+        self.assertEqual(result.output, '1\n2\n3\n')
+
+    def test_stream_waits_for_session_lock(self):
+        self.assertEqual(self.run_while_locked(lambda: collect(self.user, 'seq 3')), '1\n2\n3\n')
+
+    def test_lock_is_released(self):
+        asyncio.run(execute_line_async(self.user, 'seq 3', ALLOWED))
+        asyncio.run(collect(self.user, 'seq 3'))
+        self.assertFalse(self.user.lock.locked())
+
+    def test_closed_session(self):
+        self.user.closed = True
+        with self.assertRaises(SessionClosed):
+            asyncio.run(execute_line_async(self.user, 'seq 3', ALLOWED))
@@ -0,0 +1,20 @@
+import os
+from django.test import SimpleTestCase
+from api.command.command_ls import Command_LS
+from api.tests.helpers import make_user
+
+class CommandLsTest(SimpleTestCase):
+    def test_long_format_uses_memory_modes(self):
+        user = make_user(self)
+        user.fs.make_dir('/home/tester/project')
+        user.fs.touch('/home/tester/a.txt')
+        lines = Command_LS().execute_command(user, ['ls', '-l']).splitlines()
+        self.assertTrue(lines[0].startswith('-rw-r--r-- tester tester'))
+        self.assertTrue(lines[1].startswith('drwxr-xr-x tester tester'))
+
+    def test_long_format_uses_disk_permissions(self):
+        user = make_user(self, backend='disk')
+        user.fs.touch('/home/tester/secret')
+        os.chmod(user.fs.host_path('/home/tester/secret'), 0o600)
+        output = Command_LS().execute_command(user, ['ls', '-l', 'secret'])
+        self.assertTrue(output.startswith('-rw------- tester tester'))
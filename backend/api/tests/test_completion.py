@@ -0,0 +1,44 @@
+from django.test import SimpleTestCase, override_settings
+from api.completion import complete_line, split_word
+from api.tests.helpers import make_user
+
+class SplitWordTest(SimpleTestCase):
+    def test_command_position(self):
+        self.assertEqual(split_word('cat a | gr'), ('gr', True))
+        self.assertEqual(split_word('cd pro'), ('pro', False))
+        self.assertEqual(split_word('ls '), ('', False))
+        self.assertEqual(split_word('echo a > ou'), ('ou', False))
+
+class CompleteLineTest(SimpleTestCase):
+    def setUp(self):
+        self.user = make_user(self)
+        for name in ('.a', '.b', '.c'):
+            self.user.fs.touch(f'/home/tester/{name}')
+        self.user.fs.make_dir('/home/tester/project')
+        self.user.fs.touch('/home/tester/readme')
+
+    @override_settings(COMPLETION_MAX_RESULTS=2)
+    def test_hidden_entries_do_not_use_up_limit(self):
+        result = complete_line(self.user, 'ls ', frozenset())
+        self.assertEqual(result['completions'], ['project/', 'readme'])
+
+    def test_hidden_entries_with_dot_prefix(self):
+        result = complete_line(self.user, 'cat .', frozenset())
+        self.assertEqual(result['completions'], ['.a', '.b', '.c'])
+
+    def test_single_match_adds_space(self):
+        result = complete_line(self.user, 'cat re', frozenset())
+        self.assertEqual(result['common_prefix'], 'readme ')
+        result = complete_line(self.user, 'cd pro', frozenset())
+        self.assertEqual(result['common_prefix'], 'project/')
+
+    def test_commands(self):
+        result = complete_line(self.user, 'c', frozenset({'cat', 'cd', 'ls'}))
+        self.assertEqual(result['completions'], ['cat', 'cd'])
+
+    def test_index_sees_new_entries(self):
+        complete_line(self.user, 'ls ', frozenset())
+        self.user.fs.touch('/home/tester/rebuild')
+        self.user.dir_index.add('/home/tester/rebuild', False)
+        result = complete_line(self.user, 'cat re', frozenset())
+        self.assertEqual(result['completions'], ['readme', 'rebuild'])
@@ -0,0 +1,34 @@
+import asyncio
+from django.test import SimpleTestCase
+from api.engine import ProcessEngine
+
+class ProcessEngineStreamTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.engine = ProcessEngine(1, 60)
+        cls.token = cls.engine.connect('tester', 'test')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.call(cls.token, 'disconnect')
+        cls.engine.stop()
+        super().tearDownClass()
+
+    def test_stream_forwards_chunks_incrementally(self):
+        async def collect():
+            return [chunk async for chunk in self.engine.stream_async(self.token, 'echo a; echo b')]
+        chunks = asyncio.run(collect())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks), 'a\nb')
+
+    def test_closing_stream_cancels_request(self):
+        async def first_chunk():
+            stream = self.engine.stream_async(self.token, 'echo a; echo b')
+            chunk = await stream.__anext__()
+            await stream.aclose()
+            return chunk
+        self.assertEqual(asyncio.run(first_chunk()), 'a')
+        worker = self.engine._get_worker(self.token)
+        self.assertEqual(worker._streams, {})
+        self.assertEqual(self.engine.call(self.token, 'execute', 'pwd').output, '/home/tester')
@@ -0,0 +1,63 @@
+from django.test import SimpleTestCase
+from api.command_exec import execute_line
+from api.grading import build_tree, diff_trees
+from api.problem import DEFAULT_ALLOWED_COMMANDS
+from api.tests.helpers import make_user
+
+class DiffTreesTest(SimpleTestCase):
+    def test_same_tree_has_no_diff(self):
+        spec = {'project': {'src': {}, 'README.md': 'hello'}}
+        self.assertEqual(build_tree(spec).digest, build_tree(spec).digest)
+        self.assertEqual(diff_trees(build_tree(spec), build_tree(spec), 10), [])
+
+    def test_statuses(self):
+        expected = build_tree({'a': {'b': 'x'}, 'c': 'y', 'd': {}, 'e': 'z'})
+        actual = build_tree({'a': {'b': 'changed'}, 'c': {}, 'e': 'z', 'f': {'g': ''}})
+        self.assertEqual(diff_trees(expected, actual, 10), [
+            {'path': '~/a/b', 'status': 'modified', 'type': 'file'},
+            {'path': '~/c', 'status': 'type_mismatch', 'type': 'file'},
+            {'path': '~/d', 'status': 'missing', 'type': 'directory'},
+            {'path': '~/f', 'status': 'unexpected', 'type': 'directory'},
+        ])
+
+    def test_limit(self):
+        expected = build_tree({name: '' for name in 'abcde'})
+        self.assertEqual(len(diff_trees(expected, build_tree({}), 3)), 3)
+
+class TreeHashIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.user = make_user(self)
+        self.home = self.user.home_dir
+
+    def test_tree_matches_expected_spec(self):
+        self.user.fs.make_dir(f'{self.home}/project/src', parents=True)
+        self.user.fs.write_file(f'{self.home}/project/README.md', [b'hello'])
+        expected = build_tree({'project': {'src': {}, 'README.md': 'hello'}})
+        self.assertEqual(self.user.tree_hash.tree().digest, expected.digest)
+
+    def test_unchanged_tree_is_reused(self):
+        self.user.fs.make_dir(f'{self.home}/a')
+        tree = self.user.tree_hash.tree()
+        self.assertIs(self.user.tree_hash.tree(), tree)
+
+    def test_invalidate_recomputes_changed_path(self):
+        self.user.fs.make_dir(f'{self.home}/a')
+        before = self.user.tree_hash.tree()
+        self.user.fs.write_file(f'{self.home}/a/b', [b'x'])
+        # 변경을 알리지 않으면 저장된 트리를 그대로 사용
+        self.assertIs(self.user.tree_hash.tree(), before)
+        self.user.tree_hash.invalidate(f'{self.home}/a/b')
+        after = self.user.tree_hash.tree()
+        self.assertEqual(after.digest, build_tree({'a': {'b': 'x'}}).digest)
+        self.assertNotEqual(after.digest, before.digest)
+
+    def test_invalidate_all(self):
+        tree = self.user.tree_hash.tree()
+        self.user.fs.make_dir(f'{self.home}/a')
+        self.user.tree_hash.invalidate_all()
+        self.assertNotEqual(self.user.tree_hash.tree().digest, tree.digest)
+
+    def test_commands_update_tree(self):
+        execute_line(self.user, 'mkdir -p project/src; echo hello > project/README.md', DEFAULT_ALLOWED_COMMANDS)
+        expected = build_tree({'project': {'src': {}, 'README.md': 'hello\n'}})
+        self.assertEqual(diff_trees(expected, self.user.tree_hash.tree(), 10), [])
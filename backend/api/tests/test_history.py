@@ -0,0 +1,33 @@
+from django.test import TestCase, override_settings
+from api.command.command_history import Command_HISTORY
+from api.models import CommandHistory
+from api.tests.helpers import make_user
+
+@override_settings(HISTORY_PAGE_SIZE=10)
+class HistoryCommandTest(TestCase):
+    def setUp(self):
+        self.user = make_user(self)
+        self.user.token = 'history-test'
+        CommandHistory.objects.bulk_create(
+            CommandHistory(session=self.user.token, seq=seq, username='tester', command=f'echo {seq}',
+                           status=0, duration=0.0, output_bytes=0)
+            for seq in range(1, 36)
+        )
+
+    def history(self, *args: str) -> list:
+        return Command_HISTORY().execute_command(self.user, ['history', *args]).splitlines()
+
+    def test_count_larger_than_page_size(self):
+        lines = self.history('25')
+        self.assertEqual(len(lines), 25)
+        self.assertEqual(lines[0].split(), ['11', 'echo', '11'])
+        self.assertEqual(lines[-1].split(), ['35', 'echo', '35'])
+
+    def test_count_larger_than_history(self):
+        lines = self.history('500')
+        self.assertEqual(len(lines), 35)
+        self.assertEqual(lines[0].split()[0], '1')
+
+    def test_count_within_page(self):
+        self.assertEqual(len(self.history('3')), 3)
+        self.assertEqual(self.history('0'), [])
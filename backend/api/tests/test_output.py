@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase
+from api.output import OutputBuffer, get_page
+
+class OutputBufferTest(SimpleTestCase):
+    def test_truncates_on_character_boundary(self):
+        buffer = OutputBuffer(4)
+        buffer.write('ab한글')
+        self.assertEqual(buffer.getvalue(), 'ab'.encode('utf-8'))
+        self.assertEqual(buffer.dropped, len('한글'.encode('utf-8')))
+
+    def test_last_reflects_kept_output(self):
+        buffer = OutputBuffer(3)
+        buffer.write('abc\n')
+        # 줄바꿈은 버려졌으므로 안내 메세지 앞에 줄바꿈이 필요함
+        self.assertEqual(buffer.last, 'c')
+        buffer.note('[limit]')
+        self.assertEqual(buffer.getvalue(), b'abc\n[limit]')
+
+    def test_dropped_write_keeps_previous_last(self):
+        buffer = OutputBuffer(2)
+        buffer.write('a\n')
+        buffer.write('b')
+        self.assertEqual(buffer.last, '\n')
+        buffer.note('[limit]')
+        self.assertEqual(buffer.getvalue(), b'a\n[limit]')
+
+    def test_separate_adds_newline_only_between_outputs(self):
+        buffer = OutputBuffer(100)
+        buffer.write('a')
+        buffer.separate()
+        buffer.separate()
+        buffer.write('b\n')
+        buffer.separate()
+        buffer.write('c')
+        self.assertEqual(buffer.getvalue(), b'a\nb\nc')
+
+class GetPageTest(SimpleTestCase):
+    def test_pages_split_on_character_boundary(self):
+        data = 'a한b'.encode('utf-8')
+        self.assertEqual(get_page(data, 0, 2), ('a', 1))
+        self.assertEqual(get_page(data, 1, 10), ('한b', None))
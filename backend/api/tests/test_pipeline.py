@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase
+from api.command_exec import execute_line
+from api.problem import DEFAULT_ALLOWED_COMMANDS
+from api.tests.helpers import make_user
+
+class PipelineTest(SimpleTestCase):
+    backend = 'memory'
+
+    def setUp(self):
+        self.user = make_user(self, backend=self.backend)
+
+    def run_line(self, line: str, allowed=DEFAULT_ALLOWED_COMMANDS):
+        return execute_line(self.user, line, allowed)
+
+    def test_builtin_pipe(self):
+        self.assertEqual(self.run_line('echo hello | cat').output, 'hello\n')
+
+    def test_redirect_and_append(self):
+        self.run_line('echo a > out.txt; echo b >> out.txt')
+        self.assertEqual(self.user.fs.read_file('/home/tester/out.txt'), b'a\nb\n')
+        self.run_line('echo c > out.txt')
+        self.assertEqual(self.run_line('cat out.txt').output, 'c\n')
+
+    def test_redirect_to_directory_fails(self):
+        self.run_line('mkdir d')
+        result = self.run_line('echo a > d')
+        self.assertNotEqual(result.status, 0)
+
+    def test_and_skips_after_failure(self):
+        result = self.run_line('cd missing && mkdir skipped; mkdir ran')
+        self.assertEqual(result.status, 0)
+        self.assertFalse(self.user.fs.exists('/home/tester/skipped'))
+        self.assertTrue(self.user.fs.exists('/home/tester/ran'))
+
+    def test_unsupported_command_in_pipeline(self):
+        result = self.run_line('echo a | rm x')
+        self.assertEqual(result.status, 127)
+
+class DiskPipelineTest(PipelineTest):
+    backend = 'disk'
+
+    def test_external_stages_are_connected(self):
+        allowed = DEFAULT_ALLOWED_COMMANDS | {'tr', 'wc'}
+        self.assertEqual(self.run_line('echo hello | tr a-z A-Z | cat', allowed).output, 'HELLO\n')
+        self.run_line('echo abc | tr a-z A-Z > up.txt', allowed)
+        self.assertEqual(self.user.fs.read_file('/home/tester/up.txt'), b'ABC\n')
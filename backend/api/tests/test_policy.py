@@ -0,0 +1,57 @@
+import os
+import time
+from unittest import mock
+from django.test import SimpleTestCase
+from api.command_exec import execute_line
+from api.policy import EXECUTION_POLICY, TIMEOUT_STATUS
+from api.problem import DEFAULT_ALLOWED_COMMANDS
+from api.tests.helpers import make_user
+
+ALLOWED = DEFAULT_ALLOWED_COMMANDS | {'sleep', 'seq'}
+
+class ExecutionPolicyTest(SimpleTestCase):
+    def setUp(self):
+        self.user = make_user(self, backend='disk')
+
+    def test_timeout_kills_process(self):
+        with mock.patch.object(EXECUTION_POLICY, 'timeout', 0.3):
+            result = execute_line(self.user, 'sleep 5', ALLOWED)
+        self.assertEqual(result.status, TIMEOUT_STATUS)
+        self.assertEqual(result.limit, 'timeout')
+        self.assertLess(result.elapsed, 3)
+
+    def test_output_limit_stops_external_command(self):
+        with mock.patch.object(EXECUTION_POLICY, 'max_output_bytes', 100):
+            result = execute_line(self.user, 'seq 1000000; mkdir after', ALLOWED)
+        self.assertEqual(result.limit, 'output')
+        self.assertTrue(result.output.endswith('100 바이트를 초과하여 실행을 중단했습니다.'))
+        # 제한을 초과하면 나머지 명령어는 실행하지 않음
+        self.assertFalse(self.user.fs.exists('/home/tester/after'))
+
+    def test_output_limit_applies_to_builtins(self):
+        self.user.fs.write_file('/home/tester/big.txt', [b'x' * 1000])
+        with mock.patch.object(EXECUTION_POLICY, 'max_output_bytes', 100):
+            result = execute_line(self.user, 'cat big.txt', ALLOWED)
+        self.assertEqual(result.limit, 'output')
+        self.assertEqual(result.output.count('x'), 100)
+
+    def test_timeout_applies_inside_builtin_reads(self):
+        # 출력을 Command_Exec 에 전달하지 않는 redirection 도 파일을 읽는 중간에 시간 제한 확인
+        self.user.fs.write_file('/home/tester/big.txt', [b'x' * (1024 * 1024)])
+        with mock.patch.object(EXECUTION_POLICY, 'timeout', 0):
+            result = execute_line(self.user, 'cat big.txt > copy.txt', ALLOWED)
+        self.assertEqual((result.status, result.limit), (TIMEOUT_STATUS, 'timeout'))
+        self.assertLess(len(self.user.fs.read_file('/home/tester/copy.txt')), 1024 * 1024)
+
+    def test_builtins_do_not_block_on_fifo(self):
+        os.mkfifo(self.user.fs.host_path('/home/tester/fifo'))
+        started = time.monotonic()
+        for line in ('cat fifo', 'echo hi > fifo'):
+            result = execute_line(self.user, line, ALLOWED)
+            self.assertEqual(result.status, 1)
+        self.assertIn('일반 파일이 아닙니다', execute_line(self.user, 'cat fifo', ALLOWED).output)
+        self.assertLess(time.monotonic() - started, 3)
+
+    def test_within_limits(self):
+        result = execute_line(self.user, 'seq 3', ALLOWED)
+        self.assertEqual((result.output, result.status, result.limit), ('1\n2\n3', 0, None))
@@ -0,0 +1,82 @@
+from unittest import mock
+from django.db.models import F
+from django.test import TestCase
+from api.command_exec import execute_line
+from api.models import Problem
+from api.problem import PROBLEMS, get_problem_context
+from api.tests.helpers import make_user
+
+class ProblemVersionTest(TestCase):
+    def test_save_with_update_fields_bumps_version(self):
+        problem = Problem.objects.create(title='before', allowed_commands=['ls'])
+        self.assertEqual(PROBLEMS.get(problem.pk).title, 'before')
+        problem.title = 'after'
+        problem.save(update_fields=['title'])
+        problem.refresh_from_db()
+        self.assertEqual(problem.version, 2)
+        self.assertEqual(PROBLEMS.get(problem.pk).title, 'after')
+
+    def test_full_save_bumps_version(self):
+        problem = Problem.objects.create(title='t')
+        problem.save()
+        problem.refresh_from_db()
+        self.assertEqual(problem.version, 2)
+
+class ProblemTemplateUpdateTest(TestCase):
+    def setUp(self):
+        self.problem = Problem.objects.create(title='t', allowed_commands=['ls', 'mkdir'], template={'project': {}})
+        self.user = make_user(self)
+        self.user.problem_id = self.problem.pk
+
+    def run_line(self, line: str) -> str:
+        allowed_commands, template = get_problem_context(self.user)
+        return execute_line(self.user, line, allowed_commands, template).output
+
+    def test_description_edit_keeps_template(self):
+        self.run_line('mkdir mywork')
+        template = self.user.template
+        self.problem.description = 'updated'
+        self.problem.save()
+        self.assertEqual(self.run_line('ls'), 'mywork\nproject')
+        self.assertEqual(self.user.template.template_id, template.template_id)
+
+    def test_template_edit_keeps_modified_home(self):
+        self.run_line('mkdir mywork')
+        self.problem.template = {'other': {}}
+        self.problem.save()
+        self.assertEqual(self.run_line('ls'), 'mywork\nproject')
+
+    def test_template_edit_mounts_unmodified_home(self):
+        self.assertEqual(self.run_line('ls'), 'project')
+        self.problem.template = {'other': {}}
+        self.problem.save()
+        self.assertEqual(self.run_line('ls'), 'other')
+
+class ProblemCacheCheckTest(TestCase):
+    def setUp(self):
+        self.problem = Problem.objects.create(title='before', allowed_commands=['ls'])
+        PROBLEMS.get(self.problem.pk)
+
+    def update_elsewhere(self, **fields):
+        # 다른 프로세스에서 수정된 경우와 같이 signal 없이 DB 만 변경
+        Problem.objects.filter(pk=self.problem.pk).update(version=F('version') + 1, **fields)
+
+    def test_recently_checked_entry_skips_database(self):
+        self.update_elsewhere(title='after')
+        with self.assertNumQueries(0):
+            self.assertEqual(PROBLEMS.get(self.problem.pk).title, 'before')
+
+    def test_stale_entry_is_reloaded(self):
+        self.update_elsewhere(title='after')
+        with mock.patch.object(PROBLEMS, 'check_interval', 0):
+            self.assertEqual(PROBLEMS.get(self.problem.pk).title, 'after')
+            # 버전이 같으면 버전 조회 한번으로 캐시된 항목 사용
+            with self.assertNumQueries(1):
+                self.assertEqual(PROBLEMS.get(self.problem.pk).title, 'after')
+
+    def test_deleted_elsewhere(self):
+        Problem.objects.filter(pk=self.problem.pk)._raw_delete('default')
+        with mock.patch.object(PROBLEMS, 'check_interval', 0):
+            with self.assertRaises(Problem.DoesNotExist):
+                PROBLEMS.get(self.problem.pk)
+        self.assertIsNone(PROBLEMS.get_cached(self.problem.pk))
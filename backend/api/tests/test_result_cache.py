@@ -0,0 +1,53 @@
+from django.test import SimpleTestCase
+from api.command_exec import execute_line
+from api.output import ResultCache
+from api.problem import DEFAULT_ALLOWED_COMMANDS
+from api.tests.helpers import make_user
+
+class ResultCacheTest(SimpleTestCase):
+    def test_lru(self):
+        cache = ResultCache(2, 100)
+        cache.put(('a',), 'A')
+        cache.put(('b',), 'B')
+        self.assertEqual(cache.get(('a',)), 'A')
+        cache.put(('c',), 'C')
+        self.assertIsNone(cache.get(('b',)))
+        self.assertEqual(cache.get(('a',)), 'A')
+
+    def test_limits(self):
+        cache = ResultCache(2, 3)
+        cache.put(('long',), 'long')
+        self.assertIsNone(cache.get(('long',)))
+        disabled = ResultCache(0, 100)
+        disabled.put(('a',), 'A')
+        self.assertIsNone(disabled.get(('a',)))
+
+class GenerationInvalidationTest(SimpleTestCase):
+    def setUp(self):
+        self.user = make_user(self)
+        self.user.fs.touch('/home/tester/a')
+
+    def ls(self) -> str:
+        return execute_line(self.user, 'ls', DEFAULT_ALLOWED_COMMANDS).output
+
+    def test_same_generation_reuses_output(self):
+        self.assertEqual(self.ls(), 'a')
+        # 명령어 계층을 거치지 않은 변경은 세대 번호가 바뀌지 않으므로 캐시된 출력 반환
+        self.user.fs.touch('/home/tester/b')
+        self.assertEqual(self.ls(), 'a')
+        self.user.mark_changed('/home/tester/b')
+        self.assertEqual(self.ls(), 'a\nb')
+
+    def test_commands_bump_generation(self):
+        self.assertEqual(self.ls(), 'a')
+        generation = self.user.generation
+        execute_line(self.user, 'mkdir c; touch d', DEFAULT_ALLOWED_COMMANDS)
+        self.assertGreater(self.user.generation, generation)
+        self.assertEqual(self.ls(), 'a\nc\nd')
+
+    def test_key_includes_current_dir(self):
+        self.user.fs.make_dir('/home/tester/sub')
+        self.user.mark_changed('/home/tester/sub', True)
+        self.assertEqual(self.ls(), 'a\nsub')
+        execute_line(self.user, 'cd sub', DEFAULT_ALLOWED_COMMANDS)
+        self.assertEqual(self.ls(), '')
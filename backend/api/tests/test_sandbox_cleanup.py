@@ -0,0 +1,53 @@
+import fcntl
+import os
+from io import StringIO
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from api.filesystem.filesystem_disk import DiskFileSystem
+from api.sandbox_owner import find_orphans
+from api.session import SessionRegistry
+from api.tests.helpers import make_sandbox_root, make_user
+
+# 존재하지 않는 프로세스의 pid (pid_max 보다 큼)
+DEAD_PID = 99999999
+
+class SandboxCleanupTest(SimpleTestCase):
+    def setUp(self):
+        self.root = make_sandbox_root(self)
+
+    def test_live_process_sandboxes_are_kept(self):
+        fs = DiskFileSystem('tester', self.root)
+        self.addCleanup(fs.destroy)
+        # 하위 경로만 수정된 오래된 샌드박스도 소유 프로세스가 실행 중이면 유지
+        os.utime(fs.root, (0, 0))
+        self.assertTrue(os.path.basename(fs.root).startswith(f'sandbox_{os.getpid()}_'))
+        self.assertEqual(find_orphans(self.root), [])
+
+    def test_dead_process_sandboxes_are_removed(self):
+        for name in (f'sandbox_{DEAD_PID}_a', f'template_{DEAD_PID}_b', f'sandbox_{DEAD_PID}_c.trash'):
+            os.mkdir(os.path.join(self.root, name))
+        # 프로세스가 종료되어 lock 이 해제된 lock 파일
+        open(os.path.join(self.root, f'{DEAD_PID}.lock'), 'w').close()
+        live = DiskFileSystem('tester', self.root)
+        self.addCleanup(live.destroy)
+        os.mkdir(os.path.join(self.root, 'unrelated'))
+
+        call_command('cleanup_sandboxes', dir=self.root, stdout=StringIO())
+        self.assertEqual(sorted(os.listdir(self.root)),
+                         sorted([f'{os.getpid()}.lock', os.path.basename(live.root), 'unrelated']))
+
+    def test_locked_owner_is_alive(self):
+        path = os.path.join(self.root, f'{DEAD_PID}.lock')
+        fd = os.open(path, os.O_RDWR | os.O_CREAT)
+        self.addCleanup(os.close, fd)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        os.mkdir(os.path.join(self.root, f'sandbox_{DEAD_PID}_a'))
+        self.assertEqual(find_orphans(self.root), [])
+
+    def test_shutdown_destroys_active_sessions(self):
+        sessions = SessionRegistry(10, 60, 60)
+        user = make_user(self, backend='disk')
+        sessions.add('token', user)
+        sessions.shutdown()
+        self.assertFalse(os.path.exists(user.fs.root))
+        self.assertEqual(len(sessions), 0)
@@ -0,0 +1,81 @@
+import errno
+import os
+from django.test import SimpleTestCase
+from api.filesystem.filesystem_disk import DiskFileSystem
+from api.sandbox_path import DirHandleCache, SandboxResolver, normalize_path
+from api.tests.helpers import make_sandbox_root
+
+class NormalizePathTest(SimpleTestCase):
+    def test_paths(self):
+        cases = [
+            ('~', '/home/u'),
+            ('~/a/../b', '/home/u/b'),
+            ('..', '/home/u'),
+            ('../../../..', '/'),
+            ('/../etc', '/etc'),
+            ('//x//y/', '/x/y'),
+            ('./a/./b', '/home/u/d/a/b'),
+        ]
+        for path, expected in cases:
+            with self.subTest(path=path):
+                self.assertEqual(normalize_path(path, '/home/u/d', '/home/u'), expected)
+
+class SandboxResolverTest(SimpleTestCase):
+    def setUp(self):
+        base = make_sandbox_root(self)
+        self.root = os.path.join(base, 'root')
+        os.makedirs(os.path.join(self.root, 'home', 'u'))
+        os.makedirs(os.path.join(self.root, 'etc'))
+        self.outside = os.path.join(base, 'secret.txt')
+        with open(self.outside, 'w') as f:
+            f.write('secret')
+        self.handles = DirHandleCache(16)
+        self.addCleanup(self.handles.discard, os.path.abspath(self.root))
+        self.resolver = SandboxResolver(self.root, self.handles)
+
+    def link(self, target: str, name: str) -> None:
+        os.symlink(target, os.path.join(self.root, 'home', 'u', name))
+
+    def test_dotdot_cannot_leave_root(self):
+        self.assertEqual(self.resolver.host_path('/../../secret.txt'), os.path.join(self.resolver.root, 'secret.txt'))
+        self.assertIsNone(self.resolver.stat('/../secret.txt'))
+
+    def test_absolute_symlink_resolves_inside_root(self):
+        self.link('/etc', 'etc_link')
+        self.assertEqual(self.resolver.host_path('/home/u/etc_link'), os.path.join(self.resolver.root, 'etc'))
+        # 호스트의 절대 경로는 샌드박스 안의 경로로 해석되므로 밖의 파일에 접근할 수 없음
+        self.link(self.outside, 'escape')
+        with self.assertRaises(FileNotFoundError):
+            self.resolver.stat('/home/u/escape')
+
+    def test_relative_symlink_is_clamped_to_root(self):
+        self.link('../../../../secret.txt', 'up')
+        self.assertIsNone(self.resolver.stat('/home/u/up'))
+        self.assertEqual(self.resolver.host_path('/home/u/up'), os.path.join(self.resolver.root, 'secret.txt'))
+
+    def test_symlink_loop(self):
+        self.link('b', 'a')
+        self.link('a', 'b')
+        with self.assertRaises(OSError) as context:
+            self.resolver.stat('/home/u/a')
+        self.assertEqual(context.exception.errno, errno.ELOOP)
+
+    def test_virtual_path_compares_components(self):
+        self.assertEqual(self.resolver.virtual_path(os.path.join(self.root, 'home')), '/home')
+        self.assertIsNone(self.resolver.virtual_path(self.root + '2'))
+
+class DiskContainmentTest(SimpleTestCase):
+    def test_file_operations_do_not_follow_links_outside(self):
+        base = make_sandbox_root(self)
+        outside = os.path.join(base, 'secret.txt')
+        with open(outside, 'w') as f:
+            f.write('secret')
+        fs = DiskFileSystem('u', base)
+        self.addCleanup(fs.destroy)
+        os.symlink(outside, os.path.join(fs.root, 'home', 'u', 'escape'))
+        with self.assertRaises(FileNotFoundError):
+            fs.read_file('/home/u/escape')
+        with self.assertRaises(FileNotFoundError):
+            fs.write_file('/home/u/escape', [b'x'])
+        with open(outside) as f:
+            self.assertEqual(f.read(), 'secret')
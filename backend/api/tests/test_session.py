@@ -0,0 +1,61 @@
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+from django.test import TestCase, override_settings
+from api import operations
+from api.command_exec import execute_line
+from api.problem import DEFAULT_ALLOWED_COMMANDS
+from api.session import SESSIONS
+from api.snapshot import SNAPSHOTS
+from api.tests.helpers import make_sandbox_root, make_user
+from api.user import SessionClosed
+
+TOKEN = 'session-test'
+
+class SessionReleaseTest(TestCase):
+    def setUp(self):
+        snapshot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, snapshot_dir, True)
+        patcher = mock.patch.object(SNAPSHOTS, 'directory', snapshot_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        settings_override = override_settings(FILESYSTEM_BACKEND='memory', SANDBOX_ROOT=make_sandbox_root(self))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(SESSIONS.remove, TOKEN)
+        self.user = make_user(self)
+        self.user.fs.touch('/home/tester/a')
+        SESSIONS.add(TOKEN, self.user)
+
+    def test_remove_waits_for_running_command(self):
+        with self.user.lock:
+            remover = threading.Thread(target=SESSIONS.remove, args=(TOKEN,))
+            remover.start()
+            remover.join(0.2)
+            # 명령어가 실행 중인 동안 샌드박스를 반납하지 않음
+            self.assertTrue(remover.is_alive())
+            self.assertFalse(self.user.closed)
+        remover.join()
+        self.assertTrue(self.user.closed)
+        self.assertIsNone(SESSIONS.get(TOKEN))
+
+    def test_closed_session_rejects_commands(self):
+        SESSIONS.remove(TOKEN)
+        with self.assertRaises(SessionClosed):
+            execute_line(self.user, 'ls', DEFAULT_ALLOWED_COMMANDS)
+        with self.assertRaises(operations.SessionNotFound):
+            operations.execute(TOKEN, 'ls')
+
+    def test_waiting_command_runs_on_restored_session(self):
+        results = []
+        with self.user.lock:
+            worker = threading.Thread(target=lambda: results.append(operations.execute(TOKEN, 'ls')))
+            worker.start()
+            time.sleep(0.1)
+            SNAPSHOTS.save(self.user)
+            SESSIONS.detach(TOKEN, self.user)
+        worker.join()
+        self.assertEqual(results[0].output, 'a')
+        self.assertIsNot(SESSIONS.get(TOKEN), self.user)
@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase
+from api.shell_parser import ParseError, Pipeline, Redirect, SimpleCommand, parse, tokenize
+
+class TokenizeTest(SimpleTestCase):
+    def words(self, line: str):
+        return [token.value for token in tokenize(line)]
+
+    def test_quotes_and_escapes(self):
+        self.assertEqual(self.words("mkdir 'my dir'  \"a \\\"b\\\"\" c\\ d"), ['mkdir', 'my dir', 'a "b"', 'c d'])
+        self.assertEqual(self.words("echo '' \"\""), ['echo', '', ''])
+        # 작은따옴표 안에서는 escape 를 처리하지 않음
+        self.assertEqual(self.words("echo 'a\\b'"), ['echo', 'a\\b'])
+
+    def test_quoted_operators_are_words(self):
+        self.assertEqual(tokenize("echo 'a;b' \"|\""), [('word', 'echo'), ('word', 'a;b'), ('word', '|')])
+
+    def test_operators_split_words(self):
+        self.assertEqual(self.words('ls>out;pwd&&cd a|cat'), ['ls', '>', 'out', ';', 'pwd', '&&', 'cd', 'a', '|', 'cat'])
+
+    def test_errors(self):
+        for line in ("echo 'a", 'echo "a', 'ls & pwd'):
+            with self.subTest(line=line), self.assertRaises(ParseError):
+                tokenize(line)
+
+class ParseTest(SimpleTestCase):
+    def test_sequence_and_pipeline(self):
+        line = parse('mkdir a && cd a; ls | cat > out.txt')
+        self.assertEqual(line.items, (
+            ('', Pipeline((SimpleCommand(('mkdir', 'a')),))),
+            ('&&', Pipeline((SimpleCommand(('cd', 'a')),))),
+            (';', Pipeline((SimpleCommand(('ls',)), SimpleCommand(('cat',), (Redirect('>', 'out.txt'),))))),
+        ))
+
+    def test_empty_and_trailing_semicolon(self):
+        self.assertEqual(parse('   ').items, ())
+        self.assertEqual(len(parse('pwd;').items), 1)
+
+    def test_errors(self):
+        for line in ('ls |', 'mkdir a &&', '; ls', 'ls | | cat', 'echo >', 'echo > ;', '> out'):
+            with self.subTest(line=line), self.assertRaises(ParseError):
+                parse(line)
@@ -0,0 +1,127 @@
+import asyncio
+import errno
+import os
+import shutil
+import tempfile
+from unittest import mock
+from django.test import TestCase, override_settings
+from api import operations
+from api.session import SESSIONS
+from api.snapshot import MAGIC, SNAPSHOTS
+from api.tests.helpers import make_sandbox_root, make_user
+
+TOKEN = 'snapshot-test'
+
+class SessionSnapshotTestCase(TestCase):
+    def setUp(self):
+        snapshot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, snapshot_dir, True)
+        patcher = mock.patch.object(SNAPSHOTS, 'directory', snapshot_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # 복원되는 세션의 샌드박스도 테스트용 루트에 생성
+        settings_override = override_settings(FILESYSTEM_BACKEND='memory', SANDBOX_ROOT=make_sandbox_root(self))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(SESSIONS.remove, TOKEN)
+
+        user = make_user(self)
+        user.fs.make_dir('/home/tester/project/src', parents=True)
+        user.fs.write_file('/home/tester/project/a.txt', [b'hello'])
+        user.fs.write_file('/home/tester/project/src/b.txt', [b'hello'])
+        user.fs.write_file('/home/tester/notes', [b'x' * 10000])
+        user.fs.make_dir('/home/tester/other/deep', parents=True)
+        user.current_dir = '/home/tester/project'
+        SESSIONS.add(TOKEN, user)
+
+class SnapshotTest(SessionSnapshotTestCase):
+    def test_suspend_removes_session(self):
+        result = operations.suspend(TOKEN)
+        self.assertGreater(result['bytes'], 0)
+        # 같은 내용의 파일과 압축되는 내용은 스냅샷 크기에 그대로 반영되지 않음
+        self.assertLess(result['bytes'], 10000)
+        self.assertIsNone(SESSIONS.get(TOKEN))
+        self.assertTrue(os.path.exists(SNAPSHOTS.path(TOKEN)))
+
+    def test_round_trip_restores_lazily(self):
+        operations.suspend(TOKEN)
+        user = operations.get_user(TOKEN)
+        self.assertIs(SESSIONS.get(TOKEN), user)
+        self.assertFalse(os.path.exists(SNAPSHOTS.path(TOKEN)))
+        self.assertEqual(user.current_dir, '/home/tester/project')
+        # 접근하기 전의 디렉토리는 아직 생성되지 않음
+        self.assertIsNotNone(user.restore)
+        self.assertFalse(user.fs.exists('/home/tester/project/src'))
+
+        user.ensure_restored('/home/tester/project/src')
+        self.assertEqual(user.fs.read_file('/home/tester/project/src/b.txt'), b'hello')
+        self.assertFalse(user.fs.exists('/home/tester/other/deep'))
+        self.assertIsNotNone(user.restore)
+        user.ensure_restored()
+        self.assertIsNone(user.restore)
+        self.assertEqual(user.fs.read_file('/home/tester/notes'), b'x' * 10000)
+        self.assertTrue(user.fs.is_dir('/home/tester/other/deep'))
+
+    def test_commands_restore_accessed_paths(self):
+        operations.suspend(TOKEN)
+        result = operations.execute(TOKEN, 'cat a.txt src/b.txt')
+        self.assertEqual(result.output, 'hellohello')
+
+    def test_async_resume(self):
+        operations.suspend(TOKEN)
+        user = asyncio.run(operations.get_user_async(TOKEN))
+        self.assertIs(SESSIONS.get(TOKEN), user)
+        with self.assertRaises(operations.SessionNotFound):
+            asyncio.run(operations.get_user_async('missing'))
+
+    def test_disconnect_discards_snapshot(self):
+        operations.suspend(TOKEN)
+        operations.disconnect(TOKEN)
+        self.assertFalse(os.path.exists(SNAPSHOTS.path(TOKEN)))
+        with self.assertRaises(operations.SessionNotFound):
+            operations.get_user(TOKEN)
+
+    def test_transient_error_keeps_snapshot(self):
+        operations.suspend(TOKEN)
+        with mock.patch('api.snapshot.os.pread', side_effect=OSError(errno.EIO, 'I/O error')):
+            with self.assertRaises(OSError):
+                SNAPSHOTS.load(TOKEN)
+        self.assertTrue(os.path.exists(SNAPSHOTS.path(TOKEN)))
+        user = operations.get_user(TOKEN)
+        self.assertEqual(user.current_dir, '/home/tester/project')
+
+    def test_corrupt_snapshot_is_discarded(self):
+        os.makedirs(SNAPSHOTS.directory, exist_ok=True)
+        with open(SNAPSHOTS.path('corrupt'), 'wb') as f:
+            f.write(MAGIC + b'\0' * 64)
+        self.assertIsNone(SNAPSHOTS.load('corrupt'))
+        self.assertFalse(os.path.exists(SNAPSHOTS.path('corrupt')))
+
+class HibernateTest(SessionSnapshotTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = SESSIONS.get(TOKEN)
+        self.user.last_activity = 0
+        for name, value in (('hibernate', True), ('idle_timeout', 1)):
+            patcher = mock.patch.object(SESSIONS, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_snapshot_is_written_before_session_is_removed(self):
+        detach = SESSIONS.detach
+
+        def check_detach(token, user):
+            # 등록을 해제하는 시점에는 이미 스냅샷이 저장되어 있음
+            self.assertTrue(os.path.exists(SNAPSHOTS.path(token)))
+            self.assertIs(SESSIONS.get(token), user)
+            detach(token, user)
+        with mock.patch.object(SESSIONS, 'detach', side_effect=check_detach):
+            self.assertEqual(SESSIONS.evict_idle(), 1)
+        self.assertTrue(self.user.closed)
+        self.assertIsNot(operations.get_user(TOKEN), self.user)
+
+    def test_failed_save_keeps_session(self):
+        with mock.patch.object(SNAPSHOTS, 'save', side_effect=OSError(errno.ENOSPC, 'No space left on device')):
+            self.assertEqual(SESSIONS.evict_idle(), 0)
+        self.assertIs(SESSIONS.get(TOKEN), self.user)
+        self.assertFalse(self.user.closed)
@@ -0,0 +1,46 @@
+import os
+from django.test import SimpleTestCase, override_settings
+from api.template import ProblemTemplate, TemplateRegistry
+from api.tests.helpers import make_sandbox_root, make_user
+
+class ProblemTemplateTest(SimpleTestCase):
+    def setUp(self):
+        self.sandbox_root = make_sandbox_root(self)
+        override = override_settings(SANDBOX_ROOT=self.sandbox_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def mount(self, template: ProblemTemplate):
+        user = make_user(self, backend='disk')
+        user.mount_template(template)
+        return os.stat(user.fs.host_path('/home/tester/README.md'))
+
+    def test_materialized_under_sandbox_root(self):
+        template = ProblemTemplate('t:1', {'README.md': 'hi'})
+        self.addCleanup(template.retire)
+        with template.materialized() as path:
+            self.assertEqual(os.path.dirname(path), self.sandbox_root)
+            self.assertTrue(os.path.basename(path).startswith('template_'))
+
+    def test_files_are_linked_only_for_builtin_problems(self):
+        linked = ProblemTemplate('t:1', {'README.md': 'hi'}, link_files=True)
+        copied = ProblemTemplate('t:2', {'README.md': 'hi'}, link_files=False)
+        self.addCleanup(linked.retire)
+        self.addCleanup(copied.retire)
+        self.assertEqual(self.mount(linked).st_nlink, 2)
+        self.assertEqual(self.mount(copied).st_nlink, 1)
+
+    def test_remove_deletes_directory_after_mounts_finish(self):
+        registry = TemplateRegistry()
+        template = registry.get('t:1', {'README.md': 'hi'})
+        with template.materialized() as path:
+            registry.remove('t:1')
+            self.assertTrue(os.path.isdir(path))
+        self.assertFalse(os.path.exists(path))
+
+    def test_session_keeps_files_after_template_removed(self):
+        template = ProblemTemplate('t:1', {'README.md': 'hi'})
+        user = make_user(self, backend='disk')
+        user.mount_template(template)
+        template.retire()
+        self.assertEqual(user.fs.read_file('/home/tester/README.md'), b'hi')
@@ -1,9 +1,19 @@
 from django.urls import path
-from api.views import hello_django, hello_django_drf, execute_command, connect_user
+from api.views import hello_django, hello_django_drf, execute_command, execute_command_async, execute_script, connect_user, disconnect_user, get_problem, get_output, complete, history, grade, suspend_session, resume_session
 
 urlpatterns = [
     path('hello-django/', hello_django, name='hello_django'),
     path('hello-django-drf/', hello_django_drf, name='hello_django'),
     path('input-command/', execute_command, name='execute_command'),
+    path('input-script/', execute_script, name='execute_script'),
+    path('input-command-async/', execute_command_async, name='execute_command_async'),
+    path('get-output/', get_output, name='get_output'),
+    path('complete/', complete, name='complete'),
+    path('history/', history, name='history'),
+    path('grade/', grade, name='grade'),
     path('connect-user/', connect_user, name='connect_user'),
+    path('disconnect-user/', disconnect_user, name='disconnect_user'),
+    path('suspend-session/', suspend_session, name='suspend_session'),
+    path('resume-session/', resume_session, name='resume_session'),
+    path('get-problem/', get_problem, name='get_problem'),
 ]
\ No newline at end of file
@@ -1,14 +1,175 @@
-import os
-import tempfile
+import asyncio
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from django.conf import settings
+from api.filesystem.filesystem import FileSystem
+from api.completion import DirectoryIndex
+from api.grading import TreeHashIndex
+from api.output import OutputStore, ResultCache
+from api.sandbox_path import normalize_path
+from api.sandbox_pool import SANDBOX_POOL
+
+# 이벤트 루프에서 user.lock 을 기다릴 때 lock 을 다시 확인하는 최대 간격 (초)
+LOCK_POLL_INTERVAL: float = 0.01
+
+class SessionClosed(RuntimeError):
+    """
+    삭제/보관된 세션에서 명령어를 실행하려는 경우 발생시키는 예외 (샌드박스가 이미 풀에 반납됨)
+    """
+    pass
 
 class User:
 
     def __init__(self, username, hostname):
         self.username: str = username
         self.hostname: str = hostname
-        self.restricted_dir: str = "."
-        self.temp_root_dir = os.path.abspath(tempfile.mkdtemp(prefix=username + '_', dir=self.restricted_dir))
-        self.temp_home_dir = os.path.join(self.temp_root_dir, "home", username)
-        os.makedirs(self.temp_home_dir)
-        os.chdir(self.temp_home_dir)
-        print(f"restricted dir: {os.path.abspath(self.restricted_dir)}")
\ No newline at end of file
+        # 세션 토큰 (SessionRegistry 에 등록될 때 설정, 명령어 기록에 사용)
+        self.token = None
+        # 샌드박스 파일 시스템 (settings.FILESYSTEM_BACKEND: 'disk' | 'memory')
+        # 미리 생성된 샌드박스를 풀에서 꺼내 사용
+        self.fs: FileSystem = SANDBOX_POOL.acquire(username)
+        # 샌드박스 기준 가상 경로 ex) /home/tmp
+        self.home_dir: str = f"/home/{username}"
+        self.current_dir: str = self.home_dir
+        # 같은 세션의 명령어가 동시에 실행되지 않도록 보호
+        self.lock = threading.Lock()
+        # 세션이 삭제/보관되어 샌드박스를 반납했는지 여부 (user.lock 을 가진 상태에서만 변경)
+        self.closed: bool = False
+        # 마지막으로 사용된 시간 (time.monotonic), 유휴 세션 삭제에 사용
+        self.last_activity: float = time.monotonic()
+        # 현재 선택된 문제 id 와 홈 디렉토리에 마운트된 문제 템플릿
+        self.problem_id = None
+        self.template = None
+        # 한 페이지를 초과한 명령어 출력 (get-output/ 으로 나머지 페이지 조회)
+        self.outputs: OutputStore = OutputStore(settings.OUTPUT_STORE_SIZE, settings.OUTPUT_STORE_TTL)
+        # 탭 자동 완성용 디렉토리 항목 인덱스 (명령어 계층에서 생성한 항목은 바로 추가)
+        self.dir_index: DirectoryIndex = DirectoryIndex(self.fs, settings.COMPLETION_INDEX_DIRS)
+        # 채점용 홈 디렉토리 Merkle tree (변경된 경로의 hash 만 다시 계산)
+        self.tree_hash: TreeHashIndex = TreeHashIndex(self.fs, self.home_dir)
+        # 파일 시스템 세대 번호 (파일 시스템이 변경될 때마다 증가) 와 읽기 전용 명령어의 출력 캐시
+        # 외부 명령어는 lock 밖에서 변경을 알릴 수 있으므로 += 대신 itertools.count 로 증가 (동시에 증가해도 같은 번호가 나오지 않음)
+        self._generations = itertools.count(1)
+        self.generation: int = 0
+        self.results: ResultCache = ResultCache(settings.RESULT_CACHE_SIZE, settings.RESULT_CACHE_MAX_LENGTH)
+        # 명령어 기록의 세션 내 실행 순서 (async 명령어가 동시에 기록해도 중복되지 않음)
+        self.history_seq = itertools.count(1)
+        # 스냅샷에서 복원 중인 세션의 아직 생성하지 않은 디렉토리 (api.snapshot.SnapshotArchive, 모두 생성되면 None)
+        self.restore = None
+        # 스냅샷을 만든 시점에 마운트되어 있던 템플릿 (같은 템플릿이면 복원한 홈 디렉토리를 다시 마운트하지 않음)
+        self.restored_template_id = None
+        # 템플릿을 마운트한 문제와 마운트 이후 홈 디렉토리가 변경되었는지 여부
+        # (같은 문제의 템플릿이 수정되어도 작업 중인 홈 디렉토리는 교체하지 않음)
+        self.template_problem_id: Optional[int] = None
+        self.home_modified: bool = False
+
+    @asynccontextmanager
+    async def hold_lock_async(self) -> AsyncIterator[None]:
+        """
+        이벤트 루프에서 실행하는 명령어가 실행하는 동안 user.lock 을 유지 (스레드에서 실행되는 명령어와 같은 lock 으로 직렬화)
+
+        lock 을 기다리는 동안 스레드를 점유하지 않도록 blocking 없이 다시 시도하고,
+        기다리는 중에 취소되어도 lock 을 얻지 않은 상태이므로 해제할 필요가 없음
+        """
+        delay = 0.001
+        while not self.lock.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LOCK_POLL_INTERVAL)
+        try:
+            self.check_open()
+            yield
+        finally:
+            self.lock.release()
+
+    def check_open(self) -> None:
+        # user.lock 을 얻은 뒤 호출 (lock 을 기다리는 동안 세션이 삭제되었으면 반납된 샌드박스에 접근하지 않음)
+        if self.closed:
+            raise SessionClosed(self.token)
+
+    def mount_template(self, template) -> None:
+        """
+        홈 디렉토리를 문제 템플릿으로 교체
+        이미 마운트된 템플릿이거나, 같은 문제의 템플릿을 마운트한 뒤 홈 디렉토리가 변경된 경우에는 교체하지 않음
+
+        Parameters
+        ----------
+        template : ProblemTemplate
+            마운트할 문제 템플릿
+        """
+        if template is None or template is self.template:
+            return
+        mounted_id = self.template.template_id if self.template is not None else self.restored_template_id
+        if template.template_id == mounted_id:
+            # 내용이 같은 템플릿 (문제의 제목/설명만 수정된 경우 등)
+            self.template = template
+            return
+        if self.home_modified and self.problem_id == self.template_problem_id:
+            # 문제가 수정되어 템플릿이 바뀌어도 사용자가 작업한 홈 디렉토리는 유지 (새 템플릿은 다음 세션부터 적용)
+            self.template = template
+            return
+        # 복원 중인 디렉토리를 먼저 모두 생성해야 나중에 이전 홈 디렉토리의 항목이 생성되지 않음
+        self.ensure_restored()
+        self.fs.mount_template(self.home_dir, template)
+        self.dir_index.clear()
+        self.tree_hash.clear()
+        self.generation = next(self._generations)
+        self.template = template
+        self.template_problem_id = self.problem_id
+        self.home_modified = False
+        self.current_dir = self.home_dir
+
+    def mark_changed(self, path: Optional[str] = None, is_dir: bool = False) -> None:
+        """
+        명령어가 파일 시스템을 변경한 경우 호출하여 세션의 인덱스 갱신
+
+        Parameters
+        ----------
+        path : Optional[str]
+            생성/수정된 가상 절대 경로 (None 이면 외부 명령어와 같이 변경된 경로를 알 수 없는 경우)
+        is_dir : bool
+            생성된 경로가 디렉토리인지 여부
+        """
+        # 이전 세대에서 저장한 명령어 출력은 더 이상 조회되지 않음
+        self.generation = next(self._generations)
+        self.home_modified = True
+        if path is None:
+            self.tree_hash.invalidate_all()
+            return
+        self.dir_index.add(path, is_dir)
+        self.tree_hash.invalidate(path)
+
+    def ensure_restored(self, path: Optional[str] = None) -> None:
+        # 스냅샷에서 복원된 세션은 경로에 처음 접근할 때 경로의 디렉토리만 생성 (path 가 None 이면 전체)
+        restore = self.restore
+        if restore is not None and restore.materialize(self.fs, path):
+            self.restore = None
+
+    def resolve_path(self, path: str) -> str:
+        """
+        사용자가 입력한 경로를 샌드박스 기준 정규화된 가상 절대 경로로 변환
+
+        Parameters
+        ----------
+        path : str
+            사용자가 입력한 경로 ('~', 상대 경로, 절대 경로)
+
+        Returns
+        -------
+        str
+            정규화된 가상 절대 경로 ex) '~/a/../b' -> '/home/tmp/b'
+        """
+        resolved = normalize_path(path, self.current_dir, self.home_dir)
+        if self.restore is not None:
+            self.ensure_restored(resolved)
+        return resolved
+
+    def get_prompt(self) -> str:
+        return f"{self.username}@{self.hostname}:{self.get_output_path()}$ "
+
+    def get_output_path(self) -> str:
+        # 홈 디렉토리 경로를 '~' 로 대체 ex) /home/tmp/aaa -> ~/aaa
+        if self.current_dir == self.home_dir or self.current_dir.startswith(self.home_dir + '/'):
+            return '~' + self.current_dir[len(self.home_dir):]
+        return self.current_dir
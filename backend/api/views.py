@@ -1,11 +1,15 @@
-from django.http import HttpResponse
-from rest_framework import viewsets
+import json
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status, viewsets
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from VirtualTerminal import settings
-from api.command_dict import COMMAND_DICT
-from api.command_exec import Command_Exec
+from api.engine import ENGINE
+from api.metrics import timed_view
 from api.models import Item
+from api.operations import ExpectedStateNotFound, OutputNotFound, ProblemNotFound, SessionNotFound
 from api.serializers import ItemSerializer
 
 
@@ -25,31 +29,170 @@ def connect_user(request):
     if request.method == 'POST':
         user_instance = request.data
         print(user_instance)
-        settings.set_user_instance(user_instance['username'], user_instance['hostname'])
+        token = ENGINE.connect(user_instance['username'], user_instance['hostname'])
 
-    return Response({'message': 'User instance is set.'})
+    # 이후 요청에서는 발급된 세션 토큰으로 사용자를 구분
+    return Response({'message': 'User instance is set.', 'session': token})
 
+@api_view(['POST'])
+def disconnect_user(request):
+    try:
+        ENGINE.call(request.data.get('session'), 'disconnect')
+    except SessionNotFound:
+        return Response({'message': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'message': 'User instance is removed.'})
 
 
+# 세션을 스냅샷으로 저장하고 샌드박스를 반납하는 뷰 (같은 토큰으로 다음 요청을 보내면 복원됨)
+@api_view(['POST'])
+def suspend_session(request):
+    try:
+        result = ENGINE.call(request.data.get('session'), 'suspend')
+    except SessionNotFound:
+        return Response({'message': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(result)
+
+# 저장된 세션을 미리 복원하는 뷰 (복원은 디렉토리 목록만 읽으므로 파일 내용은 명령어가 접근할 때 생성)
+@api_view(['POST'])
+def resume_session(request):
+    try:
+        result = ENGINE.call(request.data.get('session'), 'resume')
+    except SessionNotFound:
+        return Response({'message': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(result)
+
 # 문제에 들어가면 문제에 대한 정보 db에서 조회하고 저장하는 뷰
 @api_view(['POST'])
 def get_problem(request):
-    pass
+    data = request.data
+    try:
+        problem = ENGINE.call(data.get('session'), 'select_problem', data.get('problem_id'))
+    except SessionNotFound:
+        return Response({'message': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    except ProblemNotFound:
+        return Response({'message': 'Problem not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(problem)
 
 @api_view(['POST'])
+@timed_view('execute_command')
 def execute_command(request):
     if request.method == 'POST':
         command = request.data
 
-        ### DB에서 가져와야 하는 값
-        allowed_commands = ['cd', 'pwd', 'mkdir', 'ls', 'touch']
-        template = None
-        ###
-
         print(command)
-        command_parts = command['call'].split(' ')
-        output: str = Command_Exec(COMMAND_DICT[command_parts[0]]).execute(command_parts, allowed_commands, template)
-        return Response({'output': output})
+        try:
+            result = ENGINE.call(command.get('session'), 'execute', command['call'])
+        except SessionNotFound:
+            return Response({'output': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(output_response(result))
+
+def output_response(result) -> dict:
+    # 출력이 한 페이지를 초과한 경우 나머지 페이지를 조회할 output_id 와 next_cursor 포함
+    response = {'output': result.output}
+    if result.output_id is not None:
+        response['output_id'] = result.output_id
+        response['next_cursor'] = result.next_cursor
+    # 실행 제한을 초과하여 중단된 경우 제한 종류 ('timeout', 'cpu', 'output')
+    if result.limit is not None:
+        response['limit'] = result.limit
+    return response
+
+# 한 페이지를 초과한 명령어 출력의 나머지 페이지를 조회하는 뷰 (next_cursor 가 null 이면 마지막 페이지)
+@api_view(['POST'])
+def get_output(request):
+    data = request.data
+    try:
+        page = ENGINE.call(data.get('session'), 'get_output', data.get('output_id'), int(data.get('cursor', 0)))
+    except (TypeError, ValueError):
+        return Response({'output': 'Invalid cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+    except SessionNotFound:
+        return Response({'output': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    except OutputNotFound:
+        return Response({'output': 'Output not found or expired.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(page)
+
+# 탭 자동 완성 뷰 (line: 커서 앞까지 입력된 명령어 줄)
+# 명령어 이름은 허용된 명령어에서, 경로는 세션의 디렉토리 항목 인덱스에서 찾으므로 명령어를 실행하지 않음
+@api_view(['POST'])
+@timed_view('complete')
+def complete(request):
+    data = request.data
+    line = data.get('line', '')
+    if not isinstance(line, str):
+        return Response({'message': 'Invalid line.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        result = ENGINE.call(data.get('session'), 'complete', line)
+    except SessionNotFound:
+        return Response({'message': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(result)
+
+# 세션 홈 디렉토리를 선택된 문제의 기대 상태와 비교하는 채점 뷰 (diff: 일치하지 않는 경로 목록)
+@api_view(['POST'])
+@timed_view('grade')
+def grade(request):
+    try:
+        result = ENGINE.call(request.data.get('session'), 'grade')
+    except SessionNotFound:
+        return Response({'message': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    except ProblemNotFound:
+        return Response({'message': 'Problem not found.'}, status=status.HTTP_404_NOT_FOUND)
+    except ExpectedStateNotFound:
+        return Response({'message': 'Problem has no expected state.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(result)
+
+# 세션의 명령어 기록 조회 뷰 (최신 순, next_before 를 before 로 전달하면 이전 페이지)
+@api_view(['POST'])
+@timed_view('history')
+def history(request):
+    data = request.data
+    try:
+        before = int(data['before']) if data.get('before') is not None else None
+        limit = int(data['limit']) if data.get('limit') is not None else None
+    except (TypeError, ValueError):
+        return Response({'message': 'Invalid before or limit.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        result = ENGINE.call(data.get('session'), 'history', before, limit)
+    except SessionNotFound:
+        return Response({'message': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(result)
+
+# 여러 명령어(리스트 또는 여러 줄 스크립트)를 한 세션에서 순서대로 실행하는 뷰 (채점, 초기 설정 스크립트용)
+@api_view(['POST'])
+@timed_view('execute_script')
+def execute_script(request):
+    data = request.data
+    lines = data['script'].splitlines() if 'script' in data else data.get('commands', [])
+    # 빈 줄과 주석은 실행하지 않음
+    lines = [line for line in lines if line.strip() and not line.lstrip().startswith('#')]
+    if len(lines) > settings.MAX_SCRIPT_COMMANDS:
+        return Response({'results': [], 'message': f'Too many commands (max {settings.MAX_SCRIPT_COMMANDS}).'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        results = ENGINE.call(data.get('session'), 'execute_script', lines, bool(data.get('stop_on_error')))
+    except SessionNotFound:
+        return Response({'results': [], 'message': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'results': results})
+
+# ASGI(uvicorn) 환경에서 사용하는 async 명령어 실행 뷰
+# DRF 는 async 뷰를 지원하지 않으므로 장고 기본 async 뷰로 구현 (api_view 와 같이 csrf 검사 제외)
+@csrf_exempt
+@require_POST
+@timed_view('execute_command_async')
+async def execute_command_async(request):
+    try:
+        command = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'output': 'Invalid request body.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        result = await ENGINE.call_async(command.get('session'), 'execute', command['call'])
+    except SessionNotFound:
+        return JsonResponse({'output': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return JsonResponse(output_response(result))
+
+# Prometheus 가 수집하는 metric (명령어별 실행 시간, 에러 수, 프로세스 생성 수, 활성 세션 수, 샌드박스 사용량)
+def metrics(request):
+    return HttpResponse(ENGINE.collect_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 class ItemViewSet(viewsets.ModelViewSet):
     queryset = Item.objects.all()
@@ -0,0 +1,259 @@
+import argparse
+import importlib.util
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import timeit
+from typing import Callable, Dict, List, Optional, Tuple
+
+# HTTP 서버 없이 명령어 실행 경로만 측정하는 microbenchmark
+# test.py 의 ShellSimulator 와 장고 API 의 api.command 명령어를 같은 합성 디렉토리 트리에서 실행하고,
+# 명령어 한 번의 비용을 단계별(파싱, 경로 변환, 프로세스 생성, 출력 decode)로 나누어 측정
+#
+# ex) python bench.py --quick
+#     python bench.py --output bench.json --baseline bench_before.json
+
+ROOT_DIR: str = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR: str = os.path.join(ROOT_DIR, 'backend')
+# 기준 결과 대비 이 비율 이상 느려지면 회귀로 표시 (microbenchmark 는 편차가 커서 loadtest 보다 넉넉하게)
+REGRESSION_THRESHOLD: float = 0.20
+# 측정 하나의 반복 횟수를 정할 때 목표로 하는 실행 시간(초)
+TARGET_TIME: float = 0.05
+REPEAT: int = 5
+
+def load_shell():
+    # 표준 라이브러리의 test 패키지와 이름이 겹치지 않도록 파일 경로로 test.py 를 import
+    spec = importlib.util.spec_from_file_location('shell_simulator', os.path.join(ROOT_DIR, 'test.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def setup_django() -> None:
+    # api 패키지는 settings 를 사용하므로 장고 설정만 로드 (서버와 DB 는 사용하지 않음)
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'VirtualTerminal.settings')
+    import django
+    django.setup()
+
+def measure(fn: Callable[[], object]) -> Tuple[float, float]:
+    """
+    fn 한 번의 실행 시간 측정
+
+    timeit 으로 TARGET_TIME 초 정도 걸리는 반복 횟수를 정한 뒤 REPEAT 번 측정
+
+    Returns
+    -------
+    Tuple[float, float]
+        호출 한 번의 중앙값과 최솟값 (마이크로초)
+    """
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= TARGET_TIME or number >= 1 << 20:
+            break
+        number = max(number * 2, int(number * TARGET_TIME / max(elapsed, 1e-9)))
+    runs = [elapsed / number] + [timer.timeit(number) / number for _ in range(REPEAT - 1)]
+    return statistics.median(runs) * 1e6, min(runs) * 1e6
+
+def deep_path(depth: int) -> str:
+    # 트리의 가장 깊은 디렉토리의 홈 기준 상대 경로 ex) depth 3 -> d0/d1/d2
+    return '/'.join(f'd{i}' for i in range(depth))
+
+def build_disk_tree(home: str, depth: int, width: int) -> None:
+    # depth 단계의 디렉토리와 가장 깊은 디렉토리 안의 width 개 파일
+    target = os.path.join(home, deep_path(depth))
+    os.makedirs(target, exist_ok=True)
+    for i in range(width):
+        open(os.path.join(target, f'f{i}.txt'), 'w').close()
+
+def build_fs_tree(fs, home: str, depth: int, width: int) -> None:
+    target = f'{home}/{deep_path(depth)}'
+    fs.make_dir(target, parents=True)
+    for i in range(width):
+        fs.touch(f'{target}/f{i}.txt')
+
+class Suite:
+    """
+    측정 목록 실행과 결과 출력
+
+    Methods
+    -------
+    add(name: str, fn: Callable)
+        측정 추가 (--filter 에 포함되지 않는 이름은 건너뜀)
+    report(baseline: Optional[dict])
+        결과 표 출력 (baseline 이 있으면 변화율과 회귀 표시)
+    """
+    def __init__(self, name_filter: Optional[str]):
+        self.name_filter: Optional[str] = name_filter
+        self.results: Dict[str, Dict[str, float]] = {}
+
+    def add(self, name: str, fn: Callable[[], object]) -> None:
+        if self.name_filter and self.name_filter not in name:
+            return
+        median, best = measure(fn)
+        self.results[name] = {'median_us': round(median, 3), 'best_us': round(best, 3)}
+        print(f'{name:55} {median:>12.2f} {best:>12.2f}', flush=True)
+
+    def report(self, baseline: Optional[dict]) -> int:
+        if not baseline:
+            return 0
+        print('\ncompared with baseline (median)')
+        regressions = 0
+        for name, result in self.results.items():
+            before = baseline.get('results', {}).get(name)
+            if not before:
+                continue
+            change = (result['median_us'] - before['median_us']) / before['median_us']
+            regressed = change > REGRESSION_THRESHOLD
+            regressions += regressed
+            print(f"{name:55} {before['median_us']:>12.2f} -> {result['median_us']:>10.2f} ({change:+.1%})"
+                  f"{'  REGRESSION' if regressed else ''}")
+        if regressions:
+            print(f'{regressions} benchmark(s) regressed by more than {REGRESSION_THRESHOLD:.0%}.')
+        return regressions
+
+def bench_stages(suite: Suite, shell, work_dir: str) -> None:
+    # 명령어 실행의 단계별 고정 비용 (트리 크기와 무관)
+    from api.command.command_external import Command_External
+    from api.command.command_pipeline import read_text
+    from api.shell_parser import parse, tokenize
+
+    line = 'mkdir -p "my dir"/a && cd "my dir" ; ls -al | cat > out.txt'
+    suite.add('parse/tokenize', lambda: tokenize(line))
+    # lru_cache 를 거치지 않은 파싱 비용과 캐시 적중 비용
+    suite.add('parse/parse (uncached)', lambda: parse.__wrapped__(line))
+    suite.add('parse/parse (cached)', lambda: parse(line))
+
+    state = shell.ShellState('bench', 'host')
+    state.initialize_directories(work_dir)
+    suite.add('path/test.py ShellState.resolve_path', lambda: state.resolve_path('/etc/../usr/bin'))
+    suite.add('path/test.py ShellState.set_output_path', state.set_output_path)
+    suite.add('dispatch/test.py CommandFactory.get_command', lambda: shell.CommandFactory.get_command('ls'))
+
+    # 프로세스 생성 비용 (출력 없음) 과 출력 decode 비용을 분리해서 측정
+    generic = shell.GenericCommand()
+
+    def spawn_true() -> None:
+        generic.spawn(['true'], state, None).wait()
+    suite.add('spawn/test.py GenericCommand.spawn (true)', spawn_true)
+    suite.add('spawn/test.py GenericCommand.execute (true)', lambda: generic.execute(['true'], state))
+
+    data = ('가나다 abc 123\n' * 4096).encode()
+    suite.add('decode/bytes.decode (64KB)', lambda: data.decode('utf-8'))
+    suite.add('decode/api read_text (64KB)', lambda: sum(1 for _ in read_text(io.BufferedReader(io.BytesIO(data)))))
+
+    from api.sandbox_pool import SANDBOX_POOL
+    from api.user import User
+    user = User('bench', 'host')
+    external = Command_External()
+    suite.add('spawn/api Command_External.execute_command (true)', lambda: external.execute_command(user, ['true']))
+    SANDBOX_POOL.release(user.fs)
+    shutil.rmtree(state.temp_root_dir, ignore_errors=True)
+
+def bench_shell_tree(suite: Suite, shell, work_dir: str, depth: int, width: int) -> None:
+    # test.py 의 ShellSimulator 와 builtin 명령어
+    simulator = shell.ShellSimulator('bench', 'host')
+    state = simulator.state
+    state.initialize_directories(work_dir)
+    build_disk_tree(state.temp_home_dir, depth, width)
+    tag = f'd{depth}w{width}'
+    deep = os.path.join(state.temp_home_dir, deep_path(depth))
+    cd = shell.CdCommand()
+
+    suite.add(f'test.py/{tag}/CdCommand cd deep', lambda: cd.execute(['cd', deep], state))
+    state.current_dir = deep
+    suite.add(f'test.py/{tag}/execute_command ls', lambda: simulator.execute_command('ls'))
+    suite.add(f'test.py/{tag}/execute_command ls -l', lambda: simulator.execute_command('ls -l'))
+    suite.add(f'test.py/{tag}/execute_command pwd', lambda: simulator.execute_command('pwd'))
+    suite.add(f'test.py/{tag}/execute_command touch', lambda: simulator.execute_command('touch f0.txt'))
+    suite.add(f'test.py/{tag}/execute_command mkdir -p', lambda: simulator.execute_command(f'mkdir -p ~/{deep_path(depth)}'))
+    suite.add(f'test.py/{tag}/GenericCommand ls (spawn)', lambda: shell.GenericCommand().execute(['ls'], state))
+    shutil.rmtree(state.temp_root_dir, ignore_errors=True)
+
+def bench_api_tree(suite: Suite, backend: str, work_dir: str, depth: int, width: int) -> None:
+    # api.command 명령어 class 직접 호출과 execute_line (파싱, 실행 제한, 출력 버퍼 포함)
+    from api.command_dict import get_command
+    from api.command_exec import execute_line
+    from api.filesystem.filesystem_disk import DiskFileSystem
+    from api.filesystem.filesystem_memory import MemoryFileSystem
+    from api.sandbox_pool import SANDBOX_POOL
+    from api.user import User
+
+    user = User('bench', 'host')
+    # 샌드박스 풀의 샌드박스 대신 측정할 backend 의 샌드박스를 작업 디렉토리에 생성
+    SANDBOX_POOL.release(user.fs)
+    user.fs = DiskFileSystem('bench', work_dir) if backend == 'disk' else MemoryFileSystem('bench')
+    build_fs_tree(user.fs, user.home_dir, depth, width)
+    tag = f'{backend}/d{depth}w{width}'
+    deep = f'{user.home_dir}/{deep_path(depth)}'
+    allowed = ['cd', 'ls', 'pwd', 'mkdir', 'touch']
+
+    def cd_deep() -> None:
+        user.current_dir = user.home_dir
+        get_command('cd').execute_command(user, ['cd', deep])
+    suite.add(f'api/{tag}/Command_CD cd deep', cd_deep)
+    user.current_dir = deep
+    suite.add(f'api/{tag}/Command_LS ls', lambda: get_command('ls').execute_command(user, ['ls']))
+    suite.add(f'api/{tag}/Command_LS ls -l', lambda: get_command('ls').execute_command(user, ['ls', '-l']))
+    suite.add(f'api/{tag}/Command_PWD pwd', lambda: get_command('pwd').execute_command(user, ['pwd']))
+    suite.add(f'api/{tag}/Command_TOUCH touch', lambda: get_command('touch').execute_command(user, ['touch', 'f0.txt']))
+    suite.add(f'api/{tag}/Command_MKDIR mkdir -p',
+              lambda: get_command('mkdir').execute_command(user, ['mkdir', '-p', deep]))
+    # 읽기 전용 명령어는 User.results 에 캐시되므로 세대 번호를 올려 실제 실행 경로를 따로 측정
+    def uncached(line: str):
+        def run() -> None:
+            user.mark_changed()
+            execute_line(user, line, allowed)
+        return run
+    suite.add(f'api/{tag}/execute_line ls (cached)', lambda: execute_line(user, 'ls', allowed))
+    suite.add(f'api/{tag}/execute_line ls', uncached('ls'))
+    suite.add(f'api/{tag}/execute_line pwd (cached)', lambda: execute_line(user, 'pwd', allowed))
+    suite.add(f'api/{tag}/execute_line pwd', uncached('pwd'))
+    user.fs.destroy()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='명령어 실행 경로 microbenchmark (HTTP 서버 없이 실행)')
+    parser.add_argument('--depths', default='1,8,32', help='디렉토리 트리 깊이 목록')
+    parser.add_argument('--widths', default='10,100,1000', help='가장 깊은 디렉토리의 파일 수 목록')
+    parser.add_argument('--backends', default='disk,memory', help='측정할 api 샌드박스 backend 목록')
+    parser.add_argument('--quick', action='store_true', help='작은 트리만 측정 (depths=1,8 widths=10,100)')
+    parser.add_argument('--filter', default=None, help='이름에 이 문자열이 포함된 측정만 실행')
+    parser.add_argument('--output', default=None, help='결과 JSON 파일 경로')
+    parser.add_argument('--baseline', default=None, help='비교할 이전 결과 JSON 파일 경로')
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.depths, args.widths = '1,8', '10,100'
+    depths = [int(value) for value in args.depths.split(',')]
+    widths = [int(value) for value in args.widths.split(',')]
+
+    shell = load_shell()
+    setup_django()
+    suite = Suite(args.filter)
+    work_dir = tempfile.mkdtemp(prefix='bench_')
+    print(f'{"benchmark":55} {"median us":>12} {"best us":>12}')
+    try:
+        bench_stages(suite, shell, work_dir)
+        for depth in depths:
+            for width in widths:
+                bench_shell_tree(suite, shell, work_dir, depth, width)
+                for backend in args.backends.split(','):
+                    bench_api_tree(suite, backend, work_dir, depth, width)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'results': suite.results}, f, indent=2)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    return 1 if suite.report(baseline) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,25 @@
 import os
+import sys
 import subprocess
 import tempfile
 import shutil
-from typing import List, Dict
+import stat
+import threading
+import time
+from typing import Iterator, List, Dict, Optional, Union
 from abc import ABC, abstractmethod
 
+# 명령어 파서는 장고 API 와 같은 모듈을 사용 (backend/api/shell_parser.py 는 장고에 의존하지 않음)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from api.sandbox_path import DirHandleCache, SandboxResolver, normalize_path
+from api.shell_parser import ParseError, parse
+
+# 경로 탐색에 사용하는 디렉토리 fd 캐시 크기
+DIR_HANDLES: int = 16
+
+# 외부 명령어의 최대 실행 시간(초), 초과하면 종료 코드 124 (장고 API 의 settings.COMMAND_TIMEOUT 과 동일)
+COMMAND_TIMEOUT: float = 10
+
 class ShellState:
     """
     Shell의 상태 관리
@@ -21,8 +36,12 @@ class ShellState:
         임시 홈 디렉토리 경로
     current_dir : str
         현재 작업 디렉토리 경로
+    resolver : SandboxResolver
+        임시 루트 디렉토리 기준 경로 해석 (심볼릭 링크, '..' 으로 임시 루트 디렉토리 밖으로 나갈 수 없음)
     output_path : str
         출력될 경로 문자열
+    exit_status : int
+        마지막으로 실행된 명령어의 종료 코드 (0: 성공)
 
     Methods
     -------
@@ -32,6 +51,10 @@ class ShellState:
         현재 디렉토리를 기반으로 출력 경로 설정
     get_prompt() -> str
         현재 상태를 기반으로 prompt 문자열 반환
+    virtual_dir() -> str
+        현재 디렉토리의 임시 루트 디렉토리 기준 경로
+    resolve_path(path: str) -> str
+        입력된 경로를 임시 루트 디렉토리 기준 실제 경로로 변환
     """
     def __init__(self, username: str, hostname: str):
         self.username: str = username
@@ -39,7 +62,9 @@ class ShellState:
         self.temp_root_dir: str = ''
         self.temp_home_dir: str = ''
         self.current_dir: str = ''
+        self.resolver: Optional[SandboxResolver] = None
         self.output_path: str = ''
+        self.exit_status: int = 0
 
     def initialize_directories(self, restricted_dir: str):
         """
@@ -55,16 +80,19 @@ class ShellState:
         self.temp_home_dir = os.path.join(self.temp_root_dir, "home", self.username)
         os.makedirs(self.temp_home_dir)
         self.current_dir = self.temp_home_dir
+        self.resolver = SandboxResolver(self.temp_root_dir, DirHandleCache(DIR_HANDLES))
         self.output_path = '~'
 
     def set_output_path(self):
         """
         현재 디렉토리를 기반으로 출력 경로 설정
         """
-        if self.current_dir == self.temp_root_dir:
-            self.output_path = '/'
-        else:
-            self.output_path = self.current_dir.replace(self.temp_home_dir, '~').replace(self.temp_root_dir, '')
+        # 홈 디렉토리 경로를 '~' 로 대체 ex) /home/tmp/aaa -> ~/aaa
+        path = self.virtual_dir()
+        home_dir = f"/home/{self.username}"
+        if path == home_dir or path.startswith(home_dir + '/'):
+            path = '~' + path[len(home_dir):]
+        self.output_path = path
 
     def get_prompt(self) -> str:
         """
@@ -77,6 +105,28 @@ class ShellState:
         """
         return f"{self.username}@{self.hostname}:{self.output_path}$ "
 
+    def virtual_dir(self) -> str:
+        """
+        현재 디렉토리의 임시 루트 디렉토리 기준 경로 ex) temp_root_dir/home/tmp -> /home/tmp
+        """
+        return self.resolver.virtual_path(self.current_dir) or '/'
+
+    def resolve_path(self, path: str) -> str:
+        """
+        입력된 경로를 임시 루트 디렉토리 기준 실제 경로로 변환 (심볼릭 링크는 임시 루트 디렉토리 안에서 해석)
+
+        Parameters
+        ----------
+        path : str
+            사용자가 입력한 경로 ('~', 상대 경로, 절대 경로)
+
+        Returns
+        -------
+        str
+            실제 경로 ex) /etc -> temp_root_dir/etc, ~/a -> temp_home_dir/a
+        """
+        return self.resolver.host_path(normalize_path(path, self.virtual_dir(), f"/home/{self.username}"))
+
 class Command(ABC):
     """
     모든 명령어 class가 상속받아야 할 기본 클래스 정의
@@ -85,11 +135,17 @@ class Command(ABC):
     -------
     execute(args: List[str], state: ShellState) -> str
         명령어를 실행하고 결과를 반환하는 추상 메소드
+    stream(args: List[str], state: ShellState, stdin: Optional[Iterator[str]]) -> Iterator[str]
+        파이프라인에서 명령어를 실행하고 출력을 chunk 단위로 반환 (stdin: 이전 명령어의 출력)
     """
     @abstractmethod
     def execute(self, args: List[str], state: ShellState) -> str:
         pass
 
+    def stream(self, args: List[str], state: ShellState, stdin: Optional[Iterator[str]] = None) -> Iterator[str]:
+        # 기본 구현은 입력을 사용하지 않고 실행 결과 전체를 하나의 chunk 로 반환
+        yield self.execute(args, state)
+
 class CdCommand(Command):
     """
     'cd' 명령어를 처리 class
@@ -100,20 +156,16 @@ class CdCommand(Command):
         'cd' 명령어를 실행하고 결과 반환
     """
     def execute(self, args: List[str], state: ShellState) -> str:
-        if len(args) > 1:
-            target_dir = args[1]
-            if target_dir == '/':
-                new_path = state.temp_root_dir
-            elif target_dir == '~':
-                new_path = state.temp_home_dir
-            else:
-                new_path = os.path.abspath(os.path.join(state.current_dir, target_dir))
-                if not new_path.startswith(state.temp_root_dir):
-                    return f"{new_path} 경로는 허용되지 않습니다."
-        else:
-            new_path = state.temp_home_dir
-
-        os.chdir(new_path)
+        # 루트보다 상위로 가는 '..' 은 루트로 고정되므로 임시 루트 디렉토리 밖으로 이동할 수 없음
+        target = args[1] if len(args) > 1 else '~'
+        try:
+            new_path = state.resolve_path(target)
+        except OSError:
+            new_path = ''
+        if not os.path.isdir(new_path):
+            state.exit_status = 1
+            return f"cd: {target}: 그런 파일이나 디렉터리가 없습니다"
+        # 프로세스 작업 디렉토리(os.chdir)는 변경하지 않고 상태에만 저장
         state.current_dir = new_path
         state.set_output_path()
         return f"Changed directory to {new_path}"
@@ -131,36 +183,223 @@ class GenericCommand(Command):
         try:
             for i, part in enumerate(args):
                 if part.startswith('/'):
-                    args[i] = os.path.join(state.temp_root_dir, os.path.relpath(part, '/'))
-            
+                    args[i] = state.resolve_path(part)
+
             result: subprocess.CompletedProcess = subprocess.run(args, 
                                                                  capture_output=True, 
                                                                  text=True,
                                                                  shell=False,
                                                                 #  executable="/bin/bash",
+                                                                 cwd=state.current_dir,
+                                                                 timeout=COMMAND_TIMEOUT,
                                                                  )
             if result.returncode != 0:
+                state.exit_status = result.returncode
                 return f"Error: {result.stderr}"
             else:
                 return result.stdout
+        except subprocess.TimeoutExpired:
+            state.exit_status = 124
+            return f"명령어 실행 시간이 {COMMAND_TIMEOUT}초를 초과하여 종료되었습니다."
         except Exception as e:
+            state.exit_status = 1
             return str(e)
 
+    def spawn(self, args: List[str], state: ShellState, stdin) -> subprocess.Popen:
+        """
+        파이프라인에서 사용할 프로세스 생성 (에러 메세지는 터미널로 바로 출력)
+
+        Parameters
+        ----------
+        stdin : Union[None, subprocess.Popen, Iterator[str]]
+            이전 명령어가 없으면 None, 외부 명령어이면 해당 프로세스 (OS pipe 로 직접 연결), builtin 이면 출력 chunk iterator
+        """
+        for i, part in enumerate(args):
+            if part.startswith('/'):
+                args[i] = state.resolve_path(part)
+        if isinstance(stdin, subprocess.Popen):
+            process = subprocess.Popen(args, stdin=stdin.stdout, stdout=subprocess.PIPE, cwd=state.current_dir)
+            # 부모 프로세스의 fd 는 닫아서 다음 프로세스만 pipe 를 소유하도록 함
+            stdin.stdout.close()
+            return process
+        if stdin is None:
+            return subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, cwd=state.current_dir)
+
+        process = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=state.current_dir)
+
+        def feed():
+            try:
+                for chunk in stdin:
+                    process.stdin.write(chunk.encode())
+            except (BrokenPipeError, ValueError):
+                pass
+            finally:
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+        threading.Thread(target=feed, daemon=True).start()
+        return process
+
+def split_options(args: List[str]):
+    """
+    명령어 인자를 옵션 문자 집합과 나머지 인자로 분리
+
+    Parameters
+    ----------
+    args : List[str]
+        명령어와 인자를 포함하는 리스트
+
+    Returns
+    -------
+    Tuple[Set[str], List[str]]
+        옵션 문자 집합과 옵션이 아닌 인자 리스트 ex) ['ls', '-al', 'a'] -> ({'a', 'l'}, ['a'])
+    """
+    options = set()
+    operands: List[str] = []
+    for part in args[1:]:
+        if len(part) > 1 and part.startswith('-'):
+            options.update(part[1:])
+        else:
+            operands.append(part)
+    return options, operands
+
+class PwdCommand(Command):
+    """
+    'pwd' 명령어를 프로세스 생성 없이 처리하는 class
+    """
+    def execute(self, args: List[str], state: ShellState) -> str:
+        return state.virtual_dir()
+
+class LsCommand(Command):
+    """
+    'ls' 명령어를 os.scandir 로 처리하는 class ('-a', '-l' 옵션 지원)
+    """
+    def execute(self, args: List[str], state: ShellState) -> str:
+        options, targets = split_options(args)
+        invalid_options = sorted(options - {'a', 'l'})
+        if invalid_options:
+            state.exit_status = 2
+            return f"ls: 잘못된 옵션 -- '{invalid_options[0]}'"
+
+        outputs: List[str] = []
+        for target in targets or ['.']:
+            path = state.resolve_path(target)
+            if not os.path.exists(path):
+                state.exit_status = 2
+                return f"ls: '{target}'에 접근할 수 없음: 그런 파일이나 디렉터리가 없습니다"
+            if not os.path.isdir(path):
+                outputs.append(self.format_entry(path, target, options))
+                continue
+
+            with os.scandir(path) as it:
+                names = [entry.name for entry in it if 'a' in options or not entry.name.startswith('.')]
+            if 'a' in options:
+                names += ['.', '..']
+            entries = [self.format_entry(os.path.join(path, name), name, options) for name in sorted(names)]
+            if len(targets) > 1:
+                entries.insert(0, f"{target}:")
+            outputs.append('\n'.join(entries))
+        return '\n\n'.join(outputs)
+
+    def format_entry(self, path: str, name: str, options) -> str:
+        if 'l' not in options:
+            return name
+        st = os.stat(path, follow_symlinks=False)
+        mtime = time.strftime('%b %d %H:%M', time.localtime(st.st_mtime))
+        return f"{stat.filemode(st.st_mode)} {st.st_nlink} {st.st_size:>6} {mtime} {name}"
+
+class MkdirCommand(Command):
+    """
+    'mkdir' 명령어를 os.mkdir 로 처리하는 class ('-p' 옵션 지원)
+    """
+    def execute(self, args: List[str], state: ShellState) -> str:
+        options, targets = split_options(args)
+        if not targets:
+            state.exit_status = 1
+            return "mkdir: 피연산자가 없습니다"
+        for target in targets:
+            try:
+                if 'p' in options:
+                    os.makedirs(state.resolve_path(target), exist_ok=True)
+                else:
+                    os.mkdir(state.resolve_path(target))
+            except OSError as e:
+                state.exit_status = 1
+                return f"mkdir: '{target}' 디렉터리를 만들 수 없습니다: {e.strerror}"
+        return ""
+
+class TouchCommand(Command):
+    """
+    'touch' 명령어를 처리하는 class (여러 파일 지원)
+    """
+    def execute(self, args: List[str], state: ShellState) -> str:
+        _, targets = split_options(args)
+        if not targets:
+            state.exit_status = 1
+            return "touch: 파일 피연산자가 없습니다"
+        for target in targets:
+            path = state.resolve_path(target)
+            try:
+                with open(path, 'ab'):
+                    pass
+                os.utime(path)
+            except OSError as e:
+                state.exit_status = 1
+                return f"touch: '{target}'을(를) touch 할 수 없음: {e.strerror}"
+        return ""
+
+class EchoCommand(Command):
+    """
+    'echo' 명령어를 처리하는 class
+    """
+    def execute(self, args: List[str], state: ShellState) -> str:
+        return ' '.join(args[1:])
+
+class CatCommand(Command):
+    """
+    'cat' 명령어를 처리하는 class (파일이 지정되지 않은 경우 파이프 입력을 출력)
+    """
+    def execute(self, args: List[str], state: ShellState) -> str:
+        return ''.join(self.stream(args, state))
+
+    def stream(self, args: List[str], state: ShellState, stdin: Optional[Iterator[str]] = None) -> Iterator[str]:
+        if len(args) == 1 and stdin is not None:
+            yield from stdin
+            return
+        for target in args[1:]:
+            try:
+                with open(state.resolve_path(target), 'r', errors='replace') as f:
+                    for chunk in iter(lambda: f.read(64 * 1024), ''):
+                        yield chunk
+            except OSError as e:
+                state.exit_status = 1
+                yield f"cat: {target}: {e.strerror}"
+                return
+
 class CommandFactory:
     """
     명령어 이름에 따라 적절한 Command 객체를 생성함
+    builtin 으로 구현된 명령어는 프로세스를 생성하지 않고, 나머지 명령어만 GenericCommand 로 실행함
 
     Methods
     -------
     get_command(command_name: str) -> Command
         명령어 이름을 받아 적절한 Command 객체를 반환함
     """
+    builtin_commands: Dict[str, Command] = {
+        'cd': CdCommand(),
+        'pwd': PwdCommand(),
+        'ls': LsCommand(),
+        'mkdir': MkdirCommand(),
+        'touch': TouchCommand(),
+        'echo': EchoCommand(),
+        'cat': CatCommand(),
+    }
+
     @staticmethod
     def get_command(command_name: str) -> Command:
-        if command_name == 'cd':
-            return CdCommand()
-        else:
-            return GenericCommand()
+        return CommandFactory.builtin_commands.get(command_name) or GenericCommand()
 
 class ShellSimulator:
     """
@@ -179,6 +418,8 @@ class ShellSimulator:
         쉘 시뮬레이터를 실행하고 명령어 입력을 처리함
     execute_command(input_command: str) -> str
         입력된 명령어를 실행하고 결과를 반환함
+    execute_script(script: Union[str, List[str]], stop_on_error: bool) -> List[Dict[str, object]]
+        여러 명령어를 순서대로 실행하고 명령어별 결과를 반환함
     """
     def __init__(self, username: str, hostname: str):
         self.state = ShellState(username, hostname)
@@ -204,6 +445,7 @@ class ShellSimulator:
                 output: str = self.execute_command(input_command)
                 print(output)
         finally:
+            self.state.resolver.invalidate()
             shutil.rmtree(self.state.temp_root_dir)
 
     def execute_command(self, input_command: str) -> str:
@@ -220,17 +462,162 @@ class ShellSimulator:
         str
             명령어 실행 결과 문자열 또는 에러 메세지
         """
-        command_parts: List[str] = input_command.split()
-        if not command_parts:
-            return ""
-        
+        self.state.exit_status = 0
+        try:
+            command_line = parse(input_command)
+        except ParseError as e:
+            self.state.exit_status = 2
+            return f"구문 오류: {e}"
+
+        outputs: List[str] = []
+        for separator, pipeline in command_line.items:
+            # '&&' 로 연결된 명령어는 이전 명령어가 성공한 경우에만 실행
+            if separator == '&&' and self.state.exit_status != 0:
+                continue
+            self.state.exit_status = 0
+            if len(pipeline.commands) > 1 or pipeline.commands[0].redirects:
+                outputs.append(self.execute_pipeline(pipeline))
+            else:
+                outputs.append(self.execute_simple_command(list(pipeline.commands[0].args)))
+        return '\n'.join(output.rstrip('\n') for output in outputs if output)
+
+    def execute_simple_command(self, command_parts: List[str]) -> str:
+        """
+        연산자가 없는 단일 명령어를 실행하고 결과를 반환함
+
+        Parameters
+        ----------
+        command_parts : List[str]
+            명령어 이름과 인자 리스트
+
+        Returns
+        -------
+        str
+            명령어 실행 결과 문자열 또는 에러 메세지
+        """
         command_name = command_parts[0]
         if command_name not in self.allowed_commands:
+            self.state.exit_status = 127
             return f"'{command_name}' 는 지원하지 않는 명령어 입니다."
         
         command = CommandFactory.get_command(command_name)
         return command.execute(command_parts, self.state)
 
+    def execute_pipeline(self, pipeline) -> str:
+        """
+        '|' 로 연결된 명령어와 출력 redirection('>', '>>')을 실행하고 결과를 반환함
+
+        builtin 명령어는 출력 chunk iterator 를 다음 명령어의 입력으로 전달하고, 연속된 외부 명령어는 OS pipe 로 직접 연결함
+
+        Parameters
+        ----------
+        pipeline : Pipeline
+            shell_parser.parse 결과의 Pipeline
+
+        Returns
+        -------
+        str
+            마지막 명령어의 출력 (redirection 된 경우 빈 문자열)
+        """
+        for command in pipeline.commands:
+            if command.args[0] not in self.allowed_commands:
+                self.state.exit_status = 127
+                return f"'{command.args[0]}' 는 지원하지 않는 명령어 입니다."
+
+        source = None
+        stages: List[object] = []
+        for index, command in enumerate(pipeline.commands):
+            args: List[str] = list(command.args)
+            handler = CommandFactory.get_command(args[0])
+            try:
+                if isinstance(handler, GenericCommand):
+                    source = handler.spawn(args, self.state, source)
+                else:
+                    source = handler.stream(args, self.state, self.read_source(source))
+                    if index < len(pipeline.commands) - 1 or command.redirects:
+                        source = self.terminate_line(source)
+            except OSError as e:
+                self.state.exit_status = 127
+                source = None
+                print(f"{args[0]}: {e.strerror}")
+                continue
+            stages.append(source)
+
+            # 출력은 마지막 redirection 파일에만 기록하고, 다음 명령어에는 빈 입력 전달
+            for i, redirect in enumerate(command.redirects):
+                try:
+                    with open(self.state.resolve_path(redirect.target), 'a' if redirect.op == '>>' else 'w') as f:
+                        if i == len(command.redirects) - 1:
+                            for chunk in self.read_source(source):
+                                f.write(chunk)
+                except OSError as e:
+                    self.state.exit_status = 1
+                    return f"{redirect.target}: {e.strerror}"
+            if command.redirects:
+                source = None
+
+        output: str = ''.join(self.read_source(source) or [])
+        # 다음 명령어가 읽지 않은 builtin 출력도 끝까지 실행하고, 프로세스는 pipe 를 닫은 뒤 종료를 기다림
+        for stage in reversed(stages):
+            if isinstance(stage, subprocess.Popen):
+                stage.stdout.close()
+                status = stage.wait()
+                if stage is source:
+                    self.state.exit_status = status
+            else:
+                for _ in stage:
+                    pass
+        return output
+
+    def terminate_line(self, chunks: Iterator[str]) -> Iterator[str]:
+        # builtin 명령어의 출력은 줄바꿈으로 끝나지 않으므로 파이프/파일로 전달할 때는 마지막 줄바꿈 추가 (echo hi > a -> 'hi\n')
+        last = ''
+        for chunk in chunks:
+            if chunk:
+                last = chunk
+                yield chunk
+        if last and not last.endswith('\n'):
+            yield '\n'
+
+    def read_source(self, source) -> Optional[Iterator[str]]:
+        # 이전 명령어의 출력을 chunk iterator 로 변환 (프로세스 출력은 utf-8 로 decode)
+        if isinstance(source, subprocess.Popen):
+            return (chunk.decode(errors='replace') for chunk in iter(lambda: source.stdout.read1(64 * 1024), b''))
+        return source
+
+    def execute_script(self, script: Union[str, List[str]], stop_on_error: bool = False) -> List[Dict[str, object]]:
+        """
+        여러 명령어를 순서대로 실행하고 명령어별 결과를 반환함
+
+        Parameters
+        ----------
+        script : Union[str, List[str]]
+            명령어 리스트 또는 여러 줄의 스크립트 문자열 (빈 줄과 '#' 으로 시작하는 줄은 무시)
+        stop_on_error : bool
+            True 인 경우 실패한 명령어 이후의 명령어는 실행하지 않음
+
+        Returns
+        -------
+        List[Dict[str, object]]
+            명령어별 command, output, status, elapsed(초) 딕셔너리 리스트
+        """
+        lines: List[str] = script.splitlines() if isinstance(script, str) else script
+        results: List[Dict[str, object]] = []
+        for line in lines:
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            started: float = time.perf_counter()
+            output: str = self.execute_command(line)
+            results.append({
+                'command': line,
+                'output': output,
+                'status': self.state.exit_status,
+                'elapsed': time.perf_counter() - started,
+            })
+            if stop_on_error and self.state.exit_status != 0:
+                break
+        return results
+
 if __name__ == "__main__":
     simulator = ShellSimulator('tmp', 'host')
     simulator.run()